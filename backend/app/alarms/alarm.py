@@ -1,17 +1,24 @@
 import os
 import json
+import threading
+import numpy as np
 from app.logger import get_logger
 from app.alarms.mail_sender import send_mail
+from app.alarms.events import AlarmEventStore
+from app.alarms.polygon import Polygon
+from app.alarms.rules import rule_matches, validate_rule
+from app.alarms.scheduler import AlarmScheduler, DEFAULT_COOLDOWN
 
 logger = get_logger("ALARM")
 
 """
-Alarm class represents a rectangular alarm zone defined by its top-left and bottom-right corners.
+Alarm class represents an alarm zone, either a polygon given by its points or a
+rectangle defined by its top-left and bottom-right corners.
 """
 
 
 class Alarm:
-    def __init__(self, id, topLeft, bottomRight, active, triggered):
+    def __init__(self, id, topLeft=None, bottomRight=None, active=True, triggered=False, points=None, rule=None, cooldown=None):
         """
         Initialize an Alarm instance.
         Args:
@@ -20,8 +27,24 @@ class Alarm:
             bottomRight (dict): Coordinates of the bottom-right corner (keys: 'x', 'y').
             active (bool): Whether the alarm is currently active.
             triggered (bool): Whether the alarm has been triggered.
+            points (list): Optional polygon vertices (dicts with keys 'x', 'y'). Takes precedence over the rectangle.
+            rule (dict): Optional firing rule, see app.alarms.rules. Defaults to firing on entry.
+            cooldown (float): Seconds before the alarm re-arms after triggering. None uses the default, negative never re-arms.
+        Raises:
+            ValueError: If the rule is invalid, or neither points nor both rectangle corners are given.
         """
         self.id = id
+        self.rule = validate_rule(rule)
+        self.cooldown = cooldown
+        self.points = points
+        if points:
+            self.polygon = Polygon.from_json(points)
+            topLeft = topLeft or {"x": self.polygon.min_x, "y": self.polygon.min_y}
+            bottomRight = bottomRight or {"x": self.polygon.max_x, "y": self.polygon.max_y}
+        elif topLeft and bottomRight:
+            self.polygon = Polygon.from_rectangle(topLeft, bottomRight)
+        else:
+            raise ValueError("alarm zone needs points or topLeft/bottomRight")
         self.topLeft = topLeft
         self.bottomRight = bottomRight
         self.active = active
@@ -33,7 +56,24 @@ class Alarm:
         Returns:
             str: String showing the alarm's properties.
         """
-        return f"Alarm(id={self.id}, topLeft={self.topLeft}, bottomRight={self.bottomRight}, active={self.active}, triggered={self.triggered})"
+        return f"Alarm(id={self.id}, topLeft={self.topLeft}, bottomRight={self.bottomRight}, points={self.points}, rule={self.rule}, active={self.active}, triggered={self.triggered})"
+
+    def to_dict(self):
+        """
+        Return the JSON-serializable representation stored in the alarms file.
+        Returns:
+            dict: Alarm properties without derived geometry.
+        """
+        return {
+            "id": self.id,
+            "topLeft": self.topLeft,
+            "bottomRight": self.bottomRight,
+            "points": self.points,
+            "rule": self.rule,
+            "cooldown": self.cooldown,
+            "active": self.active,
+            "triggered": self.triggered,
+        }
 
     def alarm_contains(self, position: tuple):
         """
@@ -45,10 +85,7 @@ class Alarm:
         """
         if not self.active or self.triggered:
             return False
-        x, y = position
-        tl_x, tl_y = self.topLeft["x"], self.topLeft["y"]
-        br_x, br_y = self.bottomRight["x"], self.bottomRight["y"]
-        return tl_x <= x <= br_x and tl_y <= y <= br_y
+        return self.polygon.contains(position)
 
     def disable_alarm(self):
         """
@@ -64,6 +101,12 @@ class Alarm:
         self.active = True
         self.triggered = False
 
+    def get_cooldown(self):
+        """
+        Return the effective cooldown in seconds.
+        """
+        return DEFAULT_COOLDOWN if self.cooldown is None else float(self.cooldown)
+
     def trigger_alarm(self):
         """
         Trigger the alarm: log the event, send a notification email, and mark it as triggered.
@@ -88,10 +131,13 @@ class Alarm:
         """
         return Alarm(
             id=json_data["id"],
-            topLeft=json_data["topLeft"],
-            bottomRight=json_data["bottomRight"],
+            topLeft=json_data.get("topLeft"),
+            bottomRight=json_data.get("bottomRight"),
             active=json_data["active"],
             triggered=json_data["triggered"],
+            points=json_data.get("points"),
+            rule=json_data.get("rule"),
+            cooldown=json_data.get("cooldown"),
         )
 
 
@@ -110,6 +156,9 @@ class AlarmManager:
         self.active_alarms = None
         self.triggered_alarms = None
         self.alarm_file = os.path.join(os.path.dirname(__file__), "alarms.json")
+        self._file_lock = threading.Lock()
+        self.event_store = AlarmEventStore()
+        self.scheduler = AlarmScheduler(self.rearm_alarm)
         self.load_alarms()
 
     def load_alarms(self):
@@ -129,6 +178,9 @@ class AlarmManager:
                         self.triggered_alarms = [
                             alarm for alarm in self.alarms if alarm.triggered
                         ]
+                        # Alarms left triggered by a previous run start their cooldown now
+                        for alarm in self.triggered_alarms:
+                            self.scheduler.on_trigger(alarm.id, None, alarm.get_cooldown())
             except Exception as e:
                 logger.error(f"Error reading alarms file: {e}")
         else:
@@ -140,24 +192,102 @@ class AlarmManager:
                 json.dump([], f, indent=4)
                 logger.info(f"Created new alarms file: {self.alarm_file}")
 
-    def check_alarms(self, position):
+    def update_tracks(self, tracks, now):
         """
-        Check all active alarms against a given position and trigger any that match.
+        Update zone membership for the tracks of a frame and fire alarms whose rule matches.
+        Containment for all positions is computed per zone in one vectorized call; rules
+        are then evaluated only for the zones each track is in.
 
         Args:
-            position (tuple): (x, y) coordinates of the detected object.
+            tracks (list): (track_id, ZoneMembership, (x, y)) tuples, one per updated track.
+            now (float): Timestamp of the frame (seconds since epoch).
         """
-        if not self.active_alarms:
+        if not tracks:
             return
-        for alarm in self.active_alarms:
-            if alarm.alarm_contains(position):
-                alarm.trigger_alarm()
-                self.triggered_alarms.append(alarm)
-                logger.info(f"Alarm {alarm.id} triggered by object at {position}")
-                # Save the alarm to the file
-                with open(self.alarm_file, "w") as f:
-                    json.dump([alarm.__dict__ for alarm in self.alarms], f, indent=4)
-                logger.info(f"Saved triggered alarm to {self.alarm_file}")
+        zones = [alarm for alarm in self.alarms if alarm.active]
+        positions = [position for _, _, position in tracks]
+        if zones:
+            inside = np.vstack([alarm.polygon.contains_many(positions) for alarm in zones])
+        else:
+            inside = np.zeros((0, len(tracks)), dtype=bool)
+
+        for i, (track_id, membership, position) in enumerate(tracks):
+            touched = [zones[z] for z in np.flatnonzero(inside[:, i])]
+            entered = membership.update({alarm.id for alarm in touched}, now)
+            for alarm in touched:
+                if alarm.triggered or alarm.id in membership.fired:
+                    continue
+                if self.scheduler.is_suppressed(alarm.id, track_id):
+                    continue
+                if rule_matches(alarm.rule, alarm.id, membership, now, alarm.id in entered):
+                    membership.fired.add(alarm.id)
+                    logger.info(f"Alarm {alarm.id} rule {alarm.rule['type']} matched for track {track_id}")
+                    self._trigger(alarm, position, track_id, now)
+
+    def _trigger(self, alarm, position, track_id=None, timestamp=None):
+        """
+        Trigger an alarm, record the event and persist the alarm's new state.
+
+        Args:
+            alarm (Alarm): The alarm whose zone was entered.
+            position (tuple): (x, y) coordinates of the detected object.
+            track_id (str): ID of the object that triggered the alarm, if known.
+            timestamp (float): Time of the triggering position, defaults to now.
+        """
+        alarm.trigger_alarm()
+        self.triggered_alarms.append(alarm)
+        self.event_store.record(alarm.id, track_id, position, timestamp)
+        self.scheduler.on_trigger(alarm.id, track_id, alarm.get_cooldown())
+        logger.info(f"Alarm {alarm.id} triggered by object at {position}")
+        self._save_alarms()
+        logger.info(f"Saved triggered alarm to {self.alarm_file}")
+
+    def rearm_alarm(self, alarm_id):
+        """
+        Reset an alarm's triggered state once its cooldown has passed. Called by the scheduler.
+
+        Args:
+            alarm_id (str): ID of the alarm to re-arm.
+        """
+        for alarm in self.alarms:
+            if alarm.id == alarm_id and alarm.triggered:
+                alarm.untrigger_alarm()
+                self.triggered_alarms = [
+                    a for a in self.triggered_alarms if a.id != alarm_id
+                ]
+                self._save_alarms()
+                logger.info(f"Re-armed alarm {alarm_id} after cooldown")
+                return
+
+    def _save_alarms(self):
+        """
+        Write all alarms to the JSON file.
+        """
+        with self._file_lock:
+            with open(self.alarm_file, "w") as f:
+                json.dump([alarm.to_dict() for alarm in self.alarms], f, indent=4)
+
+    def get_events(self, start=None, end=None, alarm_ids=None, offset=0, limit=50):
+        """
+        Query the alarm event log, newest first.
+
+        Args:
+            start (float): Earliest event time, seconds since epoch.
+            end (float): Latest event time, seconds since epoch.
+            alarm_ids (list): Only include events from these alarm zones.
+            offset (int): Number of matching events to skip.
+            limit (int): Maximum number of events to return.
+        Returns:
+            tuple: (list of event dictionaries, total number of matching events).
+        """
+        return self.event_store.query(start, end, alarm_ids, offset, limit)
+
+    def close(self):
+        """
+        Stop the re-arm scheduler and flush pending alarm events to disk.
+        """
+        self.scheduler.stop()
+        self.event_store.close()
 
     def get_alarms_file(self):
         """
@@ -190,8 +320,7 @@ class AlarmManager:
         self.active_alarms.append(new_alarm)
 
         # Save the alarm to the file
-        with open(self.alarm_file, "w") as f:
-            json.dump([alarm.__dict__ for alarm in self.alarms], f, indent=4)
+        self._save_alarms()
         logger.info(f"Added new alarm: {new_alarm.id}")
 
     def remove_alarm(self, alarm_id):
@@ -200,6 +329,7 @@ class AlarmManager:
         Args:
             alarm_id (str): ID of the alarm to remove.
         """
+        self.scheduler.cancel(alarm_id)
         self.alarms = [alarm for alarm in self.alarms if alarm.id != alarm_id]
         self.active_alarms = [
             alarm for alarm in self.active_alarms if alarm.id != alarm_id
@@ -208,8 +338,7 @@ class AlarmManager:
             alarm for alarm in self.triggered_alarms if alarm.id != alarm_id
         ]
         # Remove the alarm from the file
-        with open(self.alarm_file, "w") as f:
-            json.dump([alarm.__dict__ for alarm in self.alarms], f, indent=4)
+        self._save_alarms()
         logger.info(f"Removed alarm: {alarm_id}")
 
     def toggle_alarm(self, alarm_id):
@@ -222,13 +351,13 @@ class AlarmManager:
         """
         for alarm in self.alarms:
             if alarm.id == alarm_id:
+                self.scheduler.cancel(alarm_id)
                 if alarm.active:
                     alarm.disable_alarm()
                 else:
                     alarm.enable_alarm()
                 # Save the alarm to the file
-                with open(self.alarm_file, "w") as f:
-                    json.dump([alarm.__dict__ for alarm in self.alarms], f, indent=4)
+                self._save_alarms()
                 logger.info(
                     f"Toggled alarm: {alarm_id} to {'enabled' if alarm.active else 'disabled'}"
                 )
@@ -0,0 +1,241 @@
+import json
+import os
+import queue
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+from app.logger import get_logger
+
+logger = get_logger("ALARM")
+
+"""
+Append-only log of triggered alarms with a bounded, time-ordered in-memory index.
+Events are written to a JSON-Lines file by a background thread so that recording
+an event never waits on disk I/O.
+"""
+
+MAX_EVENTS = 10000  # Events kept in the in-memory index
+WRITE_QUEUE_SIZE = 1000  # Pending events before record() spills to an unbounded overflow list
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def parse_time(value: str | None) -> float | None:
+    """
+    Parse a query time given as epoch seconds or an ISO 8601 string.
+    Args:
+        value (str): Raw query parameter, or None.
+    Returns:
+        float: Seconds since epoch, or None if value is empty.
+    Raises:
+        ValueError: If the value is neither a number nor an ISO timestamp.
+    """
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+
+
+class AlarmEvent:
+    """A single alarm trigger: which zone, which track, where and when."""
+
+    __slots__ = ("time", "alarm_id", "track_id", "x", "y")
+
+    def __init__(self, time: float, alarm_id: str, track_id: str | None, x: float, y: float):
+        self.time = time
+        self.alarm_id = alarm_id
+        self.track_id = track_id
+        self.x = x
+        self.y = y
+
+    def __lt__(self, other: "AlarmEvent") -> bool:
+        return self.time < other.time
+
+    def to_dict(self) -> Dict:
+        """Return the JSON representation used in the file and the API."""
+        return {
+            "alarm_id": self.alarm_id,
+            "track_id": self.track_id,
+            "position": {"x": self.x, "y": self.y},
+            "timestamp": datetime.fromtimestamp(self.time, timezone.utc)
+            .isoformat()
+            .replace("+00:00", "Z"),
+            "time": self.time,
+        }
+
+    @staticmethod
+    def from_dict(data: Dict) -> "AlarmEvent":
+        """Rebuild an event from its JSON representation."""
+        return AlarmEvent(
+            time=data["time"],
+            alarm_id=data["alarm_id"],
+            track_id=data.get("track_id"),
+            x=data["position"]["x"],
+            y=data["position"]["y"],
+        )
+
+
+class AlarmEventStore:
+    """Stores alarm events on disk and serves time-range queries from memory.
+
+    Attributes:
+        event_file: Path to the JSON-Lines event log.
+        max_events: Number of most recent events kept in the in-memory index.
+    """
+
+    def __init__(
+        self,
+        event_file: str = os.path.join(os.path.dirname(__file__), "alarm_events.json"),
+        max_events: int = MAX_EVENTS,
+    ):
+        """Load recent events from disk and start the writer thread."""
+        self.event_file = event_file
+        self.max_events = max_events
+        self._events: List[AlarmEvent] = []
+        self._times: List[float] = []
+        self._lock = threading.Lock()
+        self._write_queue: queue.Queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        self._spill: deque = deque()  # Events that did not fit in the queue, written with the next batch
+        self._load_recent()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def _load_recent(self) -> None:
+        """Fill the index with the newest events from the log file."""
+        if not os.path.exists(self.event_file):
+            return
+        recent = deque(maxlen=self.max_events)
+        try:
+            with open(self.event_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        recent.append(AlarmEvent.from_dict(json.loads(line)))
+                    except (json.JSONDecodeError, KeyError):
+                        logger.warning(f"Skipping malformed alarm event: {line.strip()}")
+        except IOError as e:
+            logger.error(f"Error reading alarm events from {self.event_file}: {e}")
+        self._events = sorted(recent)
+        self._times = [event.time for event in self._events]
+
+    def record(self, alarm_id: str, track_id: str | None, position: tuple, timestamp: float | None = None) -> AlarmEvent:
+        """
+        Record a triggered alarm. Only touches memory; the file write happens on the writer thread.
+        Args:
+            alarm_id (str): ID of the triggered alarm.
+            track_id (str): ID of the object that triggered it, if known.
+            position (tuple): (x, y) relative coordinates of the object.
+            timestamp (float): Event time in seconds since epoch, defaults to now.
+        Returns:
+            AlarmEvent: The recorded event.
+        """
+        x, y = position
+        event = AlarmEvent(
+            timestamp if timestamp is not None else time.time(),
+            alarm_id,
+            track_id,
+            float(x),
+            float(y),
+        )
+        with self._lock:
+            if not self._times or event.time >= self._times[-1]:
+                self._events.append(event)
+                self._times.append(event.time)
+            else:
+                index = bisect_right(self._times, event.time)
+                self._events.insert(index, event)
+                self._times.insert(index, event.time)
+            # Trim in chunks so appends stay amortized O(1)
+            if len(self._events) > self.max_events * 2:
+                del self._events[: -self.max_events]
+                del self._times[: -self.max_events]
+
+        try:
+            self._write_queue.put_nowait(event)
+        except queue.Full:
+            # Never drop an event from the log: the writer picks up spilled events
+            self._spill.append(event)
+            logger.warning(f"Alarm event queue full, event for {alarm_id} spilled to the next write")
+        return event
+
+    def query(
+        self,
+        start: float | None = None,
+        end: float | None = None,
+        alarm_ids: List[str] | None = None,
+        offset: int = 0,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> Tuple[List[Dict], int]:
+        """
+        Return a page of events, newest first.
+        Args:
+            start (float): Earliest event time (inclusive), seconds since epoch.
+            end (float): Latest event time (inclusive), seconds since epoch.
+            alarm_ids (list): Only include events from these alarm zones.
+            offset (int): Number of matching events to skip.
+            limit (int): Maximum number of events to return.
+        Returns:
+            tuple: (list of event dictionaries, total number of matching events).
+        """
+        limit = max(0, min(limit, MAX_PAGE_SIZE))
+        offset = max(0, offset)
+        with self._lock:
+            # Only consider the newest max_events, older ones are pending trimming
+            first = max(0, len(self._events) - self.max_events)
+            lo = first if start is None else max(first, bisect_left(self._times, start))
+            hi = len(self._times) if end is None else bisect_right(self._times, end)
+            if not alarm_ids:
+                # Page directly from the index, newest first
+                total = max(0, hi - lo)
+                page_hi = max(lo, hi - offset)
+                page = self._events[max(lo, page_hi - limit) : page_hi][::-1]
+                return [event.to_dict() for event in page], total
+            window = self._events[lo:hi]
+
+        wanted = set(alarm_ids)
+        matching = [event for event in reversed(window) if event.alarm_id in wanted]
+        page = matching[offset : offset + limit]
+        return [event.to_dict() for event in page], len(matching)
+
+    def _write_loop(self) -> None:
+        """Append queued events to the log file, batching whatever is pending."""
+        while True:
+            event = self._write_queue.get()
+            stop = event is None
+            batch = [] if stop else [event]
+            while not stop:
+                try:
+                    pending = self._write_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if pending is None:
+                    stop = True
+                    break
+                batch.append(pending)
+            while self._spill:
+                batch.append(self._spill.popleft())
+            if not batch:
+                return
+            try:
+                with open(self.event_file, "a", encoding="utf-8") as f:
+                    for item in batch:
+                        f.write(json.dumps(item.to_dict()) + "\n")
+            except IOError as e:
+                logger.error(f"Error writing alarm events to {self.event_file}: {e}")
+            if stop:
+                return
+
+    def close(self) -> None:
+        """Write all pending events and stop the writer thread."""
+        self._write_queue.put(None)
+        self._writer.join(timeout=5)
@@ -0,0 +1,137 @@
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+"""
+Polygon zone geometry used by alarms. Vertices are relative map coordinates
+(x, y in percent, see MapManager.convert_to_relative).
+"""
+
+
+class Polygon:
+    """Simple polygon with a precomputed edge table for fast point-in-polygon tests.
+
+    The bounding box is used as a cheap prefilter; only points inside it are
+    tested against the edges with an even-odd ray cast. Per-edge slopes are
+    computed once so the inner loop is a compare and a multiply-add.
+    """
+
+    def __init__(self, points: Sequence[Tuple[float, float]]):
+        """
+        Build the polygon and its edge table.
+        Args:
+            points (list): Vertices as (x, y) tuples, in drawing order. The polygon is closed implicitly.
+        Raises:
+            ValueError: If fewer than three vertices are given.
+        """
+        if len(points) < 3:
+            raise ValueError("A polygon needs at least three points")
+        self.points = [(float(x), float(y)) for x, y in points]
+
+        xs = [p[0] for p in self.points]
+        ys = [p[1] for p in self.points]
+        self.min_x, self.max_x = min(xs), max(xs)
+        self.min_y, self.max_y = min(ys), max(ys)
+
+        # Edge table: (y_low, y_high, x_at_y_low, dx/dy), horizontal edges never cross a ray
+        edges = []
+        for (x0, y0), (x1, y1) in zip(self.points, self.points[1:] + self.points[:1]):
+            if y0 == y1:
+                continue
+            if y0 > y1:
+                x0, y0, x1, y1 = x1, y1, x0, y0
+            edges.append((y0, y1, x0, (x1 - x0) / (y1 - y0)))
+        self.edges = edges
+        self._edge_array = np.array(edges, dtype=float).reshape(-1, 4)
+
+    @staticmethod
+    def from_rectangle(topLeft: Dict, bottomRight: Dict) -> "Polygon":
+        """
+        Build a polygon from the legacy rectangle corners.
+        Args:
+            topLeft (dict): Top-left corner (keys: 'x', 'y').
+            bottomRight (dict): Bottom-right corner (keys: 'x', 'y').
+        Returns:
+            Polygon: Four-vertex polygon covering the rectangle.
+        """
+        tl_x, tl_y = topLeft["x"], topLeft["y"]
+        br_x, br_y = bottomRight["x"], bottomRight["y"]
+        return Polygon([(tl_x, tl_y), (br_x, tl_y), (br_x, br_y), (tl_x, br_y)])
+
+    @staticmethod
+    def from_json(points: List[Dict]) -> "Polygon":
+        """
+        Build a polygon from a list of {'x', 'y'} dictionaries as sent by the frontend.
+        """
+        return Polygon([(p["x"], p["y"]) for p in points])
+
+    def bbox_contains(self, x: float, y: float) -> bool:
+        """Return True if (x, y) is inside the bounding box (edges included)."""
+        return self.min_x <= x <= self.max_x and self.min_y <= y <= self.max_y
+
+    def contains(self, position: tuple) -> bool:
+        """
+        Check whether a single position lies inside the polygon.
+        Args:
+            position (tuple): (x, y) coordinates to check.
+        Returns:
+            bool: True if the position is inside the polygon or on its bounding edge.
+        """
+        x, y = position
+        if not self.bbox_contains(x, y):
+            return False
+        inside = False
+        for y_low, y_high, x_low, inv_slope in self.edges:
+            if y_low <= y < y_high and x < x_low + (y - y_low) * inv_slope:
+                inside = not inside
+        # Points on the top/right rectangle border are inside for axis-aligned zones
+        return inside or self._on_bbox_corner_edge(x, y)
+
+    def contains_many(self, positions) -> np.ndarray:
+        """
+        Vectorized containment test for many positions at once.
+        Args:
+            positions: Sequence or (N, 2) array of (x, y) coordinates.
+        Returns:
+            np.ndarray: Boolean array of length N.
+        """
+        pts = np.asarray(positions, dtype=float).reshape(-1, 2)
+        result = np.zeros(len(pts), dtype=bool)
+        if not len(pts):
+            return result
+
+        x, y = pts[:, 0], pts[:, 1]
+        candidates = np.flatnonzero(
+            (x >= self.min_x) & (x <= self.max_x) & (y >= self.min_y) & (y <= self.max_y)
+        )
+        if not len(candidates) or not len(self._edge_array):
+            return result
+
+        cx = x[candidates][:, None]
+        cy = y[candidates][:, None]
+        y_low, y_high, x_low, inv_slope = self._edge_array.T
+        crossings = (cy >= y_low) & (cy < y_high) & (cx < x_low + (cy - y_low) * inv_slope)
+        inside = (crossings.sum(axis=1) % 2).astype(bool)
+        for i in np.flatnonzero(~inside):
+            inside[i] = self._on_bbox_corner_edge(cx[i, 0], cy[i, 0])
+        result[candidates] = inside
+        return result
+
+    def _on_bbox_corner_edge(self, x: float, y: float) -> bool:
+        """
+        Return True if (x, y) lies on an edge that coincides with the max-x or max-y
+        side of the bounding box. The half-open ray cast excludes these points, but
+        rectangle zones have always treated their borders as inside.
+        """
+        if x != self.max_x and y != self.max_y:
+            return False
+        for (x0, y0), (x1, y1) in zip(self.points, self.points[1:] + self.points[:1]):
+            if x0 == x1 == x == self.max_x and min(y0, y1) <= y <= max(y0, y1):
+                return True
+            if y0 == y1 == y == self.max_y and min(x0, x1) <= x <= max(x0, x1):
+                return True
+        return False
+
+    def to_json(self) -> List[Dict]:
+        """Return the vertices as a list of {'x', 'y'} dictionaries."""
+        return [{"x": x, "y": y} for x, y in self.points]
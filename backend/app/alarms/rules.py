@@ -0,0 +1,105 @@
+from typing import Dict, Set
+
+"""
+Alarm rules evaluated incrementally against the zone membership of a single track.
+
+A rule is stored on the alarm as a small dictionary:
+    {"type": "enter"}                                   fire as soon as a track enters the zone (default)
+    {"type": "dwell", "seconds": 10}                    fire once a track has stayed inside for `seconds`
+    {"type": "transition", "from": "<alarm id>", "within": 5}
+                                                        fire when a track enters the zone while inside,
+                                                        or shortly after leaving, the `from` zone
+"""
+
+RULE_TYPES = ("enter", "dwell", "transition")
+DEFAULT_RULE = {"type": "enter"}
+TRANSITION_WINDOW = 5.0  # Seconds after leaving the `from` zone that still count as a crossing
+
+
+def validate_rule(rule: Dict | None) -> Dict:
+    """
+    Normalize and validate a rule dictionary.
+    Args:
+        rule (dict): Rule as received from the API or alarms file, or None for the default.
+    Returns:
+        dict: The validated rule.
+    Raises:
+        ValueError: If the rule type is unknown or required fields are missing.
+    """
+    if not rule:
+        return dict(DEFAULT_RULE)
+    rule_type = rule.get("type")
+    if rule_type not in RULE_TYPES:
+        raise ValueError(f"Unknown alarm rule type: {rule_type}")
+    if rule_type == "dwell" and float(rule.get("seconds", -1)) < 0:
+        raise ValueError("Dwell rule requires a non-negative 'seconds' value")
+    if rule_type == "transition" and not rule.get("from"):
+        raise ValueError("Transition rule requires a 'from' alarm id")
+    return rule
+
+
+class ZoneMembership:
+    """Per-track zone state kept by the tracker.
+
+    Attributes:
+        inside: Alarm id -> timestamp the track entered that zone.
+        exits: Alarm id -> timestamp the track last left that zone.
+        fired: Alarm ids whose rule already fired during the current visit.
+    """
+
+    __slots__ = ("inside", "exits", "fired")
+
+    def __init__(self):
+        self.inside: Dict[str, float] = {}
+        self.exits: Dict[str, float] = {}
+        self.fired: Set[str] = set()
+
+    def update(self, current: Set[str], now: float) -> Set[str]:
+        """
+        Apply the set of zones the track is currently in.
+        Args:
+            current (set): Alarm ids whose zone contains the track's latest position.
+            now (float): Timestamp of the position (seconds since epoch).
+        Returns:
+            set: Alarm ids the track entered with this update.
+        """
+        for alarm_id in [a for a in self.inside if a not in current]:
+            del self.inside[alarm_id]
+            self.exits[alarm_id] = now
+            self.fired.discard(alarm_id)
+        entered = {a for a in current if a not in self.inside}
+        for alarm_id in entered:
+            self.inside[alarm_id] = now
+        return entered
+
+
+def rule_matches(
+    rule: Dict, alarm_id: str, membership: ZoneMembership, now: float, entered: bool
+) -> bool:
+    """
+    Evaluate one alarm rule for a track that is currently inside the alarm's zone.
+    Args:
+        rule (dict): Validated rule dictionary.
+        alarm_id (str): ID of the alarm the rule belongs to.
+        membership (ZoneMembership): The track's zone state, already updated for `now`.
+        now (float): Timestamp of the position (seconds since epoch).
+        entered (bool): Whether the track entered the zone with this update.
+    Returns:
+        bool: True if the rule fires for this update.
+    """
+    rule_type = rule["type"]
+    if rule_type == "enter":
+        return True
+    if rule_type == "dwell":
+        return now - membership.inside[alarm_id] >= float(rule["seconds"])
+    if rule_type == "transition":
+        # Only a fresh entry counts as crossing into this zone
+        if not entered:
+            return False
+        source = rule["from"]
+        if source in membership.inside:
+            return True
+        exited_at = membership.exits.get(source)
+        window = float(rule.get("within", TRANSITION_WINDOW))
+        return exited_at is not None and now - exited_at <= window
+    return False
@@ -0,0 +1,166 @@
+import math
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Tuple
+
+from app.logger import get_logger
+
+logger = get_logger("ALARM")
+
+"""
+Re-arming of triggered alarms and per-track repeat suppression, driven by a
+hashed timer wheel so that nothing is polled per observation.
+"""
+
+TICK = 0.5  # Seconds per wheel tick
+WHEEL_SLOTS = 512  # Slots per wheel revolution (256 s at the default tick)
+DEFAULT_COOLDOWN = 60.0  # Seconds before a triggered alarm is re-armed
+TRACK_SUPPRESSION = 300.0  # Seconds the same track cannot re-trigger the same alarm
+
+
+class TimerWheel:
+    """Hashed timer wheel: O(1) scheduling, expiry cost proportional to elapsed ticks.
+
+    Timers are stored in slot (deadline_tick % slots); timers further away than one
+    revolution simply stay in their slot until their deadline tick is reached.
+    """
+
+    def __init__(self, tick: float = TICK, slots: int = WHEEL_SLOTS, now: float | None = None):
+        self.tick = tick
+        self.slots: List[List[Tuple[int, Hashable]]] = [[] for _ in range(slots)]
+        self.current_tick = int((time.monotonic() if now is None else now) / tick)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def schedule(self, delay: float, key: Hashable, now: float) -> None:
+        """
+        Schedule key to expire after delay seconds.
+        Args:
+            delay: Seconds from now.
+            key: Value returned by advance() once the timer expires.
+            now: Current monotonic time.
+        """
+        deadline = max(self.current_tick + 1, math.ceil((now + delay) / self.tick))
+        self.slots[deadline % len(self.slots)].append((deadline, key))
+        self._size += 1
+
+    def advance(self, now: float) -> List[Hashable]:
+        """
+        Move the wheel forward to now and return the keys of all expired timers.
+        """
+        target = int(now / self.tick)
+        if target <= self.current_tick:
+            return []
+        n = len(self.slots)
+        if target - self.current_tick >= n:
+            ticks = range(n)
+        else:
+            ticks = range(self.current_tick + 1, target + 1)
+        self.current_tick = target
+
+        expired = []
+        for t in ticks:
+            slot = self.slots[t % n]
+            if not slot:
+                continue
+            keep = []
+            for deadline, key in slot:
+                if deadline <= target:
+                    expired.append(key)
+                else:
+                    keep.append((deadline, key))
+            self.slots[t % n] = keep
+        self._size -= len(expired)
+        return expired
+
+
+class AlarmScheduler:
+    """Re-arms alarms after their cooldown and suppresses repeats from the same track.
+
+    Attributes:
+        rearm: Callback taking an alarm ID, called once the alarm's cooldown has passed.
+        track_suppression: Seconds a track stays suppressed for an alarm it triggered.
+    """
+
+    def __init__(
+        self,
+        rearm: Callable[[str], None],
+        track_suppression: float = TRACK_SUPPRESSION,
+        tick: float = TICK,
+    ):
+        """Create the wheel and start the ticking thread."""
+        self.rearm = rearm
+        self.track_suppression = track_suppression
+        self.wheel = TimerWheel(tick)
+        self._lock = threading.Lock()
+        self._rearm_tokens: Dict[str, int] = {}
+        self._suppressed: Dict[Tuple[str, str], int] = {}
+        self._next_token = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _token(self) -> int:
+        self._next_token += 1
+        return self._next_token
+
+    def on_trigger(self, alarm_id: str, track_id: str | None, cooldown: float) -> None:
+        """
+        Schedule the alarm to be re-armed and suppress the triggering track.
+        Args:
+            alarm_id: ID of the triggered alarm.
+            track_id: ID of the object that triggered it, if known.
+            cooldown: Seconds until the alarm is re-armed; negative disables automatic re-arming.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if cooldown >= 0:
+                token = self._token()
+                self._rearm_tokens[alarm_id] = token
+                self.wheel.schedule(cooldown, ("rearm", alarm_id, token), now)
+            if track_id is not None:
+                token = self._token()
+                self._suppressed[(alarm_id, track_id)] = token
+                self.wheel.schedule(
+                    self.track_suppression, ("release", (alarm_id, track_id), token), now
+                )
+
+    def cancel(self, alarm_id: str) -> None:
+        """Forget pending re-arm and suppression for an alarm (e.g. toggled or removed)."""
+        with self._lock:
+            self._rearm_tokens.pop(alarm_id, None)
+            for key in [k for k in self._suppressed if k[0] == alarm_id]:
+                del self._suppressed[key]
+
+    def is_suppressed(self, alarm_id: str, track_id: str) -> bool:
+        """Return True if the track recently triggered this alarm."""
+        return (alarm_id, track_id) in self._suppressed
+
+    def _expire(self, now: float) -> List[str]:
+        """Advance the wheel and return the alarm IDs that are due for re-arming."""
+        due = []
+        with self._lock:
+            for kind, key, token in self.wheel.advance(now):
+                if kind == "rearm":
+                    if self._rearm_tokens.get(key) == token:
+                        del self._rearm_tokens[key]
+                        due.append(key)
+                elif self._suppressed.get(key) == token:
+                    del self._suppressed[key]
+        return due
+
+    def _run(self) -> None:
+        """Tick the wheel until stopped, re-arming alarms as their cooldown expires."""
+        while not self._stop.wait(self.wheel.tick):
+            for alarm_id in self._expire(time.monotonic()):
+                try:
+                    self.rearm(alarm_id)
+                except Exception as e:
+                    logger.error(f"Error re-arming alarm {alarm_id}: {e}")
+
+    def stop(self) -> None:
+        """Stop the ticking thread."""
+        self._stop.set()
+        self._thread.join(timeout=2)
@@ -1,16 +1,39 @@
+import concurrent.futures
+import ipaddress
 import platform
+import threading
 import netifaces
 import scapy.all as scapy
-from mac_vendor_lookup import MacLookup
 import json
 from datetime import datetime
 import os
+from app.camera.bringup import run_parallel
 from app.camera.camera import Camera
+from app.camera.webrtc import remove_camera_from_config
+from app.camera.registry import CameraRegistry, REGISTRY_FILE
 from app.logger import get_logger
 
 logger = get_logger("ARP SCAN")
 
-"""ARP scanning utilities for detecting Axis Communications cameras on a subnet."""
+"""
+ARP scanning utilities for detecting Axis Communications cameras on one or more subnets.
+
+Startup does not wait for a full sweep: cameras from the cached cameras.json are
+verified with a short unicast ARP round, and the full sweep of every subnet runs in
+the background, refreshing the cache for the next start. Axis devices are recognized
+by the OUI prefix of their MAC address, so no vendor database is loaded.
+"""
+
+# Subnets to scan, comma-separated
+SUBNETS = [s.strip() for s in os.getenv("CAMERA_SUBNETS", "192.168.0.0/24").split(",") if s.strip()]
+AXIS_OUIS = ("00:40:8c", "ac:cc:8e", "b8:a4:4f", "e8:27:25")  # MAC prefixes registered to Axis
+AXIS_MANUFACTURER = "Axis Communications AB"
+CACHE_FILE = "cameras.json"  # In this directory
+SCAN_TIMEOUT = 3  # seconds to wait for replies to a full subnet sweep
+VERIFY_TIMEOUT = 1  # seconds to wait for replies from cached cameras
+
+_registry = None
+_registry_lock = threading.Lock()
 
 
 def get_interface_for_subnet(subnet="192.168.0.0/24"):
@@ -40,47 +63,95 @@ def get_interface_for_subnet(subnet="192.168.0.0/24"):
     raise Exception("No interface found for subnet " + subnet)
 
 
-def arp_scan(ip_range, interface):
-    """Perform ARP scan on ip_range via interface; return list of (IP, MAC, Manufacturer)."""
+def is_axis(mac: str) -> bool:
+    """True if the MAC address has an Axis Communications OUI prefix."""
+    return mac.lower().startswith(AXIS_OUIS)
+
+
+def arp_scan(ip_range, interface, timeout=SCAN_TIMEOUT):
+    """Perform ARP scan on ip_range (a subnet, address or list of addresses) via interface.
+
+    Returns list of (IP, MAC, Manufacturer), the manufacturer derived from the MAC OUI.
+    """
     arp = scapy.ARP(pdst=ip_range)
     ether = scapy.Ether(dst="ff:ff:ff:ff:ff:ff")
     packet = ether / arp
-    result = scapy.srp(packet, timeout=3, verbose=0, iface=interface)[0]
+    result = scapy.srp(packet, timeout=timeout, verbose=0, iface=interface)[0]
 
-    mac_lookup = MacLookup()
     devices = []
     for sent, received in result:
         ip = received.psrc
-        mac = received.hwsrc
-        try:
-            manufacturer = mac_lookup.lookup(mac)
-        except:
-            manufacturer = "Unknown"
+        mac = received.hwsrc.lower()
+        manufacturer = AXIS_MANUFACTURER if is_axis(mac) else "Unknown"
         devices.append((ip, mac, manufacturer))
     return devices
 
 
-def save_results(devices, output_file="cameras.json"):
-    """Filter Axis devices, assign IDs, save to JSON file, and return list of tuples."""
+def _cache_path(output_file=CACHE_FILE):
+    """Path of the camera cache file in this directory."""
+    return os.path.join(os.path.dirname(__file__), output_file)
+
+
+def load_cached(output_file=CACHE_FILE):
+    """Return cameras from the last scan as (ID, IP, MAC, Manufacturer) tuples, [] if none."""
+    try:
+        with open(_cache_path(output_file), "r") as f:
+            cached = json.load(f)
+        return [
+            (d["ID"], d["IP Address"], d["MAC Address"].lower(), d["Manufacturer"])
+            for d in cached
+        ]
+    except (OSError, json.JSONDecodeError, KeyError, TypeError, AttributeError) as e:
+        logger.info(f"No usable camera cache: {e}")
+        return []
+
+
+def get_registry():
+    """Process-wide camera ID registry, seeded from the camera cache on first use."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = CameraRegistry(
+                REGISTRY_FILE, seed=[(id, mac) for id, ip, mac, manufacturer in load_cached()]
+            )
+        return _registry
+
+
+def save_results(devices, output_file=CACHE_FILE, registry=None):
+    """Filter Axis devices, look up their stable IDs, save to JSON file, and return list of tuples.
+
+    Args:
+        registry: CameraRegistry assigning IDs by MAC address, get_registry() by default.
+    """
     timestamp = datetime.now().strftime("%Y-%m-01 %H:%M:%S")
-    axis_devices = [d for d in devices if d[2] == "Axis Communications AB"]
-
-    # Assign sequential IDs starting from 1
-    axis_devices_with_id = [
-        {
-            "ID": i + 1,
-            "Timestamp": timestamp,
-            "IP Address": ip,
-            "MAC Address": mac,
-            "Manufacturer": manufacturer,
-        }
-        for i, (ip, mac, manufacturer) in enumerate(axis_devices)
-    ]
+    registry = registry or get_registry()
+    # New cameras are numbered in IP order
+    axis_devices = sorted(
+        {d[1].lower(): d for d in devices if is_axis(d[1])}.values(),
+        key=lambda d: ipaddress.ip_address(d[0]),
+    )
+    ids = registry.assign(mac for ip, mac, manufacturer in axis_devices)
+
+    axis_devices_with_id = sorted(
+        (
+            {
+                "ID": ids[mac.lower()],
+                "Timestamp": timestamp,
+                "IP Address": ip,
+                "MAC Address": mac.lower(),
+                "Manufacturer": manufacturer,
+            }
+            for ip, mac, manufacturer in axis_devices
+        ),
+        key=lambda d: d["ID"],
+    )
 
-    # Save to JSON in the same directory as the script
-    output_path = os.path.join(os.path.dirname(__file__), output_file)
-    with open(output_path, "w") as f:
+    # Write to a temporary file and rename, so readers never see a partial file
+    output_path = _cache_path(output_file)
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "w") as f:
         json.dump(axis_devices_with_id, f, indent=4)
+    os.replace(tmp_path, output_path)
 
     return [
         (d["ID"], d["IP Address"], d["MAC Address"], d["Manufacturer"])
@@ -88,57 +159,171 @@ def save_results(devices, output_file="cameras.json"):
     ]
 
 
-def scan_axis_cameras(ip_range="192.168.0.0/24", output_file="cameras.json"):
+def _subnet_of(ip, subnets):
+    """The configured subnet containing ip, or None."""
+    address = ipaddress.ip_address(ip)
+    for subnet in subnets:
+        if address in ipaddress.ip_network(subnet, strict=False):
+            return subnet
+    return None
+
+
+def _scan_subnets(targets, timeout):
+    """ARP scan {subnet: pdst} concurrently, one sweep per subnet.
+
+    Subnets that cannot be scanned (no interface, no privileges) are logged and skipped.
+
+    Returns:
+        (replies, failed): all (IP, MAC, Manufacturer) replies and the subnets that could not be scanned.
+    """
+
+    def scan(subnet, pdst):
+        interface = get_interface_for_subnet(subnet)
+        logger.info(f"Scanning {subnet} using interface {interface}...")
+        return arp_scan(pdst, interface, timeout)
+
+    devices = []
+    failed = []
+    if not targets:
+        return devices, failed
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(targets)) as executor:
+        futures = {executor.submit(scan, subnet, pdst): subnet for subnet, pdst in targets.items()}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                devices.extend(future.result())
+            except Exception as e:
+                failed.append(futures[future])
+                logger.error(
+                    f"Error during ARP scan of {futures[future]}: {str(e)}. "
+                    "Ensure you have NPCAP (Windows) or root privileges (Linux/macOS)."
+                )
+    return devices, failed
+
+
+def verify_cached(cached, subnets=None):
+    """Check which cached cameras still answer ARP, with one short unicast round per subnet.
+
+    Returns the answering cameras as (ID, IP, MAC, Manufacturer), with their cached IDs.
+    A device answering from a cached IP with a different MAC is not returned.
     """
-    Perform an ARP scan to find Axis Communications cameras, assign IDs, and save results to JSON.
+    subnets = subnets or SUBNETS
+    targets = {}
+    for id, ip, mac, manufacturer in cached:
+        subnet = _subnet_of(ip, subnets)
+        if subnet is not None:
+            targets.setdefault(subnet, []).append(ip)
+    devices, _ = _scan_subnets(targets, VERIFY_TIMEOUT)
+    replies = {(ip, mac) for ip, mac, manufacturer in devices}
+    return [device for device in cached if (device[1], device[2]) in replies]
+
+
+def log_results(axis_devices):
+    """Log a table of discovered cameras."""
+    if axis_devices:
+        logger.info("\t" * 3 + f"-- ARP Scan Results - {len(axis_devices)} cameras: --")
+        logger.info("====================================" * 2)
+        logger.info("ID\t\tIP Address\tMAC Address\t\tManufacturer")
+        for id, ip, mac, manufacturer in axis_devices:
+            logger.info(f"{id}\t\t{ip}\t{mac}\t{manufacturer}")
+        logger.info("====================================" * 2)
+    else:
+        logger.info("No Axis cameras found.")
+
+
+def scan_axis_cameras(subnets=None, output_file=CACHE_FILE):
+    """
+    Perform a full ARP sweep of all subnets to find Axis Communications cameras, assign IDs,
+    and save results to JSON.
+    Cached cameras on subnets whose scan failed are kept, and the cache is not rewritten
+    when nothing was found, so a failed sweep does not erase it.
     Returns a list of tuples (ID, IP, MAC, Manufacturer) for Axis devices.
     """
-    try:
-        # Get the interface dynamically
-        interface = get_interface_for_subnet(ip_range)
+    subnets = subnets or SUBNETS
+    if isinstance(subnets, str):
+        subnets = [subnets]
+    devices, failed = _scan_subnets({subnet: subnet for subnet in subnets}, SCAN_TIMEOUT)
+    if failed:
+        kept = [
+            (ip, mac, manufacturer)
+            for id, ip, mac, manufacturer in load_cached(output_file)
+            if _subnet_of(ip, failed) is not None
+        ]
+        if kept:
+            logger.info(f"Keeping {len(kept)} cached cameras on {', '.join(failed)}")
+            devices.extend(kept)
+    if not any(is_axis(mac) for ip, mac, manufacturer in devices):
+        logger.info(f"No Axis cameras found on {', '.join(subnets)}, keeping the camera cache")
+        return []
+    axis_devices = save_results(devices, output_file)
+    log_results(axis_devices)
+    return axis_devices
 
-        # Perform ARP scan
-        logger.info(f"Scanning {ip_range} using interface {interface}...")
-        devices = arp_scan(ip_range, interface)
 
-        # Save and return Axis devices with IDs
-        axis_devices = save_results(devices, output_file)
+def start_background_scan(subnets=None, output_file=CACHE_FILE, on_complete=None):
+    """Run scan_axis_cameras in a daemon thread, refreshing the cache.
 
-        if axis_devices:
-            logger.info(
-                "\t" * 3 + f"-- ARP Scan Results - {len(axis_devices)} cameras: --"
-            )
-            logger.info("====================================" * 2)
-            logger.info("ID\t\tIP Address\tMAC Address\t\tManufacturer")
-            for id, ip, mac, manufacturer in axis_devices:
-                logger.info(f"{id}\t\t{ip}\t{mac}\t{manufacturer}")
-            logger.info("====================================" * 2)
-        else:
-            logger.info("No Axis cameras found.")
+    Args:
+        on_complete: Called with the scan results when the sweep finishes.
 
-        return axis_devices
+    Returns:
+        The started thread.
+    """
 
-    except Exception as e:
-        logger.error(
-            f"Error during ARP scan: {str(e)}. Ensure you have NPCAP (Windows) or root privileges (Linux/macOS)."
-        )
-        return []
+    def run():
+        results = scan_axis_cameras(subnets, output_file)
+        if on_complete is not None:
+            on_complete(results)
+
+    thread = threading.Thread(target=run, daemon=True, name="arp-sweep")
+    thread.start()
+    return thread
+
+
+def discard_camera(id, camera: Camera) -> None:
+    """Undo the set-up of a camera that finished after its bring-up timeout: close it
+    and remove its stream entry. It is set up again when discovery finds it next."""
+    camera.close()
+    remove_camera_from_config(id)
 
 
-def find_cameras():
-    """Discover Axis cameras and return list of Camera instances with IP and ID."""
+def find_cameras(background_scan=True):
+    """Discover Axis cameras and return list of Camera instances with IP and ID.
+
+    Cached cameras that still answer are used right away and the full sweep runs in
+    the background; without a cache the sweep is done first.
+
+    Args:
+        background_scan: Start the background sweep; disable when a CameraDiscovery
+            loop does the sweeping.
+    """
     cameras = []
     try:
-        scan_results = scan_axis_cameras()
+        cached = load_cached()
+        if cached:
+            scan_results = verify_cached(cached)
+            logger.info(f"{len(scan_results)} of {len(cached)} cached cameras answered")
+            if background_scan:
+                start_background_scan()
+        else:
+            scan_results = scan_axis_cameras()
         if scan_results:
-            for id, ip, mac, manufacturer in scan_results:
-                cameras.append(Camera(ip=ip, id=id))
+            # Bring cameras up concurrently; slow or unreachable ones are skipped
+            created = run_parallel(
+                (
+                    (id, lambda ip=ip, id=id, mac=mac: Camera(ip=ip, id=id, mac=mac))
+                    for id, ip, mac, manufacturer in scan_results
+                ),
+                action="set up",
+                on_abandoned=discard_camera,
+            )
+            cameras = [created[id] for id in sorted(created)]
             return cameras
         else:
-            logger.info("No Axis cameras found on 192.168.0.0/24 subnet")
+            logger.info(f"No Axis cameras found on {', '.join(SUBNETS)}")
             return []
     except Exception as e:
         logger.error(f"Error during camera discovery: {str(e)}")
+        return []
 
 
 if __name__ == "__main__":
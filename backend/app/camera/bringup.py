@@ -0,0 +1,97 @@
+import concurrent.futures
+import time
+from functools import partial
+from typing import Callable, Dict, Hashable, Iterable, Tuple
+
+from app.logger import get_logger
+
+logger = get_logger("CAMERA")
+
+"""
+Concurrent camera bring-up.
+
+Creating a Camera and configuring it are several device round trips each; running
+them for all cameras at once bounds startup by the slowest camera rather than
+the sum over cameras. Every task gets its own deadline, counted from when it
+starts. A camera that does not finish in time is skipped and logged; its worker
+is left to finish in the background (device requests have their own timeouts,
+see app.camera.camera) and the caller may undo what it did once it completes.
+"""
+
+BRINGUP_TIMEOUT = 30.0  # Seconds a single camera may take to be set up
+MAX_WORKERS = 16  # Cameras set up at the same time
+
+
+def run_parallel(
+    tasks: Iterable[Tuple[Hashable, Callable[[], object]]],
+    timeout: float = BRINGUP_TIMEOUT,
+    max_workers: int = MAX_WORKERS,
+    action: str = "set up",
+    on_abandoned: Callable[[Hashable, object], None] | None = None,
+) -> Dict[Hashable, object]:
+    """Run per-camera tasks concurrently and collect the ones that finish in time.
+
+    Args:
+        tasks: (camera key, zero-argument callable) pairs.
+        timeout: Seconds each task may take, counted from when it starts running.
+        max_workers: Maximum number of tasks running at the same time.
+        action: Verb used in log messages, e.g. "configure".
+        on_abandoned: Called with the camera key and result of a timed-out task if it
+            completes later, e.g. to undo its side effects.
+
+    Returns:
+        Camera key -> task result, for tasks that completed without raising in time.
+    """
+    tasks = list(tasks)
+    if not tasks:
+        return {}
+    results = {}
+    started: Dict[Hashable, float] = {}
+
+    def run(key, fn):
+        started[key] = time.monotonic()
+        return fn()
+
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=min(max_workers, len(tasks)), thread_name_prefix="camera-bringup"
+    )
+    try:
+        futures = {executor.submit(run, key, fn): key for key, fn in tasks}
+        pending = set(futures)
+        abandoned = set()
+        while pending:
+            now = time.monotonic()
+            for future in [f for f in pending if now - started.get(futures[f], now) >= timeout]:
+                pending.discard(future)
+                if future.done():
+                    continue  # Finished just now; collected below
+                logger.error(f"Timed out after {timeout}s trying to {action} camera {futures[future]}")
+                abandoned.add(future)
+                if on_abandoned is not None:
+                    future.add_done_callback(partial(_abandoned, futures[future], on_abandoned, action))
+            deadlines = [started[futures[f]] + timeout for f in pending if futures[f] in started]
+            wait = min(deadlines) - now if deadlines else timeout
+            done, _ = concurrent.futures.wait(
+                pending, timeout=max(wait, 0), return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                pending.discard(future)
+        for future, key in futures.items():
+            if future in abandoned:
+                continue
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                logger.error(f"Failed to {action} camera {key}: {e}")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+def _abandoned(key, on_abandoned, action, future) -> None:
+    """Hand the result of a task that completed after its deadline to on_abandoned."""
+    try:
+        on_abandoned(key, future.result())
+        logger.info(f"Undid late {action} of camera {key}")
+    except Exception as e:
+        logger.error(f"Error after late {action} of camera {key}: {e}")
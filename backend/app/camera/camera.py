@@ -3,14 +3,43 @@ import os
 from typing import Dict, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPDigestAuth
+from urllib3.util.retry import Retry
 
+from app.camera.fingerprint import get_fingerprint_store
 from app.camera.webrtc import add_camera_to_config
 from ax_devil_device_api import Client, DeviceConfig
 from app.logger import get_logger
 
 logger = get_logger("CAMERA")
 CAM_TILT_OFFSET = 3  # degrees fine-tuning offset for tilt
+REQUEST_TIMEOUT = 10  # seconds per camera REST request
+MAX_RETRIES = 3  # Retries of failed connections and idempotent requests
+RETRY_BACKOFF = 0.5  # seconds, doubled on every retry
+
+
+def create_session(username: str, password: str) -> requests.Session:
+    """Create a keep-alive HTTP session with digest auth and a retry policy.
+
+    The auth object is kept on the session, so the digest nonce from the first
+    challenge is reused and later requests are not challenged again.
+    POST is not retried on a response error since it is not idempotent.
+    """
+    session = requests.Session()
+    session.auth = HTTPDigestAuth(username, password)
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "PUT", "DELETE"}),
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=4)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"accept": "application/json"})
+    return session
+
 
 class Camera:
     """Represents a camera with configuration for geocoordinates and MQTT publishing.
@@ -27,15 +56,20 @@ class Camera:
         ip: str = "192.168.0.93",
         username: str = "student",
         password: str = "student_pass",
+        mac: str | None = None,
     ):
-        """Initialize camera with ID, IP, and credentials."""
+        """Initialize camera with ID, IP, credentials and, if known, MAC address."""
         self.id = id
         self.ip = ip
+        self.mac = mac.lower() if mac else None
         self.geocoordinates = geocoordinates
         self.username = username
         self.password = password
-        self.config = DeviceConfig(self.ip, username, password, verify_ssl=False)
-        self._last_settings = self.get_last_settings()
+        self.config = DeviceConfig(
+            self.ip, username, password, timeout=REQUEST_TIMEOUT, verify_ssl=False
+        )
+        self.session = create_session(username, password)  # Shared by all REST calls
+        self._client = None  # ax_devil_device_api Client, opened on first use
 
         self._configure_mqtt_publisher(
             topic=f"{self.id}/frame_metadata",
@@ -43,6 +77,20 @@ class Camera:
         )
         add_camera_to_config(cam_id=self.id, cam_ip=self.ip, cam_username=self.username, cam_password=self.password)
 
+    @property
+    def client(self) -> Client:
+        """Device API client, kept open so its HTTP session is reused across calls."""
+        if self._client is None:
+            self._client = Client(self.config)
+        return self._client
+
+    def close(self) -> None:
+        """Close the HTTP session and device API client."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+        self.session.close()
+
     def configure_camera(
         self,
         lat: float,
@@ -60,23 +108,23 @@ class Camera:
             tilt: Camera tilt (degrees), defaults to last known tilt.
             roll: Camera roll (degrees), defaults to last known roll.
         """
-        with Client(self.config) as client:
+        client = self.client
 
-            # Apply settings
-            client.geocoordinates.set_location(lat, lon)
-            client.geocoordinates.apply_settings() # automatically sets tilt and roll
+        # Apply settings
+        client.geocoordinates.set_location(lat, lon)
+        client.geocoordinates.apply_settings() # automatically sets tilt and roll
 
-            # Retrieve last settings
-            last_settings = self.get_last_settings() # retrieve automatically set tilt
-            adjusted_tilt = last_settings["tilt"] + CAM_TILT_OFFSET
-            
-            client.geocoordinates.set_orientation({
-                "heading": heading,
-                "tilt": adjusted_tilt,
-                "roll": 0, # roll doesnt work coorectly so we set it to 0
-                "installation_height": inst_height,
-            })
-            logger.info(f"Configured camera {self.id} at {self.ip} with settings:\n\t\t\t| lat: {lat}, lng: {lon}, height: {inst_height}, heading: {heading}, tilt: {adjusted_tilt}, roll: {0}")
+        # Retrieve last settings
+        last_settings = self.get_last_settings() # retrieve automatically set tilt
+        adjusted_tilt = last_settings["tilt"] + CAM_TILT_OFFSET
+        
+        client.geocoordinates.set_orientation({
+            "heading": heading,
+            "tilt": adjusted_tilt,
+            "roll": 0, # roll doesnt work coorectly so we set it to 0
+            "installation_height": inst_height,
+        })
+        logger.info(f"Configured camera {self.id} at {self.ip} with settings:\n\t\t\t| lat: {lat}, lng: {lon}, height: {inst_height}, heading: {heading}, tilt: {adjusted_tilt}, roll: {0}")
 
 
     def get_last_settings(self) -> Dict[str, float]:
@@ -86,17 +134,16 @@ class Camera:
             Dictionary with latitude, longitude, inst_height, heading, tilt, and roll.
         """
         try:
-            with Client(self.config) as client:
-                location = client.geocoordinates.get_location()
-                orientation = client.geocoordinates.get_orientation()
-                return {
-                    "latitude": location["latitude"],
-                    "longitude": location["longitude"],
-                    "installation_height": orientation["installation_height"],
-                    "heading": orientation["heading"],
-                    "tilt": orientation["tilt"],
-                    "roll": orientation["roll"],
-                }
+            location = self.client.geocoordinates.get_location()
+            orientation = self.client.geocoordinates.get_orientation()
+            return {
+                "latitude": location["latitude"],
+                "longitude": location["longitude"],
+                "installation_height": orientation["installation_height"],
+                "heading": orientation["heading"],
+                "tilt": orientation["tilt"],
+                "roll": orientation["roll"],
+            }
         except Exception as e:
             logger.error(f"Failed to retrieve settings for {self.ip}: {e}")
             return {
@@ -114,10 +161,9 @@ class Camera:
         os.makedirs(assets_dir, exist_ok=True)
 
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"http://{self.ip}/axis-cgi/jpg/image.cgi?resolution=1920x1080",
-                auth=HTTPDigestAuth(self.username, self.password),
-                timeout=10,
+                timeout=REQUEST_TIMEOUT,
             )
             response.raise_for_status()
             snapshot_path = os.path.join(assets_dir, f"{self.id}_snapshot.jpg")
@@ -130,22 +176,19 @@ class Camera:
     def _configure_mqtt_publisher(self, topic: str, publisher_key: str) -> None:
         """Configure MQTT publisher if it doesn't exist or has a different topic.
 
+        The camera's publishers are always listed, so a camera that was reset is
+        provisioned again; nothing is changed when the topic already exists.
+
         Args:
             topic: MQTT topic (e.g., "1/frame_metadata").
             publisher_key: Data source key (e.g., "com.axis.analytics_scene_description.v0.beta#1").
         """
         base_url = f"http://{self.ip}/config/rest/analytics-mqtt/v1beta/publishers"
-        headers = {"accept": "application/json"}
         publisher_id = topic.split("/")[1]
 
         try:
             # Check existing publishers
-            response = requests.get(
-                base_url,
-                auth=HTTPDigestAuth(self.username, self.password),
-                headers=headers,
-                timeout=10,
-            )
+            response = self.session.get(base_url, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             publishers = response.json().get("data", [])
 
@@ -155,11 +198,8 @@ class Camera:
                     return
                 if publisher.get("data_source_key") == publisher_key:
                     # Remove old publisher with same data source key
-                    response = requests.delete(
-                        f"{base_url}/{publisher['id']}",
-                        auth=HTTPDigestAuth(self.username, self.password),
-                        headers=headers,
-                        timeout=10,
+                    response = self.session.delete(
+                        f"{base_url}/{publisher['id']}", timeout=REQUEST_TIMEOUT
                     )
                     response.raise_for_status()
                     if response.json().get("status") != "success":
@@ -175,16 +215,12 @@ class Camera:
                     "mqtt_topic": topic,
                 }
             }
-            response = requests.post(
-                base_url,
-                auth=HTTPDigestAuth(self.username, self.password),
-                json=payload,
-                headers=headers,
-                timeout=10,
-            )
+            response = self.session.post(base_url, json=payload, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             if response.json().get("status") == "success":
                 logger.info(f"MQTT publisher '{publisher_id}' created on {self.ip} with topic {topic}")
+                # New or reset camera: have MapManager push its location and orientation again
+                get_fingerprint_store().forget(self.mac or self.ip)
             else:
                 logger.error(f"Failed to create MQTT publisher on {self.ip}: {response.text}")
         except requests.RequestException as e:
@@ -0,0 +1,147 @@
+import os
+import threading
+from typing import Callable, Dict, List
+
+from app.camera.arp_scan import discard_camera, scan_axis_cameras
+from app.camera.bringup import run_parallel
+from app.camera.camera import Camera
+from app.logger import get_logger
+
+logger = get_logger("DISCOVERY")
+
+"""
+Runtime camera discovery.
+
+A background loop sweeps the subnets periodically and diffs the result against
+the running cameras: new cameras are set up (MQTT publisher, WebRTC stream entry)
+and handed to on_added, cameras missing from several consecutive sweeps are
+closed and handed to on_removed. Cameras are identified by MAC address, so one
+that moved to another IP address is retired and set up again at its new address.
+"""
+
+# Seconds between background sweeps
+DISCOVERY_INTERVAL = float(os.getenv("CAMERA_DISCOVERY_INTERVAL", "60"))
+MISSED_SCANS = 3  # Consecutive sweeps a camera must be missing from before it is retired
+
+
+class CameraDiscovery:
+    """Keeps the set of running cameras in sync with the network.
+
+    Attributes:
+        interval: Seconds between sweeps.
+        missed_scans: Sweeps a camera may be missing from before it is retired.
+    """
+
+    def __init__(
+        self,
+        cameras: List[Camera],
+        on_added: Callable[[Camera], None],
+        on_removed: Callable[[Camera], None],
+        interval: float = DISCOVERY_INTERVAL,
+        missed_scans: int = MISSED_SCANS,
+        scan: Callable[[], List[tuple]] = scan_axis_cameras,
+        camera_factory: Callable[..., Camera] = Camera,
+        start: bool = True,
+    ):
+        """Track the cameras found at startup and start the sweep loop.
+
+        Args:
+            cameras: Cameras already running.
+            on_added: Called with every camera set up at runtime.
+            on_removed: Called with every retired camera, after it was closed.
+            scan: Full sweep returning (ID, IP, MAC, Manufacturer) tuples.
+            camera_factory: Creates a Camera from ip, id and mac keyword arguments.
+            start: Start the background loop; the first sweep runs immediately.
+        """
+        self.interval = interval
+        self.missed_scans = missed_scans
+        self.on_added = on_added
+        self.on_removed = on_removed
+        self._scan = scan
+        self._camera_factory = camera_factory
+        self._cameras: Dict[str, Camera] = {self._key(camera): camera for camera in cameras}
+        self._missed: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        if start:
+            self._thread = threading.Thread(target=self._run, daemon=True, name="camera-discovery")
+            self._thread.start()
+
+    @staticmethod
+    def _key(camera: Camera) -> str:
+        return camera.mac or camera.ip
+
+    @property
+    def cameras(self) -> List[Camera]:
+        """Running cameras, ordered by ID."""
+        with self._lock:
+            return sorted(self._cameras.values(), key=lambda camera: camera.id)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Error during camera discovery: {e}")
+            self._stop.wait(self.interval)
+
+    def poll(self) -> tuple:
+        """Run one sweep and apply the differences.
+
+        An empty sweep does not retire anything: it is far more likely a failed scan
+        than every camera going offline at once.
+
+        Returns:
+            (added, removed) lists of cameras.
+        """
+        found = {mac or ip: (id, ip, mac) for id, ip, mac, manufacturer in self._scan()}
+        removed = []
+        with self._lock:
+            for key, camera in list(self._cameras.items()):
+                moved = key in found and found[key][1] != camera.ip
+                if key in found and not moved:
+                    self._missed.pop(key, None)
+                    continue
+                if not found:
+                    continue
+                self._missed[key] = self._missed.get(key, 0) + 1
+                if moved or self._missed[key] >= self.missed_scans:
+                    del self._cameras[key]
+                    self._missed.pop(key, None)
+                    removed.append(camera)
+            new = {key: device for key, device in found.items() if key not in self._cameras}
+
+        for camera in removed:
+            logger.info(f"Retiring camera {camera.id} at {camera.ip}")
+            camera.close()
+            self._notify(self.on_removed, camera)
+
+        created = run_parallel(
+            (
+                (id, lambda ip=ip, id=id, mac=mac: self._camera_factory(ip=ip, id=id, mac=mac))
+                for id, ip, mac in new.values()
+            ),
+            action="set up",
+            on_abandoned=discard_camera,
+        )
+        added = [created[id] for id in sorted(created)]
+        for camera in added:
+            with self._lock:
+                self._cameras[self._key(camera)] = camera
+            logger.info(f"Added camera {camera.id} at {camera.ip}")
+            self._notify(self.on_added, camera)
+        return added, removed
+
+    @staticmethod
+    def _notify(callback: Callable[[Camera], None], camera: Camera) -> None:
+        try:
+            callback(camera)
+        except Exception as e:
+            logger.error(f"Error handling change of camera {camera.id}: {e}")
+
+    def stop(self) -> None:
+        """Stop the sweep loop; cameras are left running."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
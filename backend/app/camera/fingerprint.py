@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict
+
+from app.logger import get_logger
+
+logger = get_logger("CAMERA")
+
+"""
+Fingerprints of the settings last applied to each camera.
+
+MapManager pushes location and orientation from map_config.json to every camera
+at startup. The fingerprint of what was pushed is persisted per camera (keyed by
+MAC address), so on a routine restart cameras whose settings did not change are
+not contacted at all.
+"""
+
+FINGERPRINT_FILE = os.path.join(os.path.dirname(__file__), "camera_fingerprints.json")
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def settings_fingerprint(**settings) -> str:
+    """Stable hash of a set of camera settings (keyword order does not matter)."""
+    encoded = json.dumps(settings, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class FingerprintStore:
+    """Persisted camera key -> fingerprint of the last successfully applied settings.
+
+    Attributes:
+        filename: JSON file the fingerprints are kept in.
+    """
+
+    def __init__(self, filename: str = FINGERPRINT_FILE):
+        self.filename = filename
+        self._lock = threading.Lock()
+        self._fingerprints: Dict[str, str] = self._load()
+
+    def _load(self) -> Dict[str, str]:
+        if not os.path.exists(self.filename):
+            return {}
+        try:
+            with open(self.filename, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            return data if isinstance(data, dict) else {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Ignoring unreadable camera fingerprint file {self.filename}: {e}")
+            return {}
+
+    def matches(self, key: str, fingerprint: str) -> bool:
+        """True if fingerprint is the one last recorded for the camera."""
+        with self._lock:
+            return self._fingerprints.get(key) == fingerprint
+
+    def record(self, key: str, fingerprint: str) -> None:
+        """Record the fingerprint of settings just applied to a camera and persist the file."""
+        with self._lock:
+            self._fingerprints[key] = fingerprint
+            self._save()
+
+    def forget(self, key: str) -> None:
+        """Drop a camera's fingerprint so its settings are pushed again next time."""
+        with self._lock:
+            if self._fingerprints.pop(key, None) is not None:
+                self._save()
+
+    def _save(self) -> None:
+        """Write to a temporary file and rename, so a crash never leaves a partial file."""
+        tmp = f"{self.filename}.tmp"
+        with open(tmp, "w", encoding="utf-8") as file:
+            json.dump(self._fingerprints, file, indent=4, sort_keys=True)
+        os.replace(tmp, self.filename)
+
+
+def get_fingerprint_store() -> FingerprintStore:
+    """Process-wide FingerprintStore, so all users of the file share one in-memory copy."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = FingerprintStore()
+        return _store
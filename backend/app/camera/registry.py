@@ -0,0 +1,87 @@
+import json
+import os
+import threading
+from typing import Dict, Iterable
+
+from app.logger import get_logger
+
+logger = get_logger("CAMERA")
+
+"""
+Persistent MAC address -> camera ID registry.
+
+Camera IDs are used in map_config.json, MQTT topics and stream names, so they must
+not depend on which cameras happened to answer a scan. A camera keeps its ID for
+as long as the registry file exists; IDs of cameras that went away are not reused.
+"""
+
+REGISTRY_FILE = os.path.join(os.path.dirname(__file__), "camera_ids.json")
+
+
+class CameraRegistry:
+    """Assigns every camera MAC address a stable integer ID, starting from 1.
+
+    Attributes:
+        filename: JSON file the registry is kept in.
+    """
+
+    def __init__(self, filename: str = REGISTRY_FILE, seed: Iterable = ()):
+        """Load the registry.
+
+        Args:
+            filename: JSON file of {mac: id}.
+            seed: (id, mac) pairs used when there is no registry file yet, e.g. from a
+                previous scan, so IDs already in map_config.json are kept.
+        """
+        self.filename = filename
+        self._lock = threading.Lock()
+        self._ids: Dict[str, int] = self._load()
+        if not self._ids and seed:
+            for id, mac in seed:
+                self._ids.setdefault(mac.lower(), int(id))
+            if self._ids:
+                logger.info(f"Seeded camera ID registry with {len(self._ids)} cameras")
+                self._save()
+
+    def _load(self) -> Dict[str, int]:
+        if not os.path.exists(self.filename):
+            return {}
+        try:
+            with open(self.filename, "r", encoding="utf-8") as file:
+                return {mac.lower(): int(id) for mac, id in json.load(file).items()}
+        except (OSError, json.JSONDecodeError, AttributeError, ValueError) as e:
+            logger.error(f"Ignoring unreadable camera ID registry {self.filename}: {e}")
+            return {}
+
+    def __contains__(self, mac: str) -> bool:
+        return mac.lower() in self._ids
+
+    def get(self, mac: str) -> int | None:
+        """ID of a known camera, or None."""
+        return self._ids.get(mac.lower())
+
+    def assign(self, macs: Iterable[str]) -> Dict[str, int]:
+        """Return the IDs of the given cameras, registering new ones with the next free IDs.
+
+        New cameras are numbered in the given order; the file is written only if one was added.
+        """
+        with self._lock:
+            added = False
+            result = {}
+            for mac in macs:
+                mac = mac.lower()
+                if mac not in self._ids:
+                    self._ids[mac] = max(self._ids.values(), default=0) + 1
+                    logger.info(f"Registered new camera {mac} with ID {self._ids[mac]}")
+                    added = True
+                result[mac] = self._ids[mac]
+            if added:
+                self._save()
+            return result
+
+    def _save(self) -> None:
+        """Write to a temporary file and rename, so a crash never leaves a partial file."""
+        tmp = f"{self.filename}.tmp"
+        with open(tmp, "w", encoding="utf-8") as file:
+            json.dump(self._ids, file, indent=4, sort_keys=True)
+        os.replace(tmp, self.filename)
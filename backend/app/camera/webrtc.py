@@ -1,105 +1,429 @@
+import glob
+import hashlib
+import platform
 import subprocess
 import os
 import json
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
 
 from app.logger import get_logger
 
 logger = get_logger("WEBRTC")
-"""Utilities for running RTSPtoWebRTC server and managing stream configurations."""
+"""
+Utilities for running RTSPtoWebRTC server and managing stream configurations.
+
+The Go server is compiled once into bin/, under a name derived from a hash of its
+sources, and launched directly; it is only rebuilt when the sources change. A
+supervisor thread restarts it with exponential backoff if it exits. Stream entries
+are managed in memory, written to config.json in batches and pushed to the running
+server.
+"""
 
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-CONFIG_FILE = os.path.join(ROOT_DIR, "external", "RTSPtoWebRTC", "config.json")
+RTSP_DIR = os.path.join(ROOT_DIR, "external", "RTSPtoWebRTC")
+CONFIG_FILE = os.path.join(RTSP_DIR, "config.json")
+BIN_DIR = os.path.join(RTSP_DIR, "bin")
+# Prebuilt server binary to run instead of building from source (no Go toolchain needed)
+RTSP_TO_WEBRTC_BIN = os.getenv("RTSP_TO_WEBRTC_BIN", "")
+BUILD_TIMEOUT = 600  # seconds, first build downloads the Go modules
+RESTART_BACKOFF = 1.0  # seconds before the first restart, doubled on every crash
+MAX_RESTART_BACKOFF = 60.0  # seconds
+STABLE_RUNTIME = 60.0  # seconds of uptime after which the backoff is reset
+# HTTP API of the running server, for stream changes without a restart
+RTSP_TO_WEBRTC_URL = os.getenv("RTSP_TO_WEBRTC_URL", "http://localhost:8083")
+PUSH_TIMEOUT = 2  # seconds per stream API request
 
 
-def start_rtsp_to_webrtc():
-    """Start RTSPtoWebRTC Go server subprocess, log its output, and handle errors."""
-    root_dir = os.path.dirname(
-        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+def source_hash(source_dir=RTSP_DIR):
+    """SHA-256 of the Go sources and module files, identifying a build."""
+    digest = hashlib.sha256()
+    files = glob.glob(os.path.join(source_dir, "*.go")) + [
+        os.path.join(source_dir, name) for name in ("go.mod", "go.sum")
+    ]
+    for path in sorted(files):
+        if not os.path.exists(path):
+            continue
+        digest.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def build_binary(source_dir=RTSP_DIR, bin_dir=BIN_DIR):
+    """Return the path of the server binary for the current sources, building it if needed.
+
+    Binaries of older sources are removed after a successful build.
+
+    Raises:
+        FileNotFoundError: Go is not installed and no binary for these sources exists.
+        subprocess.CalledProcessError: The build failed.
+    """
+    suffix = ".exe" if platform.system() == "Windows" else ""
+    binary = os.path.join(bin_dir, f"rtsp2webrtc-{source_hash(source_dir)[:16]}{suffix}")
+    if os.path.exists(binary):
+        return binary
+
+    logger.info("Building RTSPtoWebRTC server, this only happens when its sources change...")
+    os.makedirs(bin_dir, exist_ok=True)
+    tmp = f"{binary}.tmp"
+    started = time.monotonic()
+    subprocess.run(
+        ["go", "build", "-ldflags", "-s -w", "-o", tmp, "."],
+        cwd=source_dir,
+        check=True,
+        capture_output=True,
+        text=True,
+        timeout=BUILD_TIMEOUT,
     )
-    rtsp_dir = os.path.join(root_dir, "external", "RTSPtoWebRTC")
+    os.replace(tmp, binary)
+    logger.info(f"Built {binary} in {time.monotonic() - started:.1f}s")
+    for old in glob.glob(os.path.join(bin_dir, "rtsp2webrtc-*")):
+        if old != binary:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+    return binary
 
-    # Command to run the Go program
-    command = ["go", "run", rtsp_dir]
 
-    try:
-        # Start the server as a subprocess
-        logger.info("Starting RTSPtoWebRTC server...")
-        process = subprocess.Popen(
-            command,
-            cwd=rtsp_dir,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-        )
-        logger.info(
-            "RTSPtoWebRTC server started successfully. Preview URL: http://localhost:8083"
-        )
-
-        for line in process.stdout:  # Read output line by line
-            logger.info(line.strip())
-
-        # Check for errors
-        process.wait()  # Wait for the process to complete (optional, remove if you want it to run in background)
-        if process.returncode not in (0, 1):
-            error_output = process.stderr.read()
+class WebRTCSupervisor:
+    """Runs the RTSPtoWebRTC server and restarts it with exponential backoff when it exits.
+
+    Example usage:
+        supervisor = WebRTCSupervisor()
+        supervisor.start()
+        supervisor.status()  # {"state": "running", "pid": 1234, ...}
+        supervisor.stop()
+    """
+
+    def __init__(
+        self,
+        binary=None,
+        args=(),
+        cwd=RTSP_DIR,
+        backoff=RESTART_BACKOFF,
+        max_backoff=MAX_RESTART_BACKOFF,
+        stable_runtime=STABLE_RUNTIME,
+    ):
+        """Configure the supervisor; nothing is built or started until start().
+
+        Args:
+            binary: Server executable, by default RTSP_TO_WEBRTC_BIN or the cached build.
+            args: Extra command line arguments.
+            cwd: Working directory, where config.json and the web assets are.
+        """
+        self.binary = binary or RTSP_TO_WEBRTC_BIN or None
+        self.args = list(args)
+        self.cwd = cwd
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.stable_runtime = stable_runtime
+        self.process = None
+        self.state = "stopped"  # building, starting, running, backoff, failed or stopped
+        self.restarts = 0
+        self.started_at = None
+        self.last_exit_code = None
+        self.last_error = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """Build if needed and start the server in a background thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="rtsp2webrtc")
+        self._thread.start()
+
+    def _run(self):
+        if self.binary is None:
+            self.state = "building"
+            try:
+                self.binary = build_binary()
+            except FileNotFoundError:
+                self._fail("Go toolchain not found; install Go or set RTSP_TO_WEBRTC_BIN")
+                return
+            except subprocess.CalledProcessError as e:
+                self._fail(f"Building RTSPtoWebRTC failed: {(e.stderr or '').strip()}")
+                return
+            except Exception as e:
+                self._fail(f"Building RTSPtoWebRTC failed: {e}")
+                return
+
+        delay = self.backoff
+        while not self._stop.is_set():
+            self.state = "starting"
+            try:
+                with self._lock:
+                    if self._stop.is_set():
+                        break
+                    self.process = subprocess.Popen(
+                        [self.binary, *self.args],
+                        cwd=self.cwd,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.STDOUT,  # One pipe, so a full stderr buffer cannot block the server
+                        text=True,
+                    )
+            except OSError as e:
+                self._fail(f"Could not start RTSPtoWebRTC server {self.binary}: {e}")
+                return
+            self.started_at = time.time()
+            self.state = "running"
+            logger.info(f"RTSPtoWebRTC server started (pid {self.process.pid}). Preview URL: http://localhost:8083")
+
+            for line in self.process.stdout:  # Read output line by line until it exits
+                logger.info(line.strip())
+            self.last_exit_code = self.process.wait()
+            if self._stop.is_set():
+                break
+
+            uptime = time.time() - self.started_at
+            if uptime >= self.stable_runtime:
+                delay = self.backoff
+            self.restarts += 1
+            self.state = "backoff"
             logger.error(
-                f"RTSPtoWebRTC server exited with error: {error_output.strip()}"
+                f"RTSPtoWebRTC server exited with code {self.last_exit_code} after {uptime:.0f}s, "
+                f"restarting in {delay:.0f}s"
             )
+            if self._stop.wait(delay):
+                break
+            delay = min(delay * 2, self.max_backoff)
+        self.state = "stopped"
 
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Error starting RTSPtoWebRTC: {e}")
-    except FileNotFoundError:
-        logger.error(
-            "RTSPtoWebRTC executable not found. Ensure Go is installed and the path is correct."
-        )
-    except Exception as e:
-        logger.error(f"An unexpected error occurred: {e}")
+    def _fail(self, message):
+        logger.error(message)
+        self.last_error = message
+        self.state = "failed"
+
+    def status(self):
+        """Current state of the server process, for the status API."""
+        process = self.process
+        running = self.state == "running" and process is not None and process.poll() is None
+        return {
+            "state": self.state,
+            "pid": process.pid if running else None,
+            "uptime": time.time() - self.started_at if running else None,
+            "restarts": self.restarts,
+            "last_exit_code": self.last_exit_code,
+            "last_error": self.last_error,
+            "binary": self.binary,
+        }
+
+    def stop(self, timeout=5.0):
+        """Stop supervising and terminate the server, killing it if it does not exit in time."""
+        self._stop.set()
+        with self._lock:
+            process = self.process
+        if process is not None and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        self.state = "stopped"
+
+
+def start_rtsp_to_webrtc():
+    """Run the RTSPtoWebRTC server under supervision until interrupted."""
+    supervisor = WebRTCSupervisor()
+    supervisor.start()
+    try:
+        while supervisor._thread.is_alive():
+            supervisor._thread.join(timeout=1.0)
     except KeyboardInterrupt:
         logger.info("Keyboard interrupt received, stopping RTSPtoWebRTC server.")
     finally:
-        if process:
-            process.terminate()
+        supervisor.stop()
+
+
+class StreamConfigManager:
+    """Stream entries of the RTSPtoWebRTC server, kept in memory and written in batches.
+
+    Changes are written to config.json with one atomic replace per batch and pushed to
+    the running server through its stream API, so new cameras appear without a restart.
+    The file is still what the server loads when it (re)starts.
+
+    Example usage:
+        streams = StreamConfigManager()
+        with streams.batch(push=False):  # server not started yet
+            streams.clear()
+            streams.add(1, "192.168.0.90")
+    """
+
+    def __init__(self, config_file=CONFIG_FILE, server_url=RTSP_TO_WEBRTC_URL, session=None):
+        """Load the config file.
+
+        Args:
+            config_file: RTSPtoWebRTC config.json.
+            server_url: Base URL of the running server's HTTP API.
+            session: requests.Session for pushing changes, a new one by default.
+        """
+        self.config_file = config_file
+        self.server_url = server_url.rstrip("/")
+        self.session = session or requests.Session()
+        self._lock = threading.RLock()
+        self._push_lock = threading.Lock()  # Serializes pushes, which run without self._lock
+        self._config = self._load()
+        self._pending = {}  # stream name -> new entry, or None if removed
+        self._batch_depth = 0
+        self._push = True
+
+    def _load(self):
+        if not os.path.exists(self.config_file):
+            logger.error("Config file not found")
+            return None
+        with open(self.config_file, "r") as f:
+            config = json.load(f)
+        config["streams"] = config.get("streams") or {}
+        return config
+
+    @property
+    def streams(self):
+        """Copy of the current stream entries by name."""
+        with self._lock:
+            return dict(self._config["streams"]) if self._config is not None else {}
+
+    def add(self, cam_id, cam_ip, cam_username="student", cam_password="student_pass"):
+        """Add or update the stream entry of a camera."""
+        entry = {
+            "on_demand": False,
+            "disable_audio": True,
+            "url": f"rtsp://{cam_username}:{cam_password}@{cam_ip}/axis-media/media.amp",
+        }
+        self._set(str(cam_id), entry)
+
+    def remove(self, cam_id):
+        """Remove the stream entry of a camera if present."""
+        self._set(str(cam_id), None)
+
+    def clear(self):
+        """Remove all stream entries."""
+        with self.batch():
+            for name in list(self.streams):
+                self._set(name, None)
+
+    def _set(self, name, entry):
+        with self._lock:
+            if self._config is None:
+                return
+            streams = self._config["streams"]
+            if streams.get(name) == entry:
+                return
+            if entry is None:
+                logger.info(f"Removing camera {name} from config file")
+                del streams[name]
+            else:
+                logger.info(f"Adding camera {name} to config file")
+                streams[name] = entry
+            self._pending[name] = entry
+            if self._batch_depth > 0:
+                return
+        self.flush()
+
+    @contextmanager
+    def batch(self, push=True):
+        """Defer writing (and pushing) changes until the outermost batch exits.
+
+        Args:
+            push: Push the batched changes to the running server; False when it is not
+                started yet and will load the file.
+        """
+        with self._lock:
+            self._batch_depth += 1
+            if not push:
+                self._push = False
+        try:
+            yield self
+        finally:
+            changed, push = [], False
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    changed, push = self._write(), self._push
+                    self._push = True
+            if push:
+                self._push_changes(changed)
+
+    def flush(self):
+        """Write pending changes to the config file atomically and push them to the server."""
+        with self._lock:
+            changed, push = self._write(), self._push
+        if push:
+            self._push_changes(changed)
+
+    def _write(self):
+        """Write the config file if anything changed; return the names of the changed streams."""
+        with self._lock:
+            if not self._pending or self._config is None:
+                return []
+            changed, self._pending = list(self._pending), {}
+            tmp = f"{self.config_file}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(self._config, f, indent=4)
+            os.replace(tmp, self.config_file)
+            return changed
+
+    def _push_changes(self, names):
+        """Apply changes to the running server; it loads the file on its next start otherwise.
+
+        Runs without holding the config lock, so a slow server does not block other
+        changes. Pushes are serialized and send each stream's current entry, so the
+        server ends up with the latest state even if changes from several threads
+        overlap. A stream that cannot be updated is logged and the others are still pushed.
+        """
+        with self._push_lock:
+            for name in names:
+                with self._lock:
+                    entry = self._config["streams"].get(name)
+                url = f"{self.server_url}/api/stream/{name}"
+                try:
+                    if entry is None:
+                        response = self.session.delete(url, timeout=PUSH_TIMEOUT)
+                        if response.status_code == 404:
+                            continue
+                    else:
+                        response = self.session.post(url, json=entry, timeout=PUSH_TIMEOUT)
+                    response.raise_for_status()
+                except requests.RequestException as e:
+                    logger.warning(
+                        f"Could not update stream {name} on the running RTSPtoWebRTC server: {e}"
+                    )
+
+
+_stream_config = None
+_stream_config_lock = threading.Lock()
+
+
+def get_stream_config():
+    """Process-wide StreamConfigManager for the RTSPtoWebRTC config file."""
+    global _stream_config
+    with _stream_config_lock:
+        if _stream_config is None:
+            _stream_config = StreamConfigManager()
+        return _stream_config
 
 
 def add_camera_to_config(
     cam_id, cam_ip, cam_username="student", cam_password="student_pass"
 ) -> None:
-    """Add a camera entry to the RTSPtoWebRTC config file if not already present."""
+    """Add or update a camera entry in the RTSPtoWebRTC stream config."""
+    get_stream_config().add(cam_id, cam_ip, cam_username, cam_password)
 
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, "r") as f:
-            config = json.load(f)
 
-        streams = config.get("streams", {})
-        if cam_id not in streams:
-            logger.info(f"Adding camera {cam_id} to config file")
-            streams[cam_id] = {
-                "on_demand": False,
-                "disable_audio": True,
-                "url": f"rtsp://{cam_username}:{cam_password}@{cam_ip}/axis-media/media.amp",
-            }
-            config["streams"] = streams
-            with open(CONFIG_FILE, "w") as f:
-                json.dump(config, f, indent=4)
-    else:
-        logger.error("Config file not found")
-        return
+def remove_camera_from_config(cam_id) -> None:
+    """Remove a camera entry from the RTSPtoWebRTC stream config if present."""
+    get_stream_config().remove(cam_id)
 
 
 def clear_streams():
-    """Remove all stream entries from the RTSPtoWebRTC config file."""
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, "r") as f:
-            config = json.load(f)
-
-        streams = config.get("streams", {})
-        streams = {}
-        config["streams"] = streams
-        with open(CONFIG_FILE, "w") as f:
-            json.dump(config, f, indent=4)
-    else:
-        logger.error("Config file not found")
-        return
+    """Remove all stream entries from the RTSPtoWebRTC stream config."""
+    get_stream_config().clear()
 
 
 if __name__ == "__main__":
@@ -173,13 +173,14 @@ def delete_old_observations(filename: str, minutes: int = 1440) -> None:
 
 
 def create_heatmap(
-    timeframe_min: int, mapmanager, filename: str
+    timeframe_min: int, mapmanager, filename: str, store=None
 ) -> Dict[str, List[Dict]]:
     """Generate a heatmap from observations within a timeframe.
     Args:
         timeframe_min: Time window in minutes (e.g., 60 for last hour).
         mapmanager: Object with convert_to_relative((lat, lon)) -> (u%, v%) method.
         filename: Path to JSON-Lines file with observations.
+        store: HistoryStore to query instead of the file (optional).
     Returns:
         Dictionary with heatmap data (e.g., {"heatmap": [{"x": 1.0, "y": 1.0, "intensity": 0.5}]}).
     Raises:
@@ -188,9 +189,13 @@ def create_heatmap(
     if timeframe_min <= 0:
         raise ValueError("timeframe_min must be positive")
 
-    delete_old_observations(filename)
     cutoff = datetime.now(timezone.utc) - timedelta(minutes=timeframe_min)
-    observations = read_and_filter_observations(filename, cutoff)
+    if store is not None:
+        # Indexed range query; retention is handled by the store
+        observations = list(store.query(start=cutoff.timestamp()))
+    else:
+        delete_old_observations(filename)
+        observations = read_and_filter_observations(filename, cutoff)
 
     if not observations:
         logger.info("No observations found within timeframe")
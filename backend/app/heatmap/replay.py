@@ -0,0 +1,117 @@
+import json
+import os
+import time
+from typing import Callable, Dict, Iterable, Iterator
+
+from app.heatmap.store import observation_time
+
+"""
+Playback of recorded object positions for incident review.
+
+Everything is a generator chained from the history source to the HTTP response:
+observations are read sequentially (SQLite cursor or JSON-Lines file), grouped
+into frames, paced to the requested speed and serialized as NDJSON, so memory use
+does not depend on the length of the window.
+"""
+
+FRAME_INTERVAL = 0.1  # Seconds of recorded time per replayed frame
+MAX_SPEED = 100.0  # Fastest paced playback; speed 0 streams without pacing
+
+
+def read_file_observations(
+    filename: str, start: float, end: float | None = None
+) -> Iterator[Dict]:
+    """Yield observations between start and end from a JSON-Lines heatmap file, line by line.
+
+    Yields dictionaries in the HistoryStore.query() format (with an epoch "time").
+    """
+    if not os.path.exists(filename):
+        return
+    with open(filename, "r", encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            t = observation_time(record.get("timestamp"), default=-1.0)
+            if t < start or (end is not None and t > end):
+                continue
+            record["time"] = t
+            yield record
+
+
+def read_history(store, filename: str, start: float, end: float | None = None) -> Iterator[Dict]:
+    """Yield recorded observations in a window from the store if enabled, else from the file."""
+    if store is not None:
+        return store.query(start, end)
+    return read_file_observations(filename, start, end)
+
+
+def group_frames(
+    observations: Iterable[Dict], interval: float = FRAME_INTERVAL
+) -> Iterator[Dict]:
+    """Group time-ordered observations into frames of interval seconds.
+
+    Within a frame only the latest position of each object is kept.
+    """
+    frame_start = None
+    objects: Dict = {}
+    for obs in observations:
+        t = obs["time"]
+        if frame_start is not None and not (frame_start <= t < frame_start + interval):
+            yield {"time": frame_start, "objects": list(objects.values())}
+            objects = {}
+            frame_start = None
+        if frame_start is None:
+            frame_start = t
+        key = obs.get("object_id") or (obs.get("camera_id"), obs.get("track_id"))
+        objects[key] = obs
+    if frame_start is not None:
+        yield {"time": frame_start, "objects": list(objects.values())}
+
+
+def pace(
+    frames: Iterable[Dict],
+    speed: float,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+) -> Iterator[Dict]:
+    """Release frames at speed times their recorded rate (speed <= 0: no delay)."""
+    first_time = None
+    started = None
+    for frame in frames:
+        if speed > 0:
+            if first_time is None:
+                first_time, started = frame["time"], clock()
+            delay = (frame["time"] - first_time) / speed - (clock() - started)
+            if delay > 0:
+                sleep(delay)
+        yield frame
+
+
+def to_ndjson(frames: Iterable[Dict], convert: Callable[[float, float], tuple]) -> Iterator[str]:
+    """Serialize frames as NDJSON lines with map-relative object positions.
+
+    Args:
+        frames: Frames from group_frames().
+        convert: Maps (latitude, longitude) to relative (x, y), e.g. MapManager.convert_to_relative.
+    """
+    for frame in frames:
+        objects = []
+        for obs in frame["objects"]:
+            geo = obs.get("geoposition") or {}
+            try:
+                x, y = convert((geo["latitude"], geo["longitude"]))
+            except Exception:
+                continue
+            objects.append(
+                {
+                    "id": obs.get("object_id") or obs.get("track_id"),
+                    "cid": obs.get("camera_id"),
+                    "x": x,
+                    "y": y,
+                }
+            )
+        yield json.dumps({"time": frame["time"], "objects": objects}) + "\n"
@@ -0,0 +1,208 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List
+
+from app.logger import get_logger
+
+logger = get_logger("MAIN")
+
+"""
+Optional SQLite store for observation history, used instead of the JSON-Lines
+heatmap file when HISTORY_BACKEND=sqlite.
+
+The database runs in WAL mode so the heatmap writer can insert batches while API
+requests read. Observations are indexed by time and by object/track ID, so
+time-window and per-track queries only touch the matching rows, and retention is
+a single range delete.
+"""
+
+HISTORY_BACKEND = os.getenv("HISTORY_BACKEND", "jsonl")  # "jsonl" or "sqlite"
+HISTORY_DB = os.getenv(
+    "HISTORY_DB", os.path.join(os.path.dirname(__file__), "history.db")
+)
+RETENTION = 7 * 24 * 3600.0  # Seconds of history kept
+PRUNE_INTERVAL = 60.0  # Seconds between retention deletes
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    time REAL NOT NULL,
+    timestamp TEXT,
+    object_id TEXT,
+    track_id TEXT,
+    camera_id TEXT,
+    class TEXT,
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS observations_time ON observations (time);
+CREATE INDEX IF NOT EXISTS observations_object ON observations (object_id, time);
+CREATE INDEX IF NOT EXISTS observations_track ON observations (track_id, time);
+"""
+
+COLUMNS = "time, timestamp, object_id, track_id, camera_id, class, latitude, longitude"
+
+
+def observation_time(timestamp: str | None, default: float | None = None) -> float:
+    """Epoch seconds of an ISO 8601 observation timestamp, or default (now) if unparseable."""
+    if isinstance(timestamp, str):
+        try:
+            parsed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            return parsed.timestamp()
+        except ValueError:
+            pass
+    return time.time() if default is None else default
+
+
+class HistoryStore:
+    """Observation history in an SQLite database with time and track indexes.
+
+    Each thread gets its own connection; WAL mode lets readers run alongside the writer.
+
+    Attributes:
+        db_file: Path to the SQLite database.
+        retention: Seconds of history kept by prune().
+    """
+
+    def __init__(self, db_file: str = HISTORY_DB, retention: float = RETENTION):
+        """Open the database, enable WAL and create the schema."""
+        self.db_file = db_file
+        self.retention = retention
+        self._local = threading.local()
+        self._last_prune = 0.0
+        dirpath = os.path.dirname(db_file)
+        if dirpath:
+            os.makedirs(dirpath, exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=10)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def insert_many(self, observations: List, sync: bool = False) -> None:
+        """Insert a batch of Observation records in one transaction.
+
+        Args:
+            observations: Records with a geoposition; others are skipped.
+            sync: Force a full fsync of the commit (synchronous=FULL) instead of WAL's NORMAL.
+        """
+        now = time.time()
+        rows = [
+            (
+                observation_time(obs.timestamp, now),
+                obs.timestamp,
+                obs.object_id,
+                None if obs.track_id is None else str(obs.track_id),
+                None if obs.camera_id is None else str(obs.camera_id),
+                obs.class_type,
+                obs.latitude,
+                obs.longitude,
+            )
+            for obs in observations
+            if obs.has_geoposition
+        ]
+        if not rows:
+            return
+        conn = self._connection()
+        if sync:
+            conn.execute("PRAGMA synchronous=FULL")
+        try:
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO observations ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+        finally:
+            if sync:
+                conn.execute("PRAGMA synchronous=NORMAL")
+
+    def query(
+        self,
+        start: float | None = None,
+        end: float | None = None,
+        object_id: str | None = None,
+        track_id: str | None = None,
+    ) -> Iterator[Dict]:
+        """Yield observations in time order, in the heatmap file's dictionary format.
+
+        Args:
+            start, end: Inclusive epoch-second bounds; None for open-ended.
+            object_id: Only observations of this tracked object.
+            track_id: Only observations with this camera track ID.
+        """
+        clauses, params = [], []
+        if object_id is not None:
+            clauses.append("object_id = ?")
+            params.append(object_id)
+        if track_id is not None:
+            clauses.append("track_id = ?")
+            params.append(str(track_id))
+        if start is not None:
+            clauses.append("time >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("time <= ?")
+            params.append(end)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        cursor = self._connection().execute(
+            f"SELECT {COLUMNS} FROM observations {where} ORDER BY time", params
+        )
+        for t, timestamp, object_id, track_id, camera_id, class_type, lat, lon in cursor:
+            yield {
+                "time": t,
+                "timestamp": timestamp,
+                "object_id": object_id,
+                "track_id": track_id,
+                "camera_id": camera_id,
+                "class": {"type": class_type},
+                "geoposition": {"latitude": lat, "longitude": lon},
+            }
+
+    def delete_before(self, cutoff: float) -> int:
+        """Delete observations older than cutoff (epoch seconds). Returns the number deleted."""
+        conn = self._connection()
+        with conn:
+            return conn.execute("DELETE FROM observations WHERE time < ?", (cutoff,)).rowcount
+
+    def prune(self, now: float | None = None) -> int:
+        """Apply the retention period, at most once per PRUNE_INTERVAL."""
+        now = time.time() if now is None else now
+        if now - self._last_prune < PRUNE_INTERVAL:
+            return 0
+        self._last_prune = now
+        deleted = self.delete_before(now - self.retention)
+        if deleted:
+            logger.debug(f"Pruned {deleted} observations older than {self.retention}s")
+        return deleted
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_store: HistoryStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_history_store() -> HistoryStore | None:
+    """The process-wide HistoryStore if HISTORY_BACKEND is "sqlite", otherwise None."""
+    global _store
+    if HISTORY_BACKEND != "sqlite":
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = HistoryStore()
+        return _store
@@ -0,0 +1,165 @@
+import json
+import os
+import threading
+import time
+from typing import List
+
+from app.logger import get_logger
+
+logger = get_logger("MAIN")
+
+"""
+Background writer for heatmap observations.
+
+Records are handed over in memory and appended to the JSON-Lines heatmap file (or
+inserted into a HistoryStore) by a dedicated thread, which group-commits everything
+pending in one write once the batch is full or the flush interval has passed. The
+ingest path never touches the disk.
+
+fsync policies (with a HistoryStore, "never" and "interval" rely on WAL's
+synchronous=NORMAL and the final commit on close is a full sync):
+    never     leave durability to the OS page cache (fastest)
+    batch     fsync after every group commit
+    interval  fsync at most every FSYNC_INTERVAL seconds
+"""
+
+BATCH_SIZE = 100  # Records pending before a group commit is started
+FLUSH_INTERVAL = 5.0  # Seconds before pending records are committed regardless of count
+MAX_PENDING = 10000  # Records held in memory before new ones are dropped (disk stalled)
+FSYNC_POLICIES = ("never", "batch", "interval")
+FSYNC_POLICY = os.getenv("HEATMAP_FSYNC", "interval")
+FSYNC_INTERVAL = 30.0  # Seconds between fsyncs with the "interval" policy
+
+
+class HeatmapWriter:
+    """Group-committing JSON-Lines writer running on its own thread.
+
+    Attributes:
+        filename: Path to the JSON-Lines file; may be changed while running.
+        store: HistoryStore to insert into instead of the file, or None.
+        batch_size: Pending records that trigger a commit.
+        flush_interval: Maximum seconds a record waits before being committed.
+        fsync: One of FSYNC_POLICIES.
+        dropped: Records discarded because MAX_PENDING was reached.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        batch_size: int = BATCH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+        fsync: str = FSYNC_POLICY,
+        fsync_interval: float = FSYNC_INTERVAL,
+        max_pending: int = MAX_PENDING,
+        store=None,
+    ):
+        """Start the writer thread.
+
+        Raises:
+            ValueError: If fsync is not a known policy.
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy {fsync!r}, expected one of {FSYNC_POLICIES}")
+        self.filename = filename
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._pending: List = []
+        self._cond = threading.Condition()
+        self._flush_requested = False
+        self._commits = 0  # Completed commits, for flush() to wait on
+        self._closed = False
+        self._last_fsync = time.monotonic()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, record) -> bool:
+        """Queue a record (anything with to_dict()) for writing. Returns False if it was dropped."""
+        with self._cond:
+            if self._closed:
+                return False
+            if len(self._pending) >= self.max_pending:
+                if self.dropped % 1000 == 0:
+                    logger.warning(f"Heatmap writer behind, dropping records ({self.dropped} so far)")
+                self.dropped += 1
+                return False
+            self._pending.append(record)
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+        return True
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def flush(self, timeout: float | None = 5.0) -> bool:
+        """Commit pending records now and wait for the commit. Returns False on timeout."""
+        with self._cond:
+            if not self._pending or not self._thread.is_alive():
+                return not self._pending
+            target = self._commits + 1
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._commits >= target, timeout)
+
+    def _run(self) -> None:
+        """Wait for a full batch, the flush interval or a flush request, then commit."""
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._closed
+                    or self._flush_requested
+                    or len(self._pending) >= self.batch_size,
+                    self.flush_interval,
+                )
+                batch, self._pending = self._pending, []
+                self._flush_requested = False
+                closed = self._closed
+            if batch:
+                self._commit(batch, sync=closed and self.fsync != "never")
+            with self._cond:
+                self._commits += 1
+                self._cond.notify_all()
+            if closed:
+                if self.store is not None:
+                    self.store.close()
+                return
+
+    def _commit(self, batch: List, sync: bool = False) -> None:
+        """Append a batch to the file with a single write, then fsync per policy (or if sync)."""
+        if self.store is not None:
+            try:
+                self.store.insert_many(batch, sync=sync or self.fsync == "batch")
+                self.store.prune()
+            except Exception as e:
+                logger.error(f"Error inserting {len(batch)} observations into {self.store.db_file}: {e}")
+            return
+        data = "".join(
+            json.dumps(record.to_dict(), ensure_ascii=False) + "\n" for record in batch
+        )
+        try:
+            dirpath = os.path.dirname(self.filename)
+            if dirpath:
+                os.makedirs(dirpath, exist_ok=True)
+            with open(self.filename, "a", encoding="utf-8") as file:
+                file.write(data)
+                file.flush()
+                now = time.monotonic()
+                if sync or self.fsync == "batch" or (
+                    self.fsync == "interval" and now - self._last_fsync >= self.fsync_interval
+                ):
+                    os.fsync(file.fileno())
+                    self._last_fsync = now
+            logger.debug(f"Committed {len(batch)} observations to {self.filename}")
+        except (IOError, OSError) as e:
+            logger.error(f"Error writing {len(batch)} observations to {self.filename}: {e}")
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop accepting records, commit everything pending and stop the thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout=timeout)
@@ -4,16 +4,25 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 
 from app.mqtt.broker import BrokerManager
 from app.mqtt.client import MqttClient
-from app.camera.webrtc import start_rtsp_to_webrtc, clear_streams
+from app.camera.webrtc import WebRTCSupervisor, clear_streams, get_stream_config, remove_camera_from_config
 from app.server import Server
 from app.map.manager import MapManager
 from app.camera.arp_scan import find_cameras
+from app.camera.discovery import CameraDiscovery
 from app.alarms.alarm import AlarmManager
 from app.objects.manager import ObjectManager
+from app.objects.sharding import ShardedTracker
 from app.logger import get_logger
 
 logger = get_logger("MAIN")
 
+# Number of tracker processes; above 1, cameras are split over processes by app.objects.sharding
+TRACKER_SHARDS = int(os.getenv("TRACKER_SHARDS", "1"))
+# Consumer group for running several backend instances against one broker (MQTT shared subscriptions)
+MQTT_GROUP = os.getenv("MQTT_GROUP", "")
+MQTT_GROUP_MEMBER = int(os.getenv("MQTT_GROUP_MEMBER", "0"))
+MQTT_GROUP_MEMBERS = int(os.getenv("MQTT_GROUP_MEMBERS", "1"))
+
 import threading
 
 
@@ -25,29 +34,76 @@ class Application:
         self.running = True
 
         logger.info("Initializing application")
-        clear_streams()
-
-        self.cameras = find_cameras()
+        # Stream entries of all cameras are written once; the server loads them when it starts
+        with get_stream_config().batch(push=False):
+            clear_streams()
+            self.cameras = find_cameras(background_scan=False)
         self.map_manager = MapManager(self.cameras)
         self.alarm_manager = AlarmManager()
-        self.object_manager = ObjectManager(self.map_manager, self.alarm_manager)
         self.broker = BrokerManager()
-        self.mqtt_client = MqttClient(self.object_manager)
+        if TRACKER_SHARDS > 1 and self.cameras:
+            # Shard processes run their own MQTT clients
+            self.mqtt_client = None
+            self.object_manager = ShardedTracker(
+                [camera.id for camera in self.cameras],
+                TRACKER_SHARDS,
+                self.map_manager,
+                self.alarm_manager,
+            )
+        else:
+            self.object_manager = ObjectManager(self.map_manager, self.alarm_manager)
+            self.mqtt_client = MqttClient(
+                self.object_manager,
+                group=MQTT_GROUP or None,
+                member=MQTT_GROUP_MEMBER,
+                members=MQTT_GROUP_MEMBERS,
+                camera_ids=[camera.id for camera in self.cameras] if self.cameras else None,
+            )
 
-        self.webrtc_thread = threading.Thread(target=start_rtsp_to_webrtc, daemon=True)
-        self.webrtc_thread.start()
+        self.webrtc = WebRTCSupervisor()
+        self.webrtc.start()
 
         self.server_thread = threading.Thread(
             target=Server,
-            args=(self.mqtt_client, self.map_manager, self.alarm_manager),
+            args=(self.object_manager, self.map_manager, self.alarm_manager, self.webrtc),
             daemon=True,
         )
         self.server_thread.start()
 
+        # Sweeps the network in the background and adds or retires cameras at runtime
+        self.discovery = CameraDiscovery(
+            self.cameras, self._on_camera_added, self._on_camera_removed
+        )
+
+    def _on_camera_added(self, camera):
+        """Start using a camera discovered at runtime."""
+        self.map_manager.add_camera(camera)
+        if self.mqtt_client is None:
+            logger.warning(
+                f"Camera {camera.id} is not routed to a tracker shard until the backend is restarted"
+            )
+        else:
+            # Consumer-group members subscribe to the camera if they own it
+            self.mqtt_client.add_camera(camera.id)
+
+    def _on_camera_removed(self, camera):
+        """Stop using a retired camera and drop its tracks."""
+        self.map_manager.remove_camera(camera)
+        remove_camera_from_config(camera.id)
+        if isinstance(self.object_manager, ObjectManager):
+            self.object_manager.purge_camera(str(camera.id))
+
     def stop_application(self):
-        """Stop MQTT client, broker, and mark application as not running."""
+        """Stop MQTT client, object tracking, broker, and mark application as not running."""
         self.running = False
-        self.mqtt_client.stop()
+        self.discovery.stop()
+        if self.mqtt_client is not None:
+            self.mqtt_client.stop()
+        self.object_manager.close()
+        self.alarm_manager.close()
+        for camera in self.cameras or []:
+            camera.close()
+        self.webrtc.stop()
         self.broker.stop()
 
     def run(self):
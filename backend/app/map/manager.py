@@ -1,6 +1,10 @@
 import math
 import os
 import json
+from functools import partial
+from app.camera.bringup import run_parallel
+from app.camera.camera import CAM_TILT_OFFSET
+from app.camera.fingerprint import get_fingerprint_store, settings_fingerprint
 from app.map.map_config_gui import MapConfigGUI
 from app.logger import get_logger
 
@@ -26,6 +30,7 @@ class MapManager:
             camera_geocoords (dict): dictionary of camera geocoordinates in the format {camera_id: (lat, lon)}
         """
         self.cameras = cameras
+        self.fingerprints = get_fingerprint_store()  # Settings last applied to each camera
         self.map_config = self.load_map_config()
         self.update_cameras_configs()
 
@@ -99,20 +104,69 @@ class MapManager:
         except Exception as e:
             logger.error(f"Error loading map config: {str(e)}")
 
-    def update_cameras_configs(self):
-        """Apply geocoordinate, height, and heading settings from map config to camera objects."""
+    def update_cameras_configs(self, force: bool = False, cameras=None):
+        """Apply geocoordinate, height, and heading settings from map config to camera objects.
+
+        Cameras whose settings match the fingerprint of the last applied ones are skipped.
+
+        Args:
+            force: Push settings to every camera even if unchanged.
+            cameras: Cameras to configure, all cameras by default.
+        """
         try:
-            for camera in self.cameras:
+            tasks = []
+            skipped = 0
+            for camera in self.cameras if cameras is None else cameras:
                 if str(camera.id) in self.map_config["cameras"]:
                     cam_settings = self.map_config["cameras"][str(camera.id)]
                     lat = cam_settings["geocoordinates"][0]
                     lon = cam_settings["geocoordinates"][1]
                     height = cam_settings["height"]
                     heading = cam_settings["heading"]
-                    camera.configure_camera(lat, lon, height, heading)
+                    fingerprint = settings_fingerprint(
+                        lat=lat, lon=lon, height=height, heading=heading, tilt_offset=CAM_TILT_OFFSET
+                    )
+                    if not force and self.fingerprints.matches(self._camera_key(camera), fingerprint):
+                        skipped += 1
+                        continue
+                    tasks.append(
+                        (
+                            camera.id,
+                            partial(self._configure_camera, camera, lat, lon, height, heading, fingerprint),
+                        )
+                    )
+            if skipped:
+                logger.info(f"Skipped configuring {skipped} cameras with unchanged settings")
+            # Configure all cameras concurrently, bounded by a per-camera timeout
+            run_parallel(tasks, action="configure")
         except Exception as e:
             logger.error(f"Error updating camera configurations: {str(e)}")
 
+    @staticmethod
+    def _camera_key(camera) -> str:
+        """Fingerprint key of a camera: its MAC address, or its IP if the MAC is unknown."""
+        return getattr(camera, "mac", None) or camera.ip
+
+    def _configure_camera(self, camera, lat, lon, height, heading, fingerprint):
+        """Configure a camera and record the fingerprint once it succeeded."""
+        camera.configure_camera(lat, lon, height, heading)
+        self.fingerprints.record(self._camera_key(camera), fingerprint)
+
+    def add_camera(self, camera):
+        """Start managing a camera discovered at runtime and apply its map config settings."""
+        self.cameras.append(camera)
+        if str(camera.id) in self.map_config["cameras"]:
+            self.update_cameras_configs(cameras=[camera])
+        else:
+            logger.info(
+                f"Camera {camera.id} is not placed on the map yet, add it with the map config GUI"
+            )
+
+    def remove_camera(self, camera):
+        """Stop managing a retired camera."""
+        if camera in self.cameras:
+            self.cameras.remove(camera)
+
     def get_camera_relative_positions(self):
         """Get the camera positions in relative coordinates."""
         return self.camera_relative_coords
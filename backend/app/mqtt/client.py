@@ -2,7 +2,11 @@ import paho.mqtt.client as mqtt
 import json
 from typing import List, Dict, Any
 from app.logger import get_logger
+from app.mqtt.decoder import FrameDecoder, get_decoder
+from app.mqtt.routing import consumer_group_topic, consumer_group_topics
+from app.mqtt.ingest import IngestQueue
 import logging
+import threading
 import time
 import socket
 
@@ -13,19 +17,66 @@ logger = get_logger("MQTT CLIENT")
 class MqttClient:
     """MQTT client for receiving and processing messages from a broker.
     This class handles the connection to the MQTT broker, subscribes to topics,
-    Hardcoded currently to "axis/frame_metadata" and processes incoming messages.
+    by default "+/frame_metadata", and processes incoming messages.
+
+    In consumer-group mode (group given) the client connects with MQTT v5 and uses
+    shared subscriptions, so several backend instances split the cameras between
+    them instead of each processing every frame.
     """
 
     def __init__(
-        self, object_manager, broker_host="localhost", broker_port=1883, keepalive=60
+        self,
+        object_manager,
+        broker_host="localhost",
+        broker_port=1883,
+        keepalive=60,
+        decoder: FrameDecoder | None = None,
+        topics: List[str] | None = None,
+        group: str | None = None,
+        member: int = 0,
+        members: int = 1,
+        camera_ids: List | None = None,
+        ingest: IngestQueue | None = None,
     ):
-        """Initialize client, set callbacks, and connect to the broker."""
+        """Initialize client, set callbacks, and connect to the broker.
+
+        Args:
+            decoder: Default frame decoder; the fastest available one if not given.
+            topics: Topics to subscribe to, defaults to every camera's frame metadata.
+            group: Consumer group name; enables MQTT v5 shared subscriptions.
+            member: Index of this instance within the group.
+            members: Number of instances in the group.
+            camera_ids: Known cameras, used to route each camera to a single member.
+            ingest: Queue between the network thread and processing, with per-camera
+                decimation and load shedding; a default IngestQueue if not given.
+        """
+        self.group = group
+        self.member = member
+        self.members = members
+        # Cameras are routed to members by ID; otherwise the wildcard covers new cameras
+        self.camera_affinity = bool(group) and camera_ids is not None
+        if group:
+            topics = consumer_group_topics(group, member, members, camera_ids)
+            if camera_ids is None:
+                logger.warning(
+                    "No camera list for consumer group, frames are balanced without camera affinity"
+                )
+        self.topics = ["+/frame_metadata"] if topics is None else topics
+        self.decoder = decoder or get_decoder()
+        self.camera_decoders: Dict[str, FrameDecoder] = {}
         self.broker_host = broker_host
         self.broker_port = broker_port
         self.keepalive = keepalive
-        self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+        self.client = mqtt.Client(
+            mqtt.CallbackAPIVersion.VERSION2,
+            protocol=mqtt.MQTTv5 if group else mqtt.MQTTv311,
+        )
         self.object_manager = object_manager
         self.first_message_received = False
+        self.ingest = ingest or IngestQueue()
+        self._running = True
+        self._worker = threading.Thread(target=self._process_loop, daemon=True)
+        self._worker.start()
         self._setup_callbacks()
         self.start()
 
@@ -47,27 +98,33 @@ class MqttClient:
             f"Connected to MQTT broker at {self.broker_host}:{self.broker_port} with result code: %s",
             reason_code,
         )
-        self.subscribe("+/frame_metadata")
+        for topic in self.topics:
+            self.subscribe(topic)
         # self.subscribe("+/consolidated_metadata")
 
     def _on_message(
         self, client: mqtt.Client, userdata: Any, msg: mqtt.MQTTMessage
     ) -> None:
+        """Hand the frame to the ingest queue; decoding and tracking run on the worker thread."""
+        camera_id = msg.topic.split("/")[0]  # Extract camera ID from topic
+        self.ingest.put(camera_id, msg.payload)
+
+    def _process_loop(self) -> None:
+        """Take frames from the ingest queue and process them until stopped."""
+        while self._running:
+            item = self.ingest.get(timeout=1.0)
+            if item is None:
+                continue
+            camera_id, payload, _ = item
+            self._process_frame(camera_id, payload)
+
+    def _process_frame(self, camera_id: str, payload: bytes) -> None:
         """Dynamic handling of multiple messages
         Stores all detections in a dictionary and only updates its own view of the data
         """
         try:
-            payload = json.loads(msg.payload.decode())
-            observations = payload.get("frame", {}).get("observations", [])
-
-            filtered_observations = []
-            for obs in observations:
-                ob_class = obs.get("class")
-                if ob_class is not None:
-                    if ob_class.get("score") > 0.85:
-                        filtered_observations.append(obs)
-
-            camera_id = msg.topic.split("/")[0]  # Extract camera ID from topic
+            decoder = self.camera_decoders.get(camera_id, self.decoder)
+            filtered_observations = decoder.decode(payload, camera_id)
 
             if not self.first_message_received:
                 logging.getLogger("MAIN").info("\x1b[32;20m" + "SYSTEM READY!")
@@ -78,6 +135,12 @@ class MqttClient:
 
         except (json.JSONDecodeError, ValueError) as e:
             logger.error(f"Error decoding JSON message: {e}")
+        except Exception as e:
+            logger.error(f"Error processing frame from camera {camera_id}: {e}")
+
+    def set_decoder(self, camera_id: str, decoder: FrameDecoder) -> None:
+        """Use a specific decoder (e.g. a different score threshold) for one camera."""
+        self.camera_decoders[str(camera_id)] = decoder
 
     def connect(self) -> None:
         """Establish connection to the MQTT broker."""
@@ -87,6 +150,25 @@ class MqttClient:
         """Subscribe to a MQTT topic with given QoS."""
         self.client.subscribe(topic, qos=qos)
 
+    def add_camera(self, camera_id) -> bool:
+        """Start receiving a camera added at runtime, if routing by camera ID applies.
+
+        In consumer-group mode with camera affinity, the owning member is found with the
+        same rendezvous hash as at startup, so exactly one member subscribes.
+
+        Returns:
+            True if a new subscription was made.
+        """
+        if not self.camera_affinity:
+            return False
+        topic = consumer_group_topic(self.group, self.member, self.members, camera_id)
+        if topic is None or topic in self.topics:
+            return False
+        self.topics.append(topic)  # Also resubscribed on reconnect
+        self.subscribe(topic)
+        logger.info(f"Subscribed to {topic} for camera {camera_id}")
+        return True
+
     def start_background_loop(self) -> None:
         """Start the network loop in a background thread."""
         self.client.loop_start()
@@ -109,9 +191,11 @@ class MqttClient:
         self.client.loop_start()
 
     def stop(self) -> None:
-        """Stop the network loop and disconnect from the broker."""
+        """Stop the network loop, disconnect from the broker and stop processing."""
         self.client.loop_stop()
         self.client.disconnect()
+        self._running = False
+        self.ingest.close()
 
     def get_detections(self, camera_id: int) -> List[Dict]:
         """Retrieve latest detections for a given camera from object manager."""
@@ -0,0 +1,167 @@
+import json
+import time
+from typing import Dict, List
+
+from app.objects.observation import BOUNDING_BOX_KEYS, Observation
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to the standard library parser
+    orjson = None
+
+"""
+Decoders for Axis scene metadata frames received over MQTT.
+
+A decoder parses the raw payload bytes, drops low-confidence detections and keeps
+only the fields the backend uses, as Observation records. Run this module directly to benchmark decoders
+against the original json.loads(payload.decode()) path.
+"""
+
+SCORE_THRESHOLD = 0.85  # Minimum class score for a detection to be tracked
+EMPTY_FRAME_MARKERS = (b'"observations":[]', b'"observations": []')
+
+
+class FrameDecoder:
+    """Decode frame metadata with the standard library json module.
+
+    json.loads accepts bytes directly, which avoids the extra copy made by
+    decoding the payload to a str first.
+    """
+
+    name = "json"
+
+    def __init__(self, score_threshold: float = SCORE_THRESHOLD):
+        """Initialize with the minimum class score to keep."""
+        self.score_threshold = score_threshold
+
+    def loads(self, payload: bytes):
+        """Parse a JSON document from bytes."""
+        return json.loads(payload)
+
+    def decode(self, payload: bytes, camera_id=None) -> List[Observation]:
+        """Parse a frame payload and return its filtered, trimmed observations.
+
+        Args:
+            payload: Raw MQTT message payload.
+            camera_id: Camera the frame came from, stored on each observation.
+
+        Returns:
+            List of Observation records.
+
+        Raises:
+            ValueError: If the payload is not valid JSON.
+        """
+        # Frames without detections are common; skip parsing them entirely
+        if any(marker in payload for marker in EMPTY_FRAME_MARKERS):
+            return []
+
+        frame = self.loads(payload).get("frame", {})
+        result = []
+        for obs in frame.get("observations", []):
+            ob_class = obs.get("class")
+            if ob_class is None:
+                continue
+            score = ob_class.get("score")
+            if score is None or score <= self.score_threshold:
+                continue
+            geoposition = obs.get("geoposition") or {}
+            box = obs.get("bounding_box")
+            result.append(
+                Observation(
+                    camera_id,
+                    obs.get("track_id"),
+                    obs.get("timestamp"),
+                    ob_class.get("type"),
+                    score,
+                    geoposition.get("latitude"),
+                    geoposition.get("longitude"),
+                    tuple(box.get(key) for key in BOUNDING_BOX_KEYS) if box else None,
+                )
+            )
+        return result
+
+
+class OrjsonDecoder(FrameDecoder):
+    """Decode frame metadata with orjson, typically several times faster than json."""
+
+    name = "orjson"
+
+    def loads(self, payload: bytes):
+        """Parse a JSON document from bytes with orjson."""
+        return orjson.loads(payload)
+
+
+DECODERS = {FrameDecoder.name: FrameDecoder}
+if orjson is not None:
+    DECODERS[OrjsonDecoder.name] = OrjsonDecoder
+
+
+def get_decoder(name: str | None = None, **kwargs) -> FrameDecoder:
+    """Return a decoder instance by name, defaulting to the fastest available one.
+
+    Raises:
+        ValueError: If the named decoder is unknown or its library is not installed.
+    """
+    if name is None:
+        name = OrjsonDecoder.name if orjson is not None else FrameDecoder.name
+    if name not in DECODERS:
+        raise ValueError(f"Unknown or unavailable decoder: {name}")
+    return DECODERS[name](**kwargs)
+
+
+def _legacy_decode(payload: bytes, score_threshold: float = SCORE_THRESHOLD) -> List[Dict]:
+    """The original MqttClient decode path, kept for benchmarking."""
+    frame = json.loads(payload.decode())
+    observations = frame.get("frame", {}).get("observations", [])
+    return [
+        obs
+        for obs in observations
+        if obs.get("class") is not None and obs["class"].get("score") > score_threshold
+    ]
+
+
+def _sample_payload(n_observations: int) -> bytes:
+    """Build a frame resembling Axis scene metadata with n observations."""
+    observation = {
+        "bounding_box": {"bottom": 0.6, "left": 0.45, "right": 0.55, "top": 0.4},
+        "class": {
+            "lower_clothing_colors": [{"name": "Blue", "score": 0.8}],
+            "score": 0.95,
+            "type": "Human",
+            "upper_clothing_colors": [{"name": "White", "score": 0.75}],
+        },
+        "geoposition": {"latitude": 59.32415, "longitude": 18.0704},
+        "timestamp": "2025-05-16T21:34:00.123456Z",
+        "track_id": "1234",
+    }
+    frame = {
+        "frame": {
+            "observations": [dict(observation, track_id=str(i)) for i in range(n_observations)],
+            "operations": [],
+            "timestamp": "2025-05-16T21:34:00.123456Z",
+        }
+    }
+    return json.dumps(frame).encode()
+
+
+def benchmark(sizes=(0, 1, 5, 20, 50), iterations: int = 2000) -> None:
+    """Print the mean decode time per frame for each decoder and frame size."""
+    decoders = {"legacy": _legacy_decode}
+    decoders.update({name: get_decoder(name).decode for name in DECODERS})
+    print(f"{'observations':>12} {'bytes':>8} " + " ".join(f"{name:>10}" for name in decoders))
+    for size in sizes:
+        payload = _sample_payload(size)
+        timings = []
+        for decode in decoders.values():
+            start = time.perf_counter()
+            for _ in range(iterations):
+                decode(payload)
+            timings.append((time.perf_counter() - start) / iterations * 1e6)
+        print(
+            f"{size:>12} {len(payload):>8} "
+            + " ".join(f"{t:>8.1f}us" for t in timings)
+        )
+
+
+if __name__ == "__main__":
+    benchmark()
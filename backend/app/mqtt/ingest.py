@@ -0,0 +1,170 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Tuple
+
+from app.logger import get_logger
+from app.objects.lifecycle import TRACK_TTL
+
+logger = get_logger("MQTT CLIENT")
+
+"""
+Ingest queue between the MQTT network thread and frame processing.
+
+Frames are decimated per camera on arrival. Normally they are processed in order;
+when the oldest waiting frame is older than the latency budget the queue switches
+to a "latest-wins" mailbox holding only the newest frame per camera, and switches
+back once it has caught up.
+
+The decimation interval is set with MQTT_FRAME_INTERVAL (seconds, default 0.1) and
+per camera with MQTT_CAMERA_INTERVALS, e.g. "3=0.5,7=0" (0 accepts every frame).
+Intervals are capped at MAX_FRAME_INTERVAL: a camera whose accepted frames are
+further apart than the tracker's TRACK_TTL would have its tracks expire between
+frames and every frame would create new objects.
+"""
+
+
+def parse_camera_intervals(spec: str) -> Dict[str, float]:
+    """Parse "camera=seconds,..." into a camera ID -> interval mapping, skipping invalid entries."""
+    intervals = {}
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        camera_id, _, interval = entry.partition("=")
+        try:
+            intervals[camera_id.strip()] = float(interval)
+        except ValueError:
+            logger.error(f"Ignoring invalid camera frame interval {entry.strip()!r}")
+    return intervals
+
+
+MAX_FRAME_INTERVAL = TRACK_TTL / 2  # Longest decimation interval; tracks survive one lost frame
+
+
+def clamp_interval(interval: float, camera_id=None) -> float:
+    """Cap a decimation interval at MAX_FRAME_INTERVAL, logging a warning when it is lowered."""
+    if interval <= MAX_FRAME_INTERVAL:
+        return interval
+    target = f"camera {camera_id}" if camera_id is not None else "all cameras"
+    logger.warning(
+        f"Frame interval {interval}s for {target} exceeds {MAX_FRAME_INTERVAL}s "
+        f"(half the {TRACK_TTL}s track TTL), using {MAX_FRAME_INTERVAL}s"
+    )
+    return MAX_FRAME_INTERVAL
+
+
+# Seconds between accepted frames per camera (10 fps by default)
+MIN_FRAME_INTERVAL = float(os.getenv("MQTT_FRAME_INTERVAL", "0.1"))
+# Per-camera overrides of MIN_FRAME_INTERVAL
+CAMERA_INTERVALS = parse_camera_intervals(os.getenv("MQTT_CAMERA_INTERVALS", ""))
+LATENCY_BUDGET = 0.5  # Seconds a frame may wait before load shedding starts
+MAX_QUEUE = 1000  # Frames waiting before load shedding starts regardless of age
+
+
+class IngestQueue:
+    """Per-camera decimating frame queue with latest-wins load shedding.
+
+    Attributes:
+        min_interval: Default seconds between accepted frames per camera, at most MAX_FRAME_INTERVAL.
+        camera_intervals: Per-camera overrides of min_interval, CAMERA_INTERVALS by default;
+            capped the same way.
+        latency_budget: Maximum queueing delay before shedding.
+        shedding: True while only the latest frame per camera is kept.
+        decimated: Frames dropped by decimation.
+        dropped: Frames replaced by a newer one while shedding.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = MIN_FRAME_INTERVAL,
+        camera_intervals: Dict[str, float] | None = None,
+        latency_budget: float = LATENCY_BUDGET,
+        max_size: int = MAX_QUEUE,
+    ):
+        self.min_interval = clamp_interval(min_interval)
+        if camera_intervals is None:
+            camera_intervals = CAMERA_INTERVALS
+        self.camera_intervals = {
+            str(k): clamp_interval(v, k) for k, v in camera_intervals.items()
+        }
+        self.latency_budget = latency_budget
+        self.max_size = max_size
+        self.shedding = False
+        self.decimated = 0
+        self.dropped = 0
+        self._fifo: deque = deque()
+        self._latest: "OrderedDict[str, Tuple[object, float]]" = OrderedDict()
+        self._last_accepted: Dict[str, float] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def set_interval(self, camera_id, interval: float) -> None:
+        """Set the decimation interval for one camera (0 accepts every frame, capped at MAX_FRAME_INTERVAL)."""
+        self.camera_intervals[str(camera_id)] = clamp_interval(interval, camera_id)
+
+    def put(self, camera_id: str, payload, now: float | None = None) -> bool:
+        """Offer a frame. Returns False if it was dropped by decimation."""
+        now = time.monotonic() if now is None else now
+        interval = self.camera_intervals.get(camera_id, self.min_interval)
+        last = self._last_accepted.get(camera_id)
+        if last is not None and now - last < interval:
+            self.decimated += 1
+            return False
+        self._last_accepted[camera_id] = now
+
+        with self._cond:
+            if self.shedding:
+                if camera_id in self._latest:
+                    self.dropped += 1
+                    del self._latest[camera_id]
+                self._latest[camera_id] = (payload, now)
+            else:
+                self._fifo.append((camera_id, payload, now))
+                if len(self._fifo) > self.max_size or now - self._fifo[0][2] > self.latency_budget:
+                    self._start_shedding()
+            self._cond.notify()
+        return True
+
+    def _start_shedding(self) -> None:
+        """Collapse the FIFO into the mailbox, keeping only the newest frame per camera."""
+        self.shedding = True
+        for camera_id, payload, received_at in self._fifo:
+            if camera_id in self._latest:
+                self.dropped += 1
+                del self._latest[camera_id]
+            self._latest[camera_id] = (payload, received_at)
+        self._fifo.clear()
+        logger.warning(
+            f"Ingest latency over {self.latency_budget}s, keeping latest frame per camera"
+        )
+
+    def get(self, timeout: float | None = None, now: float | None = None):
+        """Return the next (camera_id, payload, received_at), or None on timeout or close."""
+        with self._cond:
+            if not self._fifo and not self._latest:
+                self._cond.wait_for(lambda: self._fifo or self._latest or self._closed, timeout)
+            now = time.monotonic() if now is None else now
+            if self.shedding and self._latest:
+                # Oldest camera first, so every camera keeps being served
+                camera_id, (payload, received_at) = self._latest.popitem(last=False)
+                if not self._latest and now - received_at <= self.latency_budget:
+                    self.shedding = False
+                    logger.info("Ingest caught up, processing frames in order again")
+                return camera_id, payload, received_at
+            if self._fifo:
+                camera_id, payload, received_at = self._fifo.popleft()
+                if self._fifo and now - self._fifo[0][2] > self.latency_budget:
+                    self._start_shedding()
+                return camera_id, payload, received_at
+            self.shedding = False
+            return None
+
+    def __len__(self) -> int:
+        return len(self._fifo) + len(self._latest)
+
+    def close(self) -> None:
+        """Wake up any waiting consumer so it can exit."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
@@ -0,0 +1,74 @@
+import hashlib
+from typing import Dict, Iterable, List
+
+"""
+Camera-to-worker routing shared by tracker sharding and MQTT consumer groups.
+
+Rendezvous (highest random weight) hashing gives every process the same answer
+without coordination, and only moves the cameras of a removed worker when the
+number of workers changes.
+"""
+
+FRAME_TOPIC = "{camera_id}/frame_metadata"
+
+
+def _weight(camera_id, worker: int) -> int:
+    """Stable pseudo-random weight of a camera/worker pair (Python's hash() is salted per process)."""
+    digest = hashlib.md5(f"{camera_id}:{worker}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def worker_for_camera(camera_id, workers: int) -> int:
+    """Return the index (0..workers-1) of the worker that owns camera_id."""
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    return max(range(workers), key=lambda worker: _weight(str(camera_id), worker))
+
+
+def partition_cameras(camera_ids: Iterable, workers: int) -> Dict[int, List[str]]:
+    """Group camera IDs by owning worker; every worker index is present, possibly empty."""
+    partitions: Dict[int, List[str]] = {worker: [] for worker in range(workers)}
+    for camera_id in camera_ids:
+        partitions[worker_for_camera(camera_id, workers)].append(str(camera_id))
+    return partitions
+
+
+def frame_topics(camera_ids: Iterable) -> List[str]:
+    """Return the frame metadata topics for the given cameras."""
+    return [FRAME_TOPIC.format(camera_id=camera_id) for camera_id in camera_ids]
+
+
+def shared_topic(group: str, topic: str) -> str:
+    """Return the MQTT v5 shared subscription for topic within a consumer group."""
+    return f"$share/{group}/{topic}"
+
+
+def consumer_group_topic(group: str, member: int, members: int, camera_id) -> str | None:
+    """Return the shared subscription for a camera if this member owns it, otherwise None."""
+    if worker_for_camera(camera_id, members) != member:
+        return None
+    return shared_topic(group, FRAME_TOPIC.format(camera_id=camera_id))
+
+
+def consumer_group_topics(
+    group: str, member: int, members: int, camera_ids: Iterable | None = None
+) -> List[str]:
+    """Return the shared subscriptions for one member of a consumer group.
+
+    With known camera IDs, each member subscribes only to the cameras it owns, so a
+    camera's frames always reach the same member. Instances started with the same
+    member index share that member's cameras through the broker. Without camera IDs
+    the broker balances all frames over the group, without camera affinity.
+
+    Args:
+        group: Consumer group name.
+        member: Index of this member (0..members-1).
+        members: Number of members in the group.
+        camera_ids: Cameras to route, or None to subscribe to every camera.
+    """
+    if not 0 <= member < members:
+        raise ValueError(f"member must be in 0..{members - 1}")
+    if camera_ids is None:
+        return [shared_topic(group, FRAME_TOPIC.format(camera_id="+"))]
+    owned = partition_cameras(camera_ids, members)[member]
+    return [shared_topic(group, topic) for topic in frame_topics(owned)]
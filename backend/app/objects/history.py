@@ -0,0 +1,190 @@
+import math
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import List, Tuple
+
+import numpy as np
+
+"""
+Recent trajectory of every tracked object, for the object history API.
+
+Each object keeps time-ordered position arrays, so a time window is found by
+binary search and costs O(points returned). Trajectories outlive the object
+itself (until evicted by newer ones) so the history of a person who just left
+can still be reviewed. Trajectories are downsampled before being served.
+"""
+
+MAX_POINTS_PER_TRACK = 3000  # Positions kept per object (5 minutes at 10 fps)
+MAX_TRACKS = 1000  # Objects with a kept trajectory; least recently updated are evicted
+DEFAULT_MAX_POINTS = 200  # Points returned by the API unless requested otherwise
+DEFAULT_TOLERANCE = 0.2  # meters, Douglas-Peucker tolerance
+EARTH_RADIUS = 6_371_000.0  # meters
+
+Point = Tuple[float, float, float]  # (time, latitude, longitude)
+
+
+class _Trajectory:
+    """Parallel time and position lists of one object, trimmed in chunks."""
+
+    __slots__ = ("times", "points")
+
+    def __init__(self):
+        self.times: List[float] = []
+        self.points: List[Point] = []
+
+
+class TrackHistory:
+    """Per-object position history with O(log n + k) time-window lookups.
+
+    Attributes:
+        max_points: Positions kept per object.
+        max_tracks: Objects kept before the least recently updated one is evicted.
+    """
+
+    def __init__(self, max_points: int = MAX_POINTS_PER_TRACK, max_tracks: int = MAX_TRACKS):
+        self.max_points = max_points
+        self.max_tracks = max_tracks
+        self._tracks: "OrderedDict[str, _Trajectory]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, object_id: str) -> bool:
+        return object_id in self._tracks
+
+    def __len__(self) -> int:
+        return len(self._tracks)
+
+    def append(self, object_id: str, t: float, lat: float, lon: float) -> None:
+        """Record a position. Out-of-order positions are inserted in place; a position with
+        the same time as the newest one is ignored (e.g. a repeated snapshot)."""
+        with self._lock:
+            track = self._tracks.get(object_id)
+            if track is None:
+                track = self._tracks[object_id] = _Trajectory()
+                if len(self._tracks) > self.max_tracks:
+                    self._tracks.popitem(last=False)
+            else:
+                self._tracks.move_to_end(object_id)
+            if track.times and t == track.times[-1]:
+                return
+            if not track.times or t > track.times[-1]:
+                track.times.append(t)
+                track.points.append((t, lat, lon))
+            else:
+                i = bisect_right(track.times, t)
+                track.times.insert(i, t)
+                track.points.insert(i, (t, lat, lon))
+            # Trim a quarter at a time so trimming is amortized O(1) per append
+            if len(track.times) > self.max_points:
+                cut = len(track.times) - self.max_points + self.max_points // 4
+                del track.times[:cut]
+                del track.points[:cut]
+
+    def oldest(self, object_id: str) -> float | None:
+        """Time of the oldest kept position of an object, or None if it has none."""
+        track = self._tracks.get(object_id)
+        return track.times[0] if track is not None and track.times else None
+
+    def window(
+        self, object_id: str, start: float | None = None, end: float | None = None
+    ) -> List[Point]:
+        """Positions of an object between start and end (inclusive), in time order."""
+        with self._lock:
+            track = self._tracks.get(object_id)
+            if track is None:
+                return []
+            lo = 0 if start is None else bisect_left(track.times, start)
+            hi = len(track.times) if end is None else bisect_right(track.times, end)
+            return track.points[lo:hi]
+
+
+def object_history(
+    track_history: TrackHistory,
+    store,
+    object_id: str,
+    start: float | None = None,
+    end: float | None = None,
+) -> List[Point]:
+    """Positions of an object in a time window, from memory or, for windows older than
+    the in-memory trajectory, from the indexed store.
+
+    Args:
+        track_history: In-memory trajectories.
+        store: HistoryStore with the full history, or None.
+        object_id: ID of the tracked object.
+        start, end: Epoch-second bounds; None for open-ended.
+    """
+    oldest = track_history.oldest(object_id)
+    in_memory = oldest is not None and (start is None or start >= oldest)
+    if store is None or in_memory:
+        return track_history.window(object_id, start, end)
+    return [
+        (row["time"], row["geoposition"]["latitude"], row["geoposition"]["longitude"])
+        for row in store.query(start, end, object_id=object_id)
+    ]
+
+
+def _to_meters(points: List[Point]) -> np.ndarray:
+    """(N, 2) east/north meters of points relative to the first one."""
+    arr = np.asarray(points, dtype=float)
+    lat0, lon0 = arr[0, 1], arr[0, 2]
+    scale = math.cos(math.radians(lat0))
+    east = np.radians(arr[:, 2] - lon0) * EARTH_RADIUS * scale
+    north = np.radians(arr[:, 1] - lat0) * EARTH_RADIUS
+    return np.stack([east, north], axis=1)
+
+
+def douglas_peucker(points: List[Point], tolerance: float = DEFAULT_TOLERANCE) -> List[Point]:
+    """Simplify a trajectory, keeping points that deviate more than tolerance meters.
+
+    Iterative, so long trajectories do not hit the recursion limit.
+    """
+    if len(points) < 3:
+        return list(points)
+    xy = _to_meters(points)
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        segment = xy[last] - xy[first]
+        offsets = xy[first + 1 : last] - xy[first]
+        length = np.hypot(*segment)
+        if length == 0:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distances = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / length
+        i = int(np.argmax(distances))
+        if distances[i] > tolerance:
+            index = first + 1 + i
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def time_buckets(points: List[Point], max_points: int) -> List[Point]:
+    """Reduce to at most max_points by averaging positions in equal time buckets."""
+    if len(points) <= max_points:
+        return list(points)
+    arr = np.asarray(points, dtype=float)
+    edges = np.linspace(arr[0, 0], arr[-1, 0], max_points + 1)
+    buckets = np.clip(np.searchsorted(edges, arr[:, 0], side="right") - 1, 0, max_points - 1)
+    counts = np.bincount(buckets, minlength=max_points)
+    sums = np.stack(
+        [np.bincount(buckets, weights=arr[:, col], minlength=max_points) for col in range(3)],
+        axis=1,
+    )
+    filled = counts > 0
+    return [tuple(row) for row in sums[filled] / counts[filled, None]]
+
+
+def downsample(
+    points: List[Point],
+    max_points: int = DEFAULT_MAX_POINTS,
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> List[Point]:
+    """Simplify with Douglas-Peucker, then time-bucket if still over max_points."""
+    return time_buckets(douglas_peucker(points, tolerance), max_points)
@@ -0,0 +1,199 @@
+import math
+from typing import Dict, Hashable, List, Tuple
+
+import numpy as np
+
+"""
+Constant-velocity Kalman filters for all tracked objects, held in NumPy arrays so
+prediction and update run batched per frame.
+
+Positions are converted to a local east/north frame in meters around the first
+position seen (equirectangular projection, accurate at building scale).
+"""
+
+PROCESS_NOISE = 0.5  # Acceleration noise spectral density, (m/s^2)^2 * s
+MEASUREMENT_NOISE = 0.3  # Standard deviation of camera geopositions, meters
+INITIAL_VELOCITY_STD = 1.5  # meters/second, walking speed uncertainty for new tracks
+GATE_CHI2 = 9.21  # Mahalanobis gate, chi-square 2 dof at 99%
+MAX_GATE_DISTANCE = 3.0  # meters, hard cap on the gate for uncertain tracks
+EARTH_RADIUS = 6_371_000.0  # meters
+
+
+class KalmanBank:
+    """Batched constant-velocity Kalman filters keyed by object ID.
+
+    State per track is (east, north, v_east, v_north) at the time of its last update;
+    predictions to a later time are computed on demand without changing the state.
+
+    Attributes:
+        x: (capacity, 4) state vectors.
+        P: (capacity, 4, 4) state covariances.
+        t: (capacity,) time of each state, seconds.
+        slots: Object ID -> row in the arrays.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 64,
+        process_noise: float = PROCESS_NOISE,
+        measurement_noise: float = MEASUREMENT_NOISE,
+    ):
+        self.process_noise = process_noise
+        self.R = np.eye(2) * measurement_noise**2
+        self.x = np.zeros((capacity, 4))
+        self.P = np.zeros((capacity, 4, 4))
+        self.t = np.zeros(capacity)
+        self.slots: Dict[Hashable, int] = {}
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+        self.origin: Tuple[float, float] | None = None
+        self._lon_scale = 1.0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.slots
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    # Coordinate conversion
+
+    def to_local(self, lat, lon) -> np.ndarray:
+        """Convert latitude/longitude (scalars or arrays) to local east/north meters."""
+        if self.origin is None:
+            self.origin = (float(np.mean(lat)), float(np.mean(lon)))
+            self._lon_scale = math.cos(math.radians(self.origin[0]))
+        lat0, lon0 = self.origin
+        east = np.radians(np.asarray(lon, dtype=float) - lon0) * EARTH_RADIUS * self._lon_scale
+        north = np.radians(np.asarray(lat, dtype=float) - lat0) * EARTH_RADIUS
+        return np.stack([east, north], axis=-1)
+
+    def to_geo(self, local: np.ndarray) -> np.ndarray:
+        """Convert local east/north meters (N, 2) back to (N, 2) latitude/longitude."""
+        lat0, lon0 = self.origin
+        lat = lat0 + np.degrees(local[..., 1] / EARTH_RADIUS)
+        lon = lon0 + np.degrees(local[..., 0] / (EARTH_RADIUS * self._lon_scale))
+        return np.stack([lat, lon], axis=-1)
+
+    # Track management
+
+    def _grow(self) -> None:
+        capacity = len(self.t)
+        self.x = np.concatenate([self.x, np.zeros((capacity, 4))])
+        self.P = np.concatenate([self.P, np.zeros((capacity, 4, 4))])
+        self.t = np.concatenate([self.t, np.zeros(capacity)])
+        self._free.extend(range(2 * capacity - 1, capacity - 1, -1))
+
+    def add(self, key: Hashable, lat: float, lon: float, t: float) -> None:
+        """Start a filter at a measured position with zero velocity."""
+        if key in self.slots:
+            self.remove(key)
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        self.slots[key] = slot
+        self.x[slot] = 0.0
+        self.x[slot, :2] = self.to_local(lat, lon)
+        self.P[slot] = np.diag(
+            [self.R[0, 0], self.R[1, 1], INITIAL_VELOCITY_STD**2, INITIAL_VELOCITY_STD**2]
+        )
+        self.t[slot] = t
+
+    def remove(self, key: Hashable) -> None:
+        """Stop tracking a key and free its slot."""
+        slot = self.slots.pop(key, None)
+        if slot is not None:
+            self._free.append(slot)
+
+    # Filtering
+
+    def _predict(self, slots: np.ndarray, t: float | np.ndarray):
+        """Predicted state and covariance for the given slots at time t (state unchanged)."""
+        dt = np.maximum(np.broadcast_to(t, slots.shape) - self.t[slots], 0.0)
+        n = len(slots)
+        F = np.tile(np.eye(4), (n, 1, 1))
+        F[:, 0, 2] = dt
+        F[:, 1, 3] = dt
+        x = self.x[slots].copy()
+        x[:, :2] += x[:, 2:] * dt[:, None]
+
+        q = self.process_noise
+        dt2, dt3 = dt**2 / 2, dt**3 / 3
+        Q = np.zeros((n, 4, 4))
+        Q[:, 0, 0] = Q[:, 1, 1] = q * dt3
+        Q[:, 0, 2] = Q[:, 2, 0] = Q[:, 1, 3] = Q[:, 3, 1] = q * dt2
+        Q[:, 2, 2] = Q[:, 3, 3] = q * dt
+        P = F @ self.P[slots] @ F.transpose(0, 2, 1) + Q
+        return x, P
+
+    def predict(self, keys: List[Hashable], t: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Predict positions for keys at time t, for gating with gate().
+
+        Returns:
+            Tuple of (N, 2) local positions and (N, 2, 2) inverse innovation covariances.
+        """
+        slots = np.array([self.slots[key] for key in keys], dtype=int)
+        if not len(slots):
+            return np.zeros((0, 2)), np.zeros((0, 2, 2))
+        x, P = self._predict(slots, t)
+        return x[:, :2], np.linalg.inv(P[:, :2, :2] + self.R)
+
+    def gate(
+        self,
+        positions: np.ndarray,
+        S_inv: np.ndarray,
+        lat: float,
+        lon: float,
+        allowed: np.ndarray | None = None,
+    ) -> int | None:
+        """Find the predicted track that best explains a measurement.
+
+        Args:
+            positions: (N, 2) predicted local positions, from predict().
+            S_inv: (N, 2, 2) inverse innovation covariances.
+            lat, lon: Measured position.
+            allowed: Optional (N,) boolean mask of candidate tracks.
+
+        Returns:
+            Index of the candidate with the smallest Mahalanobis distance inside the
+            gate, or None if no track is close enough.
+        """
+        if not len(positions):
+            return None
+        residual = self.to_local(lat, lon) - positions
+        d2 = np.einsum("ni,nij,nj->n", residual, S_inv, residual)
+        distance = np.linalg.norm(residual, axis=1)
+        d2[(d2 > GATE_CHI2) | (distance > MAX_GATE_DISTANCE)] = np.inf
+        if allowed is not None:
+            d2[~allowed] = np.inf
+        best = int(np.argmin(d2))
+        return best if np.isfinite(d2[best]) else None
+
+    def update(self, keys: List[Hashable], latlon: np.ndarray, t) -> None:
+        """Predict the given tracks to time t and correct them with measured positions.
+
+        Args:
+            keys: Tracks to update; each key at most once.
+            latlon: (N, 2) measured latitude/longitude.
+            t: Measurement time(s), scalar or (N,).
+        """
+        if not keys:
+            return
+        slots = np.array([self.slots[key] for key in keys], dtype=int)
+        x, P = self._predict(slots, t)
+        latlon = np.asarray(latlon, dtype=float).reshape(-1, 2)
+        z = self.to_local(latlon[:, 0], latlon[:, 1])
+
+        S = P[:, :2, :2] + self.R
+        K = P[:, :, :2] @ np.linalg.inv(S)  # (N, 4, 2)
+        x = x + np.einsum("nij,nj->ni", K, z - x[:, :2])
+        P = P - K @ P[:, :2, :]
+
+        self.x[slots] = x
+        self.P[slots] = P
+        self.t[slots] = np.maximum(np.broadcast_to(t, slots.shape), self.t[slots])
+
+    def geopositions(self, keys: List[Hashable]) -> np.ndarray:
+        """Filtered latitude/longitude (N, 2) of the given tracks at their last update."""
+        slots = np.array([self.slots[key] for key in keys], dtype=int)
+        if not len(slots):
+            return np.zeros((0, 2))
+        return self.to_geo(self.x[slots, :2])
@@ -0,0 +1,122 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Set, Tuple
+
+from app.logger import get_logger
+
+logger = get_logger("CAMERA")
+
+"""
+Expiry of camera tracks that have not been observed for a while.
+
+Every (object, camera) pair has a last-seen time and one pending deadline in a
+min-heap. Observations only update the last-seen time; when a deadline comes up
+the sweeper either expires the pair or, if it was seen again in the meantime,
+pushes its new deadline. Cameras that go offline therefore release their objects
+without any per-message scan.
+"""
+
+TRACK_TTL = 1.0  # Seconds a camera may go without reporting an object before its track expires
+
+
+class TrackLifecycle:
+    """Last-seen times and a deadline heap for (object, camera) tracks, with a sweeper thread.
+
+    Attributes:
+        ttl: Seconds after the last observation before a track expires.
+        on_expire: Called from the sweeper thread with the list of expired keys.
+        last_seen: Key -> monotonic time of its last observation.
+    """
+
+    def __init__(
+        self,
+        on_expire: Callable[[List[Tuple[Hashable, Hashable]]], None],
+        ttl: float = TRACK_TTL,
+        start: bool = True,
+    ):
+        """Create the heap and, unless start is False, start the sweeper thread."""
+        self.ttl = ttl
+        self.on_expire = on_expire
+        self.last_seen: Dict[Tuple[Hashable, Hashable], float] = {}
+        self._heap: List[tuple] = []
+        self._pending: Set[Tuple[Hashable, Hashable]] = set()
+        self._counter = itertools.count()  # Tie-breaker so keys are never compared
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = None
+        if start:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def __len__(self) -> int:
+        return len(self.last_seen)
+
+    def touch(self, obj: Hashable, camera_id: Hashable, now: float | None = None) -> None:
+        """Record that a camera observed an object."""
+        now = time.monotonic() if now is None else now
+        key = (obj, camera_id)
+        with self._cond:
+            self.last_seen[key] = now
+            if key not in self._pending:
+                self._push(key, now + self.ttl)
+
+    def is_live(self, obj: Hashable, camera_id: Hashable) -> bool:
+        """Return True if the track has been observed and not expired or forgotten."""
+        return (obj, camera_id) in self.last_seen
+
+    def forget(self, obj: Hashable, camera_id: Hashable) -> None:
+        """Drop a track without expiring it; its heap entry is discarded lazily."""
+        with self._cond:
+            self.last_seen.pop((obj, camera_id), None)
+
+    def _push(self, key: tuple, deadline: float) -> None:
+        wakes_sweeper = not self._heap or deadline < self._heap[0][0]
+        heapq.heappush(self._heap, (deadline, next(self._counter), key))
+        self._pending.add(key)
+        if wakes_sweeper:
+            self._cond.notify()
+
+    def expire(self, now: float | None = None) -> List[Tuple[Hashable, Hashable]]:
+        """Pop all deadlines up to now and return the keys that actually expired."""
+        now = time.monotonic() if now is None else now
+        expired = []
+        with self._cond:
+            while self._heap and self._heap[0][0] <= now:
+                _, _, key = heapq.heappop(self._heap)
+                self._pending.discard(key)
+                last = self.last_seen.get(key)
+                if last is None:
+                    continue  # Forgotten
+                if last + self.ttl > now:
+                    self._push(key, last + self.ttl)  # Seen again since this deadline was set
+                else:
+                    del self.last_seen[key]
+                    expired.append(key)
+        return expired
+
+    def _run(self) -> None:
+        """Sleep until the earliest deadline, expire tracks and hand them to on_expire."""
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+                if timeout is None or timeout > 0:
+                    self._cond.wait(timeout)
+                    continue
+            expired = self.expire()
+            if expired:
+                try:
+                    self.on_expire(expired)
+                except Exception as e:
+                    logger.error(f"Error expiring {len(expired)} tracks: {e}")
+
+    def stop(self) -> None:
+        """Stop the sweeper thread."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
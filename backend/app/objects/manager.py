@@ -1,48 +1,54 @@
-import json
+import math
 import os
+import threading
 import time
 import uuid
-from datetime import datetime, timezone
 from typing import Dict, List, Set
 
-from geopy.distance import geodesic
+import numpy as np
 
 from app.alarms.alarm import AlarmManager
+from app.alarms.rules import ZoneMembership
+from app.heatmap.store import get_history_store, observation_time
+from app.heatmap.writer import HeatmapWriter
 from app.logger import get_logger
+from app.objects.history import TrackHistory, object_history
+from app.objects.kalman import KalmanBank
+from app.objects.lifecycle import TRACK_TTL, TrackLifecycle
+from app.objects.observation import Observation
 
 logger = get_logger("CAMERA")
 
 # Configuration for heatmap_data.json write optimization
-BATCH_SIZE = 100  # Number of observations to buffer before writing
-FLUSH_INTERVAL = 5.0  # Seconds between forced buffer flushes
 MIN_HEATMAP_INTERVAL = 0.1  # Minimum seconds between writes per object
+HEATMAP_DATA_FILE = os.path.join(os.path.dirname(__file__), "..", "heatmap", "heatmap_data.json")
 
 
 class GlobalObject:
     """Represents an object tracked across multiple cameras with a unique ID."""
 
-    def __init__(self, initial_observation: Dict, camera_id: int):
+    def __init__(self, initial_observation: Observation, camera_id: int):
         """Initialize with an observation and camera ID."""
         self.id = str(uuid.uuid4())
-        self.observations: List[Dict] = [initial_observation]
+        self.observations: List[Observation] = [initial_observation]
         self.cameras: Set[int] = {camera_id}
         self.last_heatmap_write: float = 0.0  # Timestamp of last heatmap write
+        self.zones = ZoneMembership()  # Alarm zones this object is in, for rule evaluation
+        self.tracks: Dict[int, str] = {}  # camera_id -> camera track_id currently bound to this object
 
-    def add_observation(self, observation: Dict, camera_id: int) -> None:
+    def add_observation(self, observation: Observation, camera_id: int) -> None:
         """Add an observation and update associated cameras, only if newer and position changed."""
         last_obs = self.observations[-1]
-        last_obs_time = last_obs.get("timestamp")
-        new_obs_time = observation.get("timestamp")
+        last_obs_time = last_obs.timestamp
+        new_obs_time = observation.timestamp
         if new_obs_time is not None and last_obs_time is not None:
             if new_obs_time <= last_obs_time:
                 return  # Do not add if not newer
 
         # Only add if geoposition has changed
-        last_geo = last_obs.get("geoposition", {})
-        new_geo = observation.get("geoposition", {})
         if (
-            last_geo.get("latitude") == new_geo.get("latitude")
-            and last_geo.get("longitude") == new_geo.get("longitude")
+            last_obs.latitude == observation.latitude
+            and last_obs.longitude == observation.longitude
         ):
             return  # Do not add if position is unchanged
 
@@ -53,124 +59,235 @@ class GlobalObject:
 class ObjectManager:
     """Manages global object tracking across cameras, handling observations and geopositions.
 
-    Matches observations to existing objects, uses last known geopositions when missing,
-    and archives objects no longer observed. Buffers heatmap observations to reduce disk I/O.
+    Continuing camera tracks are resolved through a (camera_id, track_id) index; only new
+    tracks are matched to existing objects (e.g. cross-camera handoff), by gating against
+    each object's constant-velocity Kalman prediction so fast movers and dropped frames
+    do not spawn new objects. Uses last known geopositions when missing. A camera's
+    track of an object expires once the camera has not reported it for track_ttl
+    seconds, and objects are archived when no camera tracks them any more.
+    Heatmap observations are sampled per object and written by a background HeatmapWriter.
 
     Attributes:
-        objects: List of currently tracked GlobalObject instances.
+        objects: Object ID -> currently tracked GlobalObject.
+        _by_camera: camera_id -> {object ID: GlobalObject} of objects the camera currently tracks.
+        _tracks: (camera_id, track_id) -> GlobalObject index of bound camera tracks.
+        filters: Kalman filters of all objects, keyed by object ID.
+        lifecycle: Last-seen times of (GlobalObject, camera_id) tracks and their expiry sweeper.
+        track_history: Recent trajectory of every object, for the history API.
         map_manager: MapManager instance for coordinate conversions.
         alarm_manager: AlarmManager instance for triggering alarms.
         heatmap_data_file: Path to heatmap data file.
-        _observation_buffer: Buffer for batching heatmap observations.
-        _last_flush_time: Timestamp of last buffer flush.
+        heatmap_writer: Background writer appending sampled observations to heatmap_data_file,
+            or to the SQLite history store when HISTORY_BACKEND=sqlite; None if not recording.
     """
 
-    def __init__(self, map_manager, alarm_manager: AlarmManager):
-        """Initialize with map and alarm managers."""
-        self.objects: List[GlobalObject] = []
+    def __init__(
+        self,
+        map_manager,
+        alarm_manager: AlarmManager | None,
+        track_ttl: float = TRACK_TTL,
+        record_heatmap: bool = True,
+    ):
+        """Initialize with map and alarm managers and start the track expiry sweeper.
+
+        alarm_manager may be None and record_heatmap False when alarms and heatmap
+        observations are handled elsewhere (see app.objects.sharding).
+        """
+        self._lock = threading.RLock()  # Ingest and the expiry sweeper both modify objects
+        self.lifecycle = TrackLifecycle(self._expire_tracks, track_ttl)
+        self.objects: Dict[str, GlobalObject] = {}
+        self._by_camera: Dict[int, Dict[str, GlobalObject]] = {}
+        self._tracks: Dict[tuple, GlobalObject] = {}
+        self.filters = KalmanBank()
+        self.track_history = TrackHistory()
         self.map_manager = map_manager
         self.alarm_manager = alarm_manager
-        self.heatmap_data_file = os.path.join(
-            os.path.dirname(__file__), "..", "heatmap", "heatmap_data.json"
+        self.heatmap_writer = (
+            HeatmapWriter(HEATMAP_DATA_FILE, store=get_history_store()) if record_heatmap else None
         )
-        self._observation_buffer: List[Dict] = []
-        self._last_flush_time: float = time.time()
-
-    @staticmethod
-    def check_if_same_observation(obs1: dict, obs2: dict) -> bool:
-        """Checks if two different observations are of the same object.
-        Same if geocoords are max 1 m apart and clothing colors match.
-        """
-        max_distance = 1 # meters
-
-        obs1_coords = obs1.get("geoposition", {})
-        obs2_coords = obs2.get("geoposition", {})
-
-        obs1_coords = (obs1_coords.get("latitude"), obs1_coords.get("longitude"))
-        obs2_coords = (obs2_coords.get("latitude"), obs2_coords.get("longitude"))
-
-        geodesic_distance = geodesic(obs1_coords, obs2_coords).meters
-
-        if geodesic_distance > max_distance:
-            return False
-
-        return True
 
-    def _flush_buffer(self) -> None:
-        """Write buffered observations to heatmap_data.json and clear buffer."""
-        if not self._observation_buffer:
-            return
+    @property
+    def heatmap_data_file(self) -> str | None:
+        return self.heatmap_writer.filename if self.heatmap_writer else None
 
-        try:
-            with open(self.heatmap_data_file, "a", encoding="utf-8") as file:
-                for observation in self._observation_buffer:
-                    file.write(json.dumps(observation, ensure_ascii=False) + "\n")
-            logger.debug(
-                f"Flushed {len(self._observation_buffer)} observations to {self.heatmap_data_file}"
-            )
-        except IOError as e:
-            logger.error(f"Error flushing buffer to {self.heatmap_data_file}: {e}")
-        finally:
-            self._observation_buffer.clear()
-            self._last_flush_time = time.time()
+    @heatmap_data_file.setter
+    def heatmap_data_file(self, filename: str) -> None:
+        if self.heatmap_writer:
+            self.heatmap_writer.filename = filename
 
     def _save_observations(
-        self, observations: List[Dict], obj: GlobalObject | None = None
+        self, observations: List[Observation], obj: GlobalObject | None = None
     ) -> None:
-        """Buffer observations for heatmap, writing when batch size or time interval is reached.
+        """Queue observations for the heatmap file.
 
         Args:
-            observations: List of observation dictionaries.
+            observations: List of observations.
             obj: Associated GlobalObject for time-based sampling (optional).
         """
+        if self.heatmap_writer is None:
+            return
         current_time = time.time()
 
         for observation in observations:
             # Skip if observation lacks valid geoposition
-            if not self._is_valid_geoposition(observation.get("geoposition", {})):
+            if not observation.has_geoposition:
                 continue
 
             # Apply time-based sampling if associated with a GlobalObject
             if obj and (current_time - obj.last_heatmap_write) < MIN_HEATMAP_INTERVAL:
                 continue
 
-            self._observation_buffer.append(observation)
+            self.heatmap_writer.write(observation)
             if obj:
                 obj.last_heatmap_write = current_time
 
-        # Flush buffer if size or time interval exceeded
-        if (
-            len(self._observation_buffer) >= BATCH_SIZE
-            or (current_time - self._last_flush_time) >= FLUSH_INTERVAL
-        ):
-            self._flush_buffer()
-
-    def _is_valid_geoposition(self, geoposition: Dict) -> bool:
-        """Check if geoposition has non-null latitude and longitude."""
-        return (
-            isinstance(geoposition, dict)
-            and geoposition.get("latitude") is not None
-            and geoposition.get("longitude") is not None
-        )
-
-    def _get_last_geoposition(self, obj: GlobalObject) -> Dict | None:
-        """Retrieve the most recent valid geoposition from an object's observations."""
+    def _get_last_geoposition(self, obj: GlobalObject) -> Observation | None:
+        """Retrieve the most recent observation with a valid geoposition of an object."""
         for observation in reversed(obj.observations):
-            if self._is_valid_geoposition(observation.get("geoposition", {})):
-                return observation["geoposition"]
+            if observation.has_geoposition:
+                return observation
         return None
 
-    def _trigger_alarms(self, geoposition: Dict) -> None:
-        """Convert geoposition to relative coordinates and check alarms."""
+    def _trigger_alarms(self, updates: List[tuple]) -> None:
+        """Convert a frame's geopositions to relative coordinates and evaluate alarm rules per object.
+
+        Args:
+            updates: (GlobalObject, Observation) pairs for objects updated in this frame.
+        """
+        if not updates or self.alarm_manager is None:
+            return
         try:
-            relative_pos = self.map_manager.convert_to_relative(
-                (geoposition["latitude"], geoposition["longitude"])
-            )
-            self.alarm_manager.check_alarms(relative_pos)
+            tracks = [
+                (
+                    obj.id,
+                    obj.zones,
+                    self.map_manager.convert_to_relative(
+                        (observation.latitude, observation.longitude)
+                    ),
+                )
+                for obj, observation in updates
+            ]
+            self.alarm_manager.update_tracks(tracks, time.time())
         except Exception as e:
-            logger.error(f"Error triggering alarms for geoposition {geoposition}: {e}")
+            logger.error(f"Error triggering alarms for {len(updates)} objects: {e}")
+
+    def _bind_track(self, obj: GlobalObject, camera_id: int, track_id) -> None:
+        """Bind a camera track to an object, replacing the camera's previous track for it."""
+        if track_id is None:
+            return
+        old_track = obj.tracks.get(camera_id)
+        if old_track is not None and old_track != track_id:
+            self._tracks.pop((camera_id, old_track), None)
+        obj.tracks[camera_id] = track_id
+        self._tracks[(camera_id, track_id)] = obj
+
+    def _add_camera(self, obj: GlobalObject, camera_id: int) -> None:
+        """Mark an object as tracked by a camera."""
+        obj.cameras.add(camera_id)
+        self._by_camera.setdefault(camera_id, {})[obj.id] = obj
+
+    def _remove_camera(self, obj: GlobalObject, camera_id: int) -> None:
+        """Mark an object as no longer tracked by a camera."""
+        obj.cameras.discard(camera_id)
+        camera_objects = self._by_camera.get(camera_id)
+        if camera_objects is not None:
+            camera_objects.pop(obj.id, None)
+            if not camera_objects:
+                del self._by_camera[camera_id]
+
+    def _unbind_camera(self, obj: GlobalObject, camera_id: int) -> None:
+        """Remove the camera's track binding for an object."""
+        track_id = obj.tracks.pop(camera_id, None)
+        if track_id is not None:
+            self._tracks.pop((camera_id, track_id), None)
+
+    @staticmethod
+    def _observation_time(observations: List[Observation]) -> float:
+        """Time of a frame in epoch seconds, from its first parseable timestamp or now.
+
+        Parsed like the history store (naive timestamps are UTC), so in-memory and
+        stored trajectories share one time base.
+        """
+        for observation in observations:
+            parsed = observation_time(observation.timestamp, default=math.nan)
+            if not math.isnan(parsed):
+                return parsed
+        return time.time()
+
+    def _match_object(
+        self, observation: Observation, exclude: Set[str], prediction: tuple
+    ) -> GlobalObject | None:
+        """Find an existing object for an observation without a known track.
+
+        Args:
+            observation: Observation with a valid geoposition.
+            exclude: IDs of objects already matched in this frame.
+            prediction: (objects, positions, inverse covariances) predicted for this frame.
+        """
+        candidates, positions, S_inv = prediction
+        allowed = np.fromiter(
+            (obj.id not in exclude for obj in candidates), dtype=bool, count=len(candidates)
+        )
+        best = self.filters.gate(
+            positions, S_inv, observation.latitude, observation.longitude, allowed
+        )
+        return candidates[best] if best is not None else None
+
+    def _predict_objects(self, t: float) -> tuple:
+        """Predict every object's position at time t, for gating new tracks."""
+        candidates = [obj for obj in self.objects.values() if obj.id in self.filters]
+        positions, S_inv = self.filters.predict([obj.id for obj in candidates], t)
+        return candidates, positions, S_inv
+
+    def _remove_object(self, obj: GlobalObject) -> None:
+        """Stop tracking an object and release its track bindings and filter."""
+        del self.objects[obj.id]
+        for other_camera in list(obj.cameras):
+            self.lifecycle.forget(obj, other_camera)
+            self._remove_camera(obj, other_camera)
+        for other_camera in list(obj.tracks):
+            self._unbind_camera(obj, other_camera)
+        self.filters.remove(obj.id)
+
+    def _expire_tracks(self, expired: List[tuple]) -> None:
+        """Drop expired (GlobalObject, camera_id) tracks and archive objects no camera still sees.
+
+        Called by the lifecycle sweeper thread.
+        """
+        with self._lock:
+            for obj, camera_id in expired:
+                if self.lifecycle.is_live(obj, camera_id):
+                    continue  # Observed again after the sweeper collected it
+                if camera_id not in obj.cameras:
+                    continue
+                self._remove_camera(obj, camera_id)
+                self._unbind_camera(obj, camera_id)
+                if not obj.cameras:
+                    self._remove_object(obj)
+
+    def purge_camera(self, camera_id) -> int:
+        """Drop every track of a retired camera; objects no other camera sees are archived.
+
+        Args:
+            camera_id: ID of the camera as used in its MQTT topic.
+
+        Returns:
+            Number of objects removed.
+        """
+        removed = 0
+        with self._lock:
+            for obj in list(self._by_camera.get(camera_id, {}).values()):
+                self.lifecycle.forget(obj, camera_id)
+                self._remove_camera(obj, camera_id)
+                self._unbind_camera(obj, camera_id)
+                if not obj.cameras:
+                    self._remove_object(obj)
+                    removed += 1
+        return removed
 
-    def add_observations(self, camera_id: int, observations: List[Dict]) -> None:
+    def add_observations(
+        self, camera_id: int, observations: List[Observation | Dict]
+    ) -> None:
         """Add camera observations, matching to existing objects or creating new ones.
 
         Uses last known geoposition for matched observations lacking valid geoposition.
@@ -178,60 +295,117 @@ class ObjectManager:
 
         Args:
             camera_id: ID of the observing camera.
-            observations: List of observation dictionaries.
+            observations: Observations from the frame decoder; dicts in the Axis
+                scene metadata format are converted.
         """
-        prev_seen = {obj.id: obj for obj in self.objects if camera_id in obj.cameras}
+        observations = [
+            Observation.from_dict(observation, camera_id)
+            if isinstance(observation, dict)
+            else observation
+            for observation in observations
+        ]
+        with self._lock:
+            self._add_observations(camera_id, observations)
+
+    def _add_observations(self, camera_id: int, observations: List[Observation]) -> None:
+        """add_observations() body; must be called with the lock held."""
+        now = time.monotonic()
         matched_ids = set()
-        new_observations = []
+        alarm_updates = []
+        frame_time = self._observation_time(observations)
+        prediction = None  # Computed on the first new track of the frame
+        measured: Dict[str, tuple] = {}  # object ID -> (lat, lon) to filter
 
         for observation in observations:
-            observation = observation.copy()
-            observation["camera_id"] = camera_id  # Add for potential use
-            geoposition = observation.get("geoposition", {})
-
-            # Only match with existing objects
-            for obj in self.objects:
-                if ObjectManager.check_if_same_observation(
-                    obj.observations[-1], observation
-                ):
-                    if not self._is_valid_geoposition(geoposition):
-                        geoposition = self._get_last_geoposition(obj) or geoposition
-                        observation["geoposition"] = geoposition
-                    obj.add_observation(observation, camera_id)
-                    matched_ids.add(obj.id)
-                    if self._is_valid_geoposition(observation["geoposition"]):
-                        self._save_observations(
-                            [observation], obj
-                        )  # Buffer with sampling
-                        self._trigger_alarms(observation["geoposition"])
-                    break
+            observation.camera_id = camera_id
+            track_id = observation.track_id
+            measured_position = observation.has_geoposition
+
+            # Continuing track: O(1) lookup, no distance matching
+            obj = self._tracks.get((camera_id, track_id)) if track_id is not None else None
+            if obj is not None and obj.id in matched_ids:
+                obj = None
+            if obj is None and measured_position:
+                # New track: match with existing objects by predicted position
+                if prediction is None:
+                    prediction = self._predict_objects(frame_time)
+                obj = self._match_object(observation, matched_ids, prediction)
+
+            if obj is not None:
+                observation.object_id = obj.id
+                self._bind_track(obj, camera_id, track_id)
+                if not measured_position:
+                    last = self._get_last_geoposition(obj)
+                    if last is not None:
+                        observation.latitude = last.latitude
+                        observation.longitude = last.longitude
+                obj.add_observation(observation, camera_id)
+                self._add_camera(obj, camera_id)  # Also when the observation itself was not stored
+                self.lifecycle.touch(obj, camera_id, now)
+                matched_ids.add(obj.id)
+                if observation.has_geoposition:
+                    self._save_observations(
+                        [observation], obj
+                    )  # Buffer with sampling
+                    alarm_updates.append((obj, observation))
+                if measured_position:
+                    self.track_history.append(
+                        obj.id, frame_time, observation.latitude, observation.longitude
+                    )
+                    if obj.id in self.filters:
+                        measured[obj.id] = (observation.latitude, observation.longitude)
             else:
                 # Create new object if geoposition is valid
-                if self._is_valid_geoposition(geoposition):
-                    new_observations.append(observation)
+                if measured_position:
                     new_obj = GlobalObject(observation, camera_id)
-                    self.objects.append(new_obj)
+                    observation.object_id = new_obj.id
+                    self.objects[new_obj.id] = new_obj
+                    self._add_camera(new_obj, camera_id)
+                    self._bind_track(new_obj, camera_id, track_id)
+                    self.filters.add(
+                        new_obj.id, observation.latitude, observation.longitude, frame_time
+                    )
+                    self.lifecycle.touch(new_obj, camera_id, now)
+                    self.track_history.append(
+                        new_obj.id, frame_time, observation.latitude, observation.longitude
+                    )
                     matched_ids.add(new_obj.id)
                     self._save_observations(
                         [observation], new_obj
                     )  # Buffer with sampling
-                    self._trigger_alarms(geoposition)
+                    alarm_updates.append((new_obj, observation))
                 else:
                     logger.debug(
                         f"Skipping observation without valid geoposition: {observation}"
                     )
                     continue
 
-        # Archive objects no longer observed by this camera
-        for obj_id, obj in prev_seen.items():
-            if obj_id not in matched_ids:
-                obj.cameras.discard(camera_id)
-                if not obj.cameras:
-                    self.objects.remove(obj)
+        self.filters.update(list(measured), list(measured.values()), frame_time)
+        self._trigger_alarms(alarm_updates)
 
-        # Flush remaining buffer if new observations were added
-        if new_observations:
-            self._flush_buffer()
+    def _smoothed_geopositions(self, objects: List[GlobalObject]) -> List[Dict]:
+        """Kalman-filtered geopositions of objects, falling back to the last observation."""
+        filtered = [obj for obj in objects if obj.id in self.filters]
+        smoothed = {
+            obj.id: {"latitude": float(lat), "longitude": float(lon)}
+            for obj, (lat, lon) in zip(
+                filtered, self.filters.geopositions([obj.id for obj in filtered])
+            )
+        }
+        return [
+            smoothed.get(obj.id) or obj.observations[-1].geoposition
+            for obj in objects
+        ]
+
+    def get_object(self, obj_id: str) -> GlobalObject | None:
+        """Get a tracked object by ID, or None if it is not tracked."""
+        return self.objects.get(obj_id)
+
+    def object_count(self, camera_id: int | None = None) -> int:
+        """Number of tracked objects, in total or for one camera."""
+        if camera_id is None:
+            return len(self.objects)
+        return len(self._by_camera.get(camera_id, ()))
 
     def get_objects_by_camera(self, camera_id: int) -> List[Dict]:
         """Get objects observed by a specific camera.
@@ -240,35 +414,75 @@ class ObjectManager:
             camera_id: ID of the camera.
 
         Returns:
-            List of dictionaries with object ID, class, geoposition, and bounding box.
+            List of dictionaries with object ID, class, smoothed geoposition, and bounding box.
         """
+        with self._lock:
+            objects = list(self._by_camera.get(camera_id, {}).values())
+            geopositions = self._smoothed_geopositions(objects)
         return [
             {
                 "id": obj.id,
-                "class": obj.observations[-1].get("class", {}),
-                "geoposition": obj.observations[-1].get("geoposition", {}),
-                "bounding_box": obj.observations[-1].get("bounding_box", {}),
+                "class": obj.observations[-1].object_class,
+                "geoposition": geoposition,
+                "bounding_box": obj.observations[-1].bounding_box,
             }
-            for obj in self.objects
-            if camera_id in obj.cameras
+            for obj, geoposition in zip(objects, geopositions)
         ]
 
     def get_all_objects(self) -> List[Dict]:
         """Get all unique objects across all cameras.
 
         Returns:
-            List of dictionaries with camera ID, object ID, and geoposition.
+            List of dictionaries with camera ID, object ID, and smoothed geoposition.
+        """
+        with self._lock:
+            objects = list(self.objects.values())
+            geopositions = self._smoothed_geopositions(objects)
+        result = []
+        for obj, geoposition in zip(objects, geopositions):
+            result.append({
+                "camera_id": obj.observations[-1].camera_id,
+                "id": obj.id,
+                "geoposition": geoposition,
+            })
+        return result
+
+    def get_object_history(
+        self, obj_id: str, start: float | None = None, end: float | None = None
+    ) -> List[tuple]:
+        """Get an object's (time, latitude, longitude) positions in a time window.
+
+        Args:
+            obj_id: ID of the object, which may no longer be tracked.
+            start, end: Epoch-second bounds; None for open-ended.
+        """
+        store = self.heatmap_writer.store if self.heatmap_writer else None
+        return object_history(self.track_history, store, obj_id, start, end)
+
+    def snapshot(self) -> List[Dict]:
+        """Get the latest state of every tracked object, for merging across tracker processes.
+
+        Returns:
+            List of dictionaries with object ID, cameras, and the last observation's fields.
         """
+        with self._lock:
+            objects = list(self.objects.values())
         result = []
-        for obj in self.objects:
+        for obj in objects:
             last_obs = obj.observations[-1]
             result.append({
-                "camera_id": last_obs.get("camera_id"),
                 "id": obj.id,
-                "geoposition": last_obs.get("geoposition", {}),
+                "camera_id": last_obs.camera_id,
+                "cameras": [str(camera_id) for camera_id in obj.cameras],
+                "class": last_obs.object_class,
+                "geoposition": last_obs.geoposition,
+                "bounding_box": last_obs.bounding_box,
+                "timestamp": last_obs.timestamp,
             })
         return result
 
-    def __del__(self):
-        """Ensure buffer is flushed when ObjectManager is destroyed."""
-        self._flush_buffer()
+    def close(self) -> None:
+        """Stop the track expiry sweeper and write out pending heatmap observations."""
+        self.lifecycle.stop()
+        if self.heatmap_writer:
+            self.heatmap_writer.close()
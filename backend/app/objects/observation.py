@@ -0,0 +1,121 @@
+from typing import Dict
+
+"""
+Compact record for a single detection, produced by the MQTT frame decoders and
+stored per tracked object.
+
+Only the fields the backend uses are kept, in slots rather than nested dicts, so
+long-running trackers hold far less memory per stored observation and the
+ingest path does not copy dictionaries per detection.
+"""
+
+BOUNDING_BOX_KEYS = ("left", "top", "right", "bottom")
+
+
+class Observation:
+    """One detection of an object by a camera.
+
+    Attributes:
+        camera_id: ID of the observing camera, set when the frame is tracked.
+        track_id: The camera's track ID of the object.
+        timestamp: ISO 8601 timestamp string from the camera.
+        class_type: Detected class, e.g. "Human".
+        score: Class confidence score.
+        latitude, longitude: Geoposition, None when the camera could not compute one.
+        bbox: (left, top, right, bottom) in relative image coordinates, or None.
+        object_id: ID of the GlobalObject the observation was assigned to, once tracked.
+    """
+
+    __slots__ = (
+        "camera_id",
+        "track_id",
+        "timestamp",
+        "class_type",
+        "score",
+        "latitude",
+        "longitude",
+        "bbox",
+        "object_id",
+    )
+
+    def __init__(
+        self,
+        camera_id=None,
+        track_id=None,
+        timestamp: str | None = None,
+        class_type: str | None = None,
+        score: float | None = None,
+        latitude: float | None = None,
+        longitude: float | None = None,
+        bbox: tuple | None = None,
+        object_id: str | None = None,
+    ):
+        self.camera_id = camera_id
+        self.track_id = track_id
+        self.timestamp = timestamp
+        self.class_type = class_type
+        self.score = score
+        self.latitude = latitude
+        self.longitude = longitude
+        self.bbox = bbox
+        self.object_id = object_id
+
+    @classmethod
+    def from_dict(cls, data: Dict, camera_id=None) -> "Observation":
+        """Build from an Axis scene metadata observation (or a dict in that format)."""
+        ob_class = data.get("class") or {}
+        geoposition = data.get("geoposition") or {}
+        box = data.get("bounding_box")
+        return cls(
+            camera_id if camera_id is not None else data.get("camera_id"),
+            data.get("track_id"),
+            data.get("timestamp"),
+            ob_class.get("type"),
+            ob_class.get("score"),
+            geoposition.get("latitude"),
+            geoposition.get("longitude"),
+            tuple(box.get(key) for key in BOUNDING_BOX_KEYS) if box else None,
+            data.get("object_id"),
+        )
+
+    @property
+    def has_geoposition(self) -> bool:
+        """True if both latitude and longitude are known."""
+        return self.latitude is not None and self.longitude is not None
+
+    @property
+    def geoposition(self) -> Dict:
+        """Geoposition in the API format, {} if unknown."""
+        if not self.has_geoposition:
+            return {}
+        return {"latitude": self.latitude, "longitude": self.longitude}
+
+    @property
+    def object_class(self) -> Dict:
+        """Class in the API format."""
+        return {"type": self.class_type, "score": self.score}
+
+    @property
+    def bounding_box(self) -> Dict:
+        """Bounding box in the API format, {} if unknown."""
+        if self.bbox is None:
+            return {}
+        return dict(zip(BOUNDING_BOX_KEYS, self.bbox))
+
+    def to_dict(self) -> Dict:
+        """Serialize for the heatmap data file."""
+        return {
+            "camera_id": self.camera_id,
+            "object_id": self.object_id,
+            "track_id": self.track_id,
+            "timestamp": self.timestamp,
+            "class": self.object_class,
+            "geoposition": self.geoposition,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"Observation(camera_id={self.camera_id!r}, track_id={self.track_id!r}, "
+            f"timestamp={self.timestamp!r}, latitude={self.latitude!r}, "
+            f"longitude={self.longitude!r})"
+        )
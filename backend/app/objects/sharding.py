@@ -0,0 +1,307 @@
+import math
+import multiprocessing as mp
+import queue
+import threading
+import time
+from typing import Dict, List
+
+from geopy.distance import geodesic
+
+from app.alarms.rules import ZoneMembership
+from app.heatmap.store import get_history_store, observation_time
+from app.heatmap.writer import HeatmapWriter
+from app.logger import get_logger
+from app.mqtt.routing import frame_topics, partition_cameras
+from app.objects.history import TrackHistory, object_history
+from app.objects.manager import HEATMAP_DATA_FILE, MIN_HEATMAP_INTERVAL, ObjectManager
+from app.objects.observation import Observation
+
+logger = get_logger("TRACKER")
+
+"""
+Multi-process tracking for large camera fleets.
+
+Each shard process owns the frame metadata topics of a subset of cameras and runs
+its own MqttClient and ObjectManager. Shards periodically send a snapshot of their
+object table to the main process, where a merge stage reconciles objects seen by
+cameras in different shards, evaluates alarms, and serves the unified table. The
+heatmap file and history store are only written by the main process, from the
+merged table, so there is a single writer.
+"""
+
+SNAPSHOT_INTERVAL = 0.2  # Seconds between object table snapshots from each shard
+MERGE_DISTANCE = 1.0  # meters, objects from different shards closer than this are one object
+CELL_DEG = MERGE_DISTANCE / 111_320  # Grid cell height in degrees latitude
+
+
+def run_shard_worker(
+    shard: int,
+    topics: List[str],
+    broker_host: str,
+    broker_port: int,
+    snapshots,
+    stop,
+    interval: float = SNAPSHOT_INTERVAL,
+) -> None:
+    """Entry point of a shard process: track the given topics and publish snapshots until stopped."""
+    # Imported here so the parent does not need an MQTT connection to build the tracker
+    from app.mqtt.client import MqttClient
+
+    # Heatmap observations are recorded by the main process from the merged table
+    object_manager = ObjectManager(map_manager=None, alarm_manager=None, record_heatmap=False)
+    client = MqttClient(object_manager, broker_host, broker_port, topics=topics)
+    logger.info(f"Tracker shard {shard} started for topics {topics}")
+    try:
+        while not stop.wait(interval):
+            snapshots.put((shard, object_manager.snapshot()))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.stop()
+        object_manager.close()
+
+
+def _cell(geoposition: Dict) -> tuple | None:
+    """Grid cell of a geoposition; longitude cells are widened to stay >= MERGE_DISTANCE up to ~75 deg latitude."""
+    lat = geoposition.get("latitude")
+    lon = geoposition.get("longitude")
+    if lat is None or lon is None:
+        return None
+    return (math.floor(lat / CELL_DEG), math.floor(lon / (CELL_DEG * 4)))
+
+
+def merge_snapshots(
+    snapshots: Dict[int, List[Dict]], max_distance: float = MERGE_DISTANCE
+) -> List[Dict]:
+    """Combine shard snapshots into one object table.
+
+    Objects from different shards within max_distance of each other are treated as
+    the same physical object (cameras on both sides of a partition boundary): their
+    camera sets are united and the newest observation wins. Candidates are found via
+    a grid of ~max_distance cells, so only neighbouring objects are compared.
+
+    Args:
+        snapshots: Shard index -> list of object dictionaries from ObjectManager.snapshot().
+        max_distance: Maximum distance in meters between objects to merge.
+
+    Returns:
+        List of merged object dictionaries.
+    """
+    merged: List[Dict] = []
+    owners: List[int] = []
+    grid: Dict[tuple, List[int]] = {}
+
+    for shard in sorted(snapshots):
+        for obj in snapshots[shard]:
+            geo = obj.get("geoposition") or {}
+            cell = _cell(geo)
+            match = None
+            if cell is not None:
+                for d_lat in (-1, 0, 1):
+                    for d_lon in (-1, 0, 1):
+                        for index in grid.get((cell[0] + d_lat, cell[1] + d_lon), []):
+                            if owners[index] == shard:
+                                continue
+                            other = merged[index]["geoposition"]
+                            if geodesic(
+                                (geo["latitude"], geo["longitude"]),
+                                (other["latitude"], other["longitude"]),
+                            ).meters <= max_distance:
+                                match = index
+                                break
+                        if match is not None:
+                            break
+                    if match is not None:
+                        break
+
+            if match is None:
+                entry = dict(obj, cameras=list(obj.get("cameras", [])))
+                merged.append(entry)
+                owners.append(shard)
+                if cell is not None:
+                    grid.setdefault(cell, []).append(len(merged) - 1)
+                continue
+
+            entry = merged[match]
+            entry["cameras"] = sorted(set(entry["cameras"]) | set(obj.get("cameras", [])))
+            if (obj.get("timestamp") or "") > (entry.get("timestamp") or ""):
+                for key in ("camera_id", "class", "geoposition", "bounding_box", "timestamp"):
+                    entry[key] = obj.get(key)
+    return merged
+
+
+class ShardedTracker:
+    """Runs tracker shards in separate processes and serves the merged object table.
+
+    Exposes the read interface of ObjectManager used by the Flask server
+    (get_all_objects / get_objects_by_camera / get_object_history) and close().
+
+    Attributes:
+        track_history: Trajectories of the merged objects, for the history API.
+        heatmap_writer: Writer of sampled merged observations to the heatmap file or history store.
+        processes: The shard processes.
+    """
+
+    def __init__(
+        self,
+        camera_ids: List,
+        shards: int,
+        map_manager,
+        alarm_manager,
+        broker_host: str = "localhost",
+        broker_port: int = 1883,
+    ):
+        """Partition cameras over shards, start one process per non-empty shard and the merge thread."""
+        self.map_manager = map_manager
+        self.alarm_manager = alarm_manager
+        self._objects: List[Dict] = []
+        self._snapshots: Dict[int, List[Dict]] = {}
+        self._zones: Dict[str, ZoneMembership] = {}
+        self.track_history = TrackHistory()
+        self.heatmap_writer = HeatmapWriter(HEATMAP_DATA_FILE, store=get_history_store())
+        self._heatmap_written: Dict[str, tuple] = {}  # Object ID -> (write time, observation timestamp)
+
+        ctx = mp.get_context("spawn")  # fork is unsafe with the threads already running here
+        self._queue = ctx.Queue()
+        self._stop_event = ctx.Event()
+        self.processes = []
+        for shard, cameras in partition_cameras(camera_ids, shards).items():
+            if not cameras:
+                continue
+            process = ctx.Process(
+                target=run_shard_worker,
+                args=(shard, frame_topics(cameras), broker_host, broker_port, self._queue, self._stop_event),
+                name=f"tracker-shard-{shard}",
+                daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+            logger.info(f"Started tracker shard {shard} for cameras {cameras}")
+
+        self._merge_thread = threading.Thread(target=self._merge_loop, daemon=True)
+        self._merge_thread.start()
+
+    def _merge_loop(self) -> None:
+        """Collect shard snapshots, merge them and evaluate alarms on the merged table."""
+        while not self._stop_event.is_set():
+            try:
+                shard, objects = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            self._snapshots[shard] = objects
+            # Coalesce everything already queued so a slow merge never falls behind
+            while True:
+                try:
+                    shard, objects = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                self._snapshots[shard] = objects
+
+            try:
+                self._objects = merge_snapshots(self._snapshots)
+                self._record_history(self._objects)
+                self._record_heatmap(self._objects)
+                self._check_alarms(self._objects)
+            except Exception as e:
+                logger.error(f"Error merging tracker snapshots: {e}")
+
+    def _record_history(self, objects: List[Dict]) -> None:
+        """Append the merged objects' latest positions to their trajectories."""
+        for obj in objects:
+            geo = obj.get("geoposition") or {}
+            if geo.get("latitude") is None or geo.get("longitude") is None:
+                continue
+            self.track_history.append(
+                obj["id"], observation_time(obj.get("timestamp")), geo["latitude"], geo["longitude"]
+            )
+
+    def _record_heatmap(self, objects: List[Dict]) -> None:
+        """Queue new positions of the merged objects for the heatmap, sampled per object."""
+        now = time.time()
+        written = {}
+        for obj in objects:
+            geo = obj.get("geoposition") or {}
+            last = self._heatmap_written.get(obj["id"])
+            if last is not None:
+                written[obj["id"]] = last
+            if geo.get("latitude") is None or geo.get("longitude") is None:
+                continue
+            if last is not None and (last[1] == obj.get("timestamp") or now - last[0] < MIN_HEATMAP_INTERVAL):
+                continue
+            ob_class = obj.get("class") or {}
+            self.heatmap_writer.write(
+                Observation(
+                    camera_id=obj.get("camera_id"),
+                    timestamp=obj.get("timestamp"),
+                    class_type=ob_class.get("type"),
+                    score=ob_class.get("score"),
+                    latitude=geo["latitude"],
+                    longitude=geo["longitude"],
+                    object_id=obj["id"],
+                )
+            )
+            written[obj["id"]] = (now, obj.get("timestamp"))
+        self._heatmap_written = written  # Drops objects no longer tracked
+
+    def _check_alarms(self, objects: List[Dict]) -> None:
+        """Evaluate alarm rules for the merged objects, keeping zone state per object ID."""
+        if self.alarm_manager is None:
+            return
+        tracks = []
+        for obj in objects:
+            geo = obj.get("geoposition") or {}
+            if geo.get("latitude") is None or geo.get("longitude") is None:
+                continue
+            zones = self._zones.setdefault(obj["id"], ZoneMembership())
+            tracks.append(
+                (
+                    obj["id"],
+                    zones,
+                    self.map_manager.convert_to_relative((geo["latitude"], geo["longitude"])),
+                )
+            )
+        live = {obj["id"] for obj in objects}
+        for obj_id in [obj_id for obj_id in self._zones if obj_id not in live]:
+            del self._zones[obj_id]
+        self.alarm_manager.update_tracks(tracks, time.time())
+
+    def get_objects_by_camera(self, camera_id) -> List[Dict]:
+        """Get merged objects observed by a specific camera."""
+        camera_id = str(camera_id)
+        return [
+            {
+                "id": obj["id"],
+                "class": obj.get("class", {}),
+                "geoposition": obj.get("geoposition", {}),
+                "bounding_box": obj.get("bounding_box", {}),
+            }
+            for obj in self._objects
+            if camera_id in obj["cameras"]
+        ]
+
+    def get_all_objects(self) -> List[Dict]:
+        """Get all merged objects with camera ID, object ID, and geoposition."""
+        return [
+            {
+                "camera_id": obj.get("camera_id"),
+                "id": obj["id"],
+                "geoposition": obj.get("geoposition", {}),
+            }
+            for obj in self._objects
+        ]
+
+    def get_object_history(
+        self, obj_id: str, start: float | None = None, end: float | None = None
+    ) -> List[tuple]:
+        """Get a merged object's (time, latitude, longitude) positions in a time window."""
+        return object_history(self.track_history, get_history_store(), obj_id, start, end)
+
+    def close(self) -> None:
+        """Signal all shards to stop, wait for them to exit and write out pending heatmap observations."""
+        self._stop_event.set()
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._merge_thread.join(timeout=5)
+        self.heatmap_writer.close()
@@ -1,23 +1,34 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
 from app.heatmap.heatmap import create_heatmap
+from app.heatmap.replay import FRAME_INTERVAL, MAX_SPEED, group_frames, pace, read_history, to_ndjson
+from app.heatmap.store import get_history_store
+from app.objects.history import DEFAULT_MAX_POINTS, DEFAULT_TOLERANCE, downsample
 import os
 import uuid
 from app.logger import get_logger
 import logging
 from app.alarms import mail_sender
+from app.alarms.events import parse_time, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 logger = get_logger("FLASK SERVER")
 
+HEATMAP_DATA_FILE = os.path.join(os.path.dirname(__file__), "heatmap", "heatmap_data.json")
+
 
 class Server:
     """Configure Flask routes for alarms, objects, heatmaps, and map retrieval."""
 
-    def __init__(self, mqtt_client, map_manager, alarm_manager):
-        """Initialize Flask app, CORS, and start server."""
-        self.mqtt_client = mqtt_client
+    def __init__(self, object_manager, map_manager, alarm_manager, webrtc=None):
+        """Initialize Flask app, CORS, and start server.
+
+        object_manager serves the tracked objects: an ObjectManager, or a ShardedTracker
+        when tracking is split over processes.
+        """
+        self.object_manager = object_manager
         self.map_manager = map_manager
         self.alarm_manager = alarm_manager
+        self.webrtc = webrtc  # WebRTCSupervisor of the RTSPtoWebRTC server
 
         self.app = Flask(__name__)
         CORS(self.app)
@@ -44,7 +55,10 @@ class Server:
                 return jsonify({"error": "No alarm zone provided"}), 400
 
             new_alarm["id"] = str(uuid.uuid4())
-            self.alarm_manager.add_alarm(new_alarm)
+            try:
+                self.alarm_manager.add_alarm(new_alarm)
+            except (KeyError, ValueError) as e:
+                return jsonify({"error": f"Invalid alarm zone: {e}"}), 400
             logger.info("Saved new alarm zone: %s", new_alarm.get("id"))
             return (
                 jsonify(
@@ -66,6 +80,35 @@ class Server:
             alarms = self.alarm_manager.get_alarms_file()
             return jsonify({"alarms": alarms})
 
+        @app.route("/api/alarms/events", methods=["GET"])
+        def get_alarm_events():
+            """
+            GET endpoint for the alarm event log, newest first.
+            Query parameters: start, end (epoch seconds or ISO 8601), zone (alarm id, repeatable),
+            offset and limit for pagination.
+            """
+            try:
+                start = parse_time(request.args.get("start"))
+                end = parse_time(request.args.get("end"))
+                offset = int(request.args.get("offset", 0))
+                limit = int(request.args.get("limit", DEFAULT_PAGE_SIZE))
+            except ValueError as e:
+                return jsonify({"error": f"Invalid query parameter: {e}"}), 400
+            events, total = self.alarm_manager.get_events(
+                start, end, request.args.getlist("zone"), offset, limit
+            )
+            return (
+                jsonify(
+                    {
+                        "events": events,
+                        "total": total,
+                        "offset": max(0, offset),
+                        "limit": max(0, min(limit, MAX_PAGE_SIZE)),
+                    }
+                ),
+                200,
+            )
+
         @app.route("/api/alarms/status/<string:alarm_id>", methods=["POST", "PATCH"])
         def status_alarm(alarm_id):
             """
@@ -79,9 +122,9 @@ class Server:
         @app.route("/api/objects/<int:camera_id>", methods=["GET"])
         def get_camera_detections_by_id(camera_id: int):
             """GET endpoint for observations of a specific camera."""
-            if not self.mqtt_client:
-                return jsonify({"message": "MQTT client not available"}), 503
-            raw = self.mqtt_client.object_manager.get_objects_by_camera(camera_id)
+            if not self.object_manager:
+                return jsonify({"message": "Object tracking not available"}), 503
+            raw = self.object_manager.get_objects_by_camera(camera_id)
             observations = []
             for entry in raw:
                 obj_id = entry.get("id")
@@ -96,6 +139,57 @@ class Server:
                 )
             return jsonify({"observations": observations}), 200
 
+        @app.route("/api/objects/<string:obj_id>/history", methods=["GET"])
+        def get_object_history(obj_id: str):
+            """
+            GET endpoint for the downsampled trajectory of an object.
+            Query parameters: start, end (epoch seconds or ISO 8601), max_points and
+            tolerance (meters, Douglas-Peucker simplification).
+            """
+            try:
+                start = parse_time(request.args.get("start"))
+                end = parse_time(request.args.get("end"))
+                max_points = int(request.args.get("max_points", DEFAULT_MAX_POINTS))
+                tolerance = float(request.args.get("tolerance", DEFAULT_TOLERANCE))
+            except ValueError as e:
+                return jsonify({"error": f"Invalid query parameter: {e}"}), 400
+            if max_points <= 0 or tolerance < 0:
+                return jsonify({"error": "max_points must be positive and tolerance non-negative"}), 400
+            points = self.object_manager.get_object_history(obj_id, start, end)
+            if not points:
+                return jsonify({"error": "No history for object"}), 404
+            path = []
+            for t, lat, lon in downsample(points, max_points, tolerance):
+                x, y = self.map_manager.convert_to_relative((lat, lon))
+                path.append({"time": t, "x": x, "y": y})
+            return jsonify({"id": obj_id, "points": path}), 200
+
+        @app.route("/api/replay", methods=["GET"])
+        def replay():
+            """
+            GET endpoint streaming recorded object positions as NDJSON, one frame per line.
+            Query parameters: start (required), end (epoch seconds or ISO 8601), speed
+            (playback rate, 0 for as fast as possible) and interval (seconds per frame).
+            """
+            try:
+                start = parse_time(request.args.get("start"))
+                end = parse_time(request.args.get("end"))
+                speed = float(request.args.get("speed", 1.0))
+                interval = float(request.args.get("interval", FRAME_INTERVAL))
+            except ValueError as e:
+                return jsonify({"error": f"Invalid query parameter: {e}"}), 400
+            if start is None:
+                return jsonify({"error": "start is required"}), 400
+            if end is not None and end < start:
+                return jsonify({"error": "end must not be before start"}), 400
+            if not 0 <= speed <= MAX_SPEED or interval <= 0:
+                return jsonify({"error": f"speed must be 0-{MAX_SPEED} and interval positive"}), 400
+
+            observations = read_history(get_history_store(), HEATMAP_DATA_FILE, start, end)
+            frames = pace(group_frames(observations, interval), speed)
+            lines = to_ndjson(frames, self.map_manager.convert_to_relative)
+            return Response(stream_with_context(lines), mimetype="application/x-ndjson")
+
         @app.route("/map")
         def get_map():
             """Serve the floor plan image file."""
@@ -108,7 +202,7 @@ class Server:
         def get_observations():
             """GET endpoint for all tracked observations across cameras."""
             # retrieve raw position data from ObjectManager
-            raw = self.mqtt_client.object_manager.get_all_objects()
+            raw = self.object_manager.get_all_objects()
             observations = []
             for entry in raw:
                 cam_id = entry.get("camera_id")
@@ -130,6 +224,7 @@ class Server:
                 timeframe,
                 self.map_manager,
                 os.path.join("heatmap", "heatmap_data.json"),
+                store=get_history_store(),
             )
             return jsonify({"heatmap": payload}), 200
 
@@ -141,6 +236,15 @@ class Server:
             cameras = self.map_manager.get_camera_relative_positions()
             return jsonify(cameras), 200
 
+        @app.route("/api/webrtc/status", methods=["GET"])
+        def get_webrtc_status():
+            """
+            GET endpoint for the state of the RTSPtoWebRTC server process.
+            """
+            if self.webrtc is None:
+                return jsonify({"message": "RTSPtoWebRTC server not managed"}), 503
+            return jsonify(self.webrtc.status()), 200
+
     def run(self):
         """Start Flask development server with suppressed default logging."""
         logger.info("Starting Flask server...")
@@ -177,5 +281,5 @@ if __name__ == "__main__":
     mqtt_instance.connect()
     mqtt_instance.start_background_loop()
 
-    server = Server(mqtt_instance, map_instance)
+    server = Server(mqtt_instance.object_manager, map_instance)
     server.run()
@@ -46,6 +46,7 @@ type StreamST struct {
 	RunLock      bool   `json:"-"`
 	Codecs       []av.CodecData
 	Cl           map[string]viewer
+	stop         chan struct{} // closed when the stream is removed or replaced; identifies the entry to its workers
 }
 
 type viewer struct {
@@ -59,15 +60,53 @@ func (element *ConfigST) RunIFNotRun(uuid string) {
 		if tmp.OnDemand && !tmp.RunLock {
 			tmp.RunLock = true
 			element.Streams[uuid] = tmp
-			go RTSPWorkerLoop(uuid, tmp.URL, tmp.OnDemand, tmp.DisableAudio, tmp.Debug)
+			go RTSPWorkerLoop(uuid, tmp.URL, tmp.OnDemand, tmp.DisableAudio, tmp.Debug, tmp.stop)
 		}
 	}
 }
 
-func (element *ConfigST) RunUnlock(uuid string) {
+//add registers a stream at runtime, replacing and stopping an existing one with the same uuid.
+//Re-adding an unchanged stream is a no-op, so its viewers are not interrupted.
+func (element *ConfigST) add(uuid string, stream StreamST) {
 	element.mutex.Lock()
 	defer element.mutex.Unlock()
-	if tmp, ok := element.Streams[uuid]; ok {
+	if old, ok := element.Streams[uuid]; ok {
+		if old.URL == stream.URL && old.OnDemand == stream.OnDemand && old.DisableAudio == stream.DisableAudio && old.Debug == stream.Debug {
+			return
+		}
+		if old.stop != nil {
+			close(old.stop)
+		}
+	}
+	stream.Cl = make(map[string]viewer)
+	stream.stop = make(chan struct{})
+	if !stream.OnDemand {
+		go RTSPWorkerLoop(uuid, stream.URL, stream.OnDemand, stream.DisableAudio, stream.Debug, stream.stop)
+	}
+	element.Streams[uuid] = stream
+}
+
+//del removes a stream at runtime and stops its worker; false if there is no such stream.
+func (element *ConfigST) del(uuid string) bool {
+	element.mutex.Lock()
+	defer element.mutex.Unlock()
+	old, ok := element.Streams[uuid]
+	if !ok {
+		return false
+	}
+	if old.stop != nil {
+		close(old.stop)
+	}
+	delete(element.Streams, uuid)
+	return true
+}
+
+//RunUnlock marks an on-demand stream's worker as exited. stop identifies the entry the
+//worker was started for, so a worker of a replaced entry does not unlock its successor.
+func (element *ConfigST) RunUnlock(uuid string, stop <-chan struct{}) {
+	element.mutex.Lock()
+	defer element.mutex.Unlock()
+	if tmp, ok := element.Streams[uuid]; ok && tmp.stop == stop {
 		if tmp.OnDemand && tmp.RunLock {
 			tmp.RunLock = false
 			element.Streams[uuid] = tmp
@@ -124,6 +163,7 @@ func loadConfig() *ConfigST {
 		}
 		for i, v := range tmp.Streams {
 			v.Cl = make(map[string]viewer)
+			v.stop = make(chan struct{})
 			tmp.Streams[i] = v
 		}
 	} else {
@@ -145,10 +185,14 @@ func loadConfig() *ConfigST {
 	return &tmp
 }
 
-func (element *ConfigST) cast(uuid string, pck av.Packet) {
+func (element *ConfigST) cast(uuid string, stop <-chan struct{}, pck av.Packet) {
 	element.mutex.Lock()
 	defer element.mutex.Unlock()
-	for _, v := range element.Streams[uuid].Cl {
+	stream, ok := element.Streams[uuid]
+	if !ok || stream.stop != stop { // removed or replaced while its worker was still running
+		return
+	}
+	for _, v := range stream.Cl {
 		if len(v.c) < cap(v.c) {
 			v.c <- pck
 		}
@@ -162,10 +206,13 @@ func (element *ConfigST) ext(suuid string) bool {
 	return ok
 }
 
-func (element *ConfigST) coAd(suuid string, codecs []av.CodecData) {
+func (element *ConfigST) coAd(suuid string, stop <-chan struct{}, codecs []av.CodecData) {
 	element.mutex.Lock()
 	defer element.mutex.Unlock()
-	t := element.Streams[suuid]
+	t, ok := element.Streams[suuid]
+	if !ok || t.stop != stop { // removed or replaced while its worker was still dialing
+		return
+	}
 	t.Codecs = codecs
 	element.Streams[suuid] = t
 }
@@ -206,7 +253,9 @@ func (element *ConfigST) clAd(suuid string) (string, chan av.Packet) {
 	defer element.mutex.Unlock()
 	cuuid := pseudoUUID()
 	ch := make(chan av.Packet, 100)
-	element.Streams[suuid].Cl[cuuid] = viewer{c: ch}
+	if stream, ok := element.Streams[suuid]; ok { // may have been removed since it was checked
+		stream.Cl[cuuid] = viewer{c: ch}
+	}
 	return cuuid, ch
 }
 
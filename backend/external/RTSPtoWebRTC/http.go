@@ -18,6 +18,14 @@ type JCodec struct {
 	Type string
 }
 
+//StreamRequest body of the stream add API
+type StreamRequest struct {
+	URL          string `json:"url" binding:"required"`
+	OnDemand     bool   `json:"on_demand"`
+	DisableAudio bool   `json:"disable_audio"`
+	Debug        bool   `json:"debug"`
+}
+
 func serveHTTP() {
 	gin.SetMode(gin.ReleaseMode)
 
@@ -32,6 +40,8 @@ func serveHTTP() {
 	router.POST("/stream/receiver/:uuid", HTTPAPIServerStreamWebRTC)
 	router.GET("/stream/codec/:uuid", HTTPAPIServerStreamCodec)
 	router.POST("/stream", HTTPAPIServerStreamWebRTC2)
+	router.POST("/api/stream/:uuid", HTTPAPIServerStreamAdd)
+	router.DELETE("/api/stream/:uuid", HTTPAPIServerStreamDelete)
 
 	router.StaticFS("/static", http.Dir("web/static"))
 	err := router.Run(Config.Server.HTTPPort)
@@ -55,6 +65,28 @@ func HTTPAPIServerIndex(c *gin.Context) {
 	}
 }
 
+//HTTPAPIServerStreamAdd add or replace a stream without restarting the server
+func HTTPAPIServerStreamAdd(c *gin.Context) {
+	var request StreamRequest
+	if err := c.ShouldBindJSON(&request); err != nil {
+		c.JSON(http.StatusBadRequest, gin.H{"status": "error", "error": err.Error()})
+		return
+	}
+	Config.add(c.Param("uuid"), StreamST{URL: request.URL, OnDemand: request.OnDemand, DisableAudio: request.DisableAudio, Debug: request.Debug})
+	log.Println("Stream Added", c.Param("uuid"))
+	c.JSON(http.StatusOK, gin.H{"status": "success"})
+}
+
+//HTTPAPIServerStreamDelete remove a stream without restarting the server
+func HTTPAPIServerStreamDelete(c *gin.Context) {
+	if !Config.del(c.Param("uuid")) {
+		c.JSON(http.StatusNotFound, gin.H{"status": "error", "error": "stream not found"})
+		return
+	}
+	log.Println("Stream Deleted", c.Param("uuid"))
+	c.JSON(http.StatusOK, gin.H{"status": "success"})
+}
+
 //HTTPAPIServerStreamPlayer stream player
 func HTTPAPIServerStreamPlayer(c *gin.Context) {
 	_, all := Config.list()
@@ -160,7 +192,7 @@ func CORSMiddleware() gin.HandlerFunc {
 		c.Header("Access-Control-Allow-Credentials", "true")
 		c.Header("Access-Control-Allow-Headers", "Origin, X-Requested-With, Content-Type, Accept, Authorization, x-access-token")
 		c.Header("Access-Control-Expose-Headers", "Content-Length, Access-Control-Allow-Origin, Access-Control-Allow-Headers, Cache-Control, Content-Language, Content-Type")
-		c.Header("Access-Control-Allow-Methods", "POST, OPTIONS, GET, PUT")
+		c.Header("Access-Control-Allow-Methods", "POST, OPTIONS, GET, PUT, DELETE")
 
 		if c.Request.Method == "OPTIONS" {
 			c.AbortWithStatus(http.StatusNoContent)
@@ -12,32 +12,41 @@ var (
 	ErrorStreamExitNoVideoOnStream = errors.New("Stream Exit No Video On Stream")
 	ErrorStreamExitRtspDisconnect  = errors.New("Stream Exit Rtsp Disconnect")
 	ErrorStreamExitNoViewer        = errors.New("Stream Exit On Demand No Viewer")
+	ErrorStreamExitRemoved         = errors.New("Stream Exit Removed")
 )
 
 func serveStreams() {
 	for k, v := range Config.Streams {
 		if !v.OnDemand {
-			go RTSPWorkerLoop(k, v.URL, v.OnDemand, v.DisableAudio, v.Debug)
+			go RTSPWorkerLoop(k, v.URL, v.OnDemand, v.DisableAudio, v.Debug, v.stop)
 		}
 	}
 }
-func RTSPWorkerLoop(name, url string, OnDemand, DisableAudio, Debug bool) {
-	defer Config.RunUnlock(name)
+func RTSPWorkerLoop(name, url string, OnDemand, DisableAudio, Debug bool, stop <-chan struct{}) {
+	defer Config.RunUnlock(name, stop)
 	for {
 		log.Println("Stream Try Connect", name)
-		err := RTSPWorker(name, url, OnDemand, DisableAudio, Debug)
+		err := RTSPWorker(name, url, OnDemand, DisableAudio, Debug, stop)
 		if err != nil {
 			log.Println(err)
 			Config.LastError = err
 		}
+		if err == ErrorStreamExitRemoved {
+			return
+		}
 		if OnDemand && !Config.HasViewer(name) {
 			log.Println(ErrorStreamExitNoViewer)
 			return
 		}
-		time.Sleep(1 * time.Second)
+		select {
+		case <-stop:
+			log.Println(ErrorStreamExitRemoved, name)
+			return
+		case <-time.After(1 * time.Second):
+		}
 	}
 }
-func RTSPWorker(name, url string, OnDemand, DisableAudio, Debug bool) error {
+func RTSPWorker(name, url string, OnDemand, DisableAudio, Debug bool, stop <-chan struct{}) error {
 	keyTest := time.NewTimer(20 * time.Second)
 	clientTest := time.NewTimer(20 * time.Second)
 	//add next TimeOut
@@ -47,7 +56,7 @@ func RTSPWorker(name, url string, OnDemand, DisableAudio, Debug bool) error {
 	}
 	defer RTSPClient.Close()
 	if RTSPClient.CodecData != nil {
-		Config.coAd(name, RTSPClient.CodecData)
+		Config.coAd(name, stop, RTSPClient.CodecData)
 	}
 	var AudioOnly bool
 	if len(RTSPClient.CodecData) == 1 && RTSPClient.CodecData[0].Type().IsAudio() {
@@ -55,6 +64,8 @@ func RTSPWorker(name, url string, OnDemand, DisableAudio, Debug bool) error {
 	}
 	for {
 		select {
+		case <-stop:
+			return ErrorStreamExitRemoved
 		case <-clientTest.C:
 			if OnDemand {
 				if !Config.HasViewer(name) {
@@ -68,7 +79,7 @@ func RTSPWorker(name, url string, OnDemand, DisableAudio, Debug bool) error {
 		case signals := <-RTSPClient.Signals:
 			switch signals {
 			case rtspv2.SignalCodecUpdate:
-				Config.coAd(name, RTSPClient.CodecData)
+				Config.coAd(name, stop, RTSPClient.CodecData)
 			case rtspv2.SignalStreamRTPStop:
 				return ErrorStreamExitRtspDisconnect
 			}
@@ -76,7 +87,7 @@ func RTSPWorker(name, url string, OnDemand, DisableAudio, Debug bool) error {
 			if AudioOnly || packetAV.IsKeyFrame {
 				keyTest.Reset(20 * time.Second)
 			}
-			Config.cast(name, *packetAV)
+			Config.cast(name, stop, *packetAV)
 		}
 	}
 }
@@ -0,0 +1,110 @@
+import unittest
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.alarms import events as events_module
+from app.alarms.events import AlarmEventStore, parse_time
+
+
+class TestAlarmEventStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.event_file = os.path.join(self.tmpdir.name, "alarm_events.json")
+        self.store = AlarmEventStore(self.event_file, max_events=5)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmpdir.cleanup()
+
+    def record_many(self):
+        for i in range(8):
+            self.store.record("a" if i % 2 else "b", f"track{i}", (i, i), timestamp=100.0 + i)
+
+    def test_query_newest_first_and_bounded(self):
+        self.record_many()
+        events, total = self.store.query()
+        self.assertEqual(total, 5)
+        self.assertEqual([e["time"] for e in events], [107.0, 106.0, 105.0, 104.0, 103.0])
+
+    def test_query_time_range_and_pagination(self):
+        self.record_many()
+        events, total = self.store.query(start=104.0, end=106.0, offset=1, limit=1)
+        self.assertEqual(total, 3)
+        self.assertEqual([e["time"] for e in events], [105.0])
+
+    def test_full_write_queue_does_not_drop_events(self):
+        size = events_module.WRITE_QUEUE_SIZE
+        events_module.WRITE_QUEUE_SIZE = 1
+        try:
+            event_file = os.path.join(self.tmpdir.name, "small_queue.json")
+            store = AlarmEventStore(event_file)
+            for i in range(200):
+                store.record("a", f"track{i}", (i, i), timestamp=100.0 + i)
+            store.close()
+        finally:
+            events_module.WRITE_QUEUE_SIZE = size
+        with open(event_file) as f:
+            self.assertEqual(len(f.readlines()), 200)
+
+    def test_record_does_not_wait_for_stalled_writer(self):
+        size = events_module.WRITE_QUEUE_SIZE
+        events_module.WRITE_QUEUE_SIZE = 1
+        release = threading.Event()
+
+        def stalled_open(*args, **kwargs):
+            release.wait(5)
+            return open(*args, **kwargs)
+
+        try:
+            event_file = os.path.join(self.tmpdir.name, "stalled.json")
+            store = AlarmEventStore(event_file)
+            events_module.open = stalled_open  # Shadows the builtin for the writer thread
+            started = time.monotonic()
+            for i in range(50):
+                store.record("a", f"track{i}", (i, i), timestamp=100.0 + i)
+            elapsed = time.monotonic() - started
+            release.set()
+            store.close()
+        finally:
+            release.set()
+            vars(events_module).pop("open", None)
+            events_module.WRITE_QUEUE_SIZE = size
+        self.assertLess(elapsed, 0.1)
+        with open(event_file) as f:
+            self.assertEqual(len(f.readlines()), 50)
+
+    def test_query_zone_filter(self):
+        self.record_many()
+        events, total = self.store.query(alarm_ids=["a"])
+        self.assertEqual(total, 3)
+        self.assertTrue(all(e["alarm_id"] == "a" for e in events))
+
+    def test_out_of_order_insert(self):
+        self.store.record("a", "t1", (0, 0), timestamp=200.0)
+        self.store.record("a", "t2", (0, 0), timestamp=150.0)
+        events, _ = self.store.query()
+        self.assertEqual([e["track_id"] for e in events], ["t1", "t2"])
+
+    def test_events_reloaded_from_file(self):
+        self.record_many()
+        self.store.close()
+        self.store = AlarmEventStore(self.event_file, max_events=5)
+        events, total = self.store.query()
+        self.assertEqual(total, 5)
+        self.assertEqual(events[0]["track_id"], "track7")
+
+    def test_parse_time(self):
+        self.assertEqual(parse_time("12.5"), 12.5)
+        self.assertEqual(parse_time("1970-01-01T00:01:00Z"), 60.0)
+        self.assertIsNone(parse_time(""))
+        with self.assertRaises(ValueError):
+            parse_time("yesterday")
+
+
+if __name__ == "__main__":
+    unittest.main()
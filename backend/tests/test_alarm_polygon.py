@@ -0,0 +1,69 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.alarms.alarm import Alarm
+from app.alarms.polygon import Polygon
+
+
+class TestPolygon(unittest.TestCase):
+    def setUp(self):
+        # L-shaped corridor: a horizontal leg along the top and a vertical leg on the left
+        self.corridor = Polygon(
+            [(0, 0), (60, 0), (60, 20), (20, 20), (20, 80), (0, 80)]
+        )
+
+    def test_contains_inside_both_legs(self):
+        self.assertTrue(self.corridor.contains((40, 10)))
+        self.assertTrue(self.corridor.contains((10, 70)))
+
+    def test_excludes_notch_inside_bounding_box(self):
+        self.assertTrue(self.corridor.bbox_contains(40, 50))
+        self.assertFalse(self.corridor.contains((40, 50)))
+
+    def test_excludes_outside_bounding_box(self):
+        self.assertFalse(self.corridor.contains((70, 10)))
+        self.assertFalse(self.corridor.contains((-1, 10)))
+
+    def test_contains_many_matches_scalar(self):
+        positions = [(40, 10), (10, 70), (40, 50), (70, 10), (0, 0), (60, 20), (10, 80)]
+        expected = [self.corridor.contains(p) for p in positions]
+        self.assertEqual(list(self.corridor.contains_many(positions)), expected)
+
+    def test_contains_many_empty(self):
+        self.assertEqual(len(self.corridor.contains_many([])), 0)
+
+    def test_too_few_points(self):
+        with self.assertRaises(ValueError):
+            Polygon([(0, 0), (1, 1)])
+
+
+class TestAlarmZones(unittest.TestCase):
+    def test_rectangle_borders_inside(self):
+        alarm = Alarm("a", {"x": 10, "y": 10}, {"x": 20, "y": 20}, True, False)
+        for position in [(10, 10), (20, 20), (15, 20), (20, 15)]:
+            self.assertTrue(alarm.alarm_contains(position), position)
+        self.assertFalse(alarm.alarm_contains((20.1, 15)))
+
+    def test_polygon_alarm_round_trip(self):
+        points = [{"x": 0, "y": 0}, {"x": 50, "y": 0}, {"x": 0, "y": 50}]
+        alarm = Alarm.create_from_json(
+            {"id": "b", "points": points, "active": True, "triggered": False}
+        )
+        self.assertTrue(alarm.alarm_contains((10, 10)))
+        self.assertFalse(alarm.alarm_contains((40, 40)))
+        restored = Alarm(**alarm.to_dict())
+        self.assertEqual(restored.polygon.points, alarm.polygon.points)
+        self.assertEqual(restored.topLeft, {"x": 0.0, "y": 0.0})
+
+    def test_zone_without_shape_is_rejected(self):
+        with self.assertRaises(ValueError):
+            Alarm.create_from_json({"id": "c", "active": True, "triggered": False})
+        with self.assertRaises(ValueError):
+            Alarm("d", topLeft={"x": 0, "y": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.alarms.rules import ZoneMembership, rule_matches, validate_rule
+
+
+class TestZoneRules(unittest.TestCase):
+    def setUp(self):
+        self.membership = ZoneMembership()
+
+    def step(self, zones, now, alarm_id, rule):
+        entered = self.membership.update(set(zones), now)
+        if alarm_id not in self.membership.inside:
+            return False
+        return rule_matches(rule, alarm_id, self.membership, now, alarm_id in entered)
+
+    def test_enter_fires_on_entry(self):
+        self.assertTrue(self.step({"a"}, 0.0, "a", validate_rule(None)))
+
+    def test_dwell_requires_time_inside(self):
+        rule = validate_rule({"type": "dwell", "seconds": 10})
+        self.assertFalse(self.step({"a"}, 0.0, "a", rule))
+        self.assertFalse(self.step({"a"}, 9.0, "a", rule))
+        self.assertTrue(self.step({"a"}, 10.0, "a", rule))
+
+    def test_dwell_resets_on_exit(self):
+        rule = validate_rule({"type": "dwell", "seconds": 10})
+        self.step({"a"}, 0.0, "a", rule)
+        self.step(set(), 5.0, "a", rule)
+        self.assertEqual(self.membership.exits["a"], 5.0)
+        self.assertFalse(self.step({"a"}, 12.0, "a", rule))
+        self.assertTrue(self.step({"a"}, 22.0, "a", rule))
+
+    def test_transition_from_zone(self):
+        rule = validate_rule({"type": "transition", "from": "a", "within": 2})
+        self.step({"a"}, 0.0, "b", rule)
+        self.step(set(), 1.0, "b", rule)
+        self.assertTrue(self.step({"b"}, 2.5, "b", rule))
+
+    def test_transition_outside_window(self):
+        rule = validate_rule({"type": "transition", "from": "a", "within": 2})
+        self.step({"a"}, 0.0, "b", rule)
+        self.step(set(), 1.0, "b", rule)
+        self.assertFalse(self.step({"b"}, 5.0, "b", rule))
+
+    def test_transition_only_on_entry(self):
+        rule = validate_rule({"type": "transition", "from": "a"})
+        self.step({"b"}, 0.0, "b", rule)
+        self.assertFalse(self.step({"a", "b"}, 1.0, "b", rule))
+
+    def test_invalid_rules(self):
+        for rule in [{"type": "loiter"}, {"type": "dwell"}, {"type": "transition"}]:
+            with self.assertRaises(ValueError):
+                validate_rule(rule)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.alarms.scheduler import AlarmScheduler, TimerWheel
+
+
+class TestTimerWheel(unittest.TestCase):
+    def test_expires_in_deadline_order(self):
+        wheel = TimerWheel(tick=1.0, slots=8, now=0.0)
+        wheel.schedule(3.0, "a", 0.0)
+        wheel.schedule(1.0, "b", 0.0)
+        self.assertEqual(wheel.advance(0.5), [])
+        self.assertEqual(wheel.advance(1.0), ["b"])
+        self.assertEqual(wheel.advance(2.9), [])
+        self.assertEqual(wheel.advance(3.0), ["a"])
+        self.assertEqual(len(wheel), 0)
+
+    def test_timer_beyond_one_revolution(self):
+        wheel = TimerWheel(tick=1.0, slots=4, now=0.0)
+        wheel.schedule(10.0, "late", 0.0)
+        self.assertEqual(wheel.advance(4.0), [])
+        self.assertEqual(wheel.advance(9.0), [])
+        self.assertEqual(wheel.advance(10.0), ["late"])
+
+    def test_large_jump_expires_everything_due(self):
+        wheel = TimerWheel(tick=1.0, slots=4, now=0.0)
+        for delay in (1.0, 2.0, 7.0, 30.0):
+            wheel.schedule(delay, delay, 0.0)
+        self.assertEqual(sorted(wheel.advance(20.0)), [1.0, 2.0, 7.0])
+        self.assertEqual(len(wheel), 1)
+
+
+class TestAlarmScheduler(unittest.TestCase):
+    def setUp(self):
+        self.rearmed = []
+        # Long tick so the background thread stays idle; the test drives expiry itself
+        self.scheduler = AlarmScheduler(self.rearmed.append, track_suppression=100.0, tick=3600.0)
+        self.scheduler.wheel = TimerWheel(tick=1.0, slots=16)
+
+    def tearDown(self):
+        self.scheduler._stop.set()
+
+    def test_rearm_after_cooldown_and_release_track(self):
+        self.scheduler.on_trigger("a", "t1", cooldown=10.0)
+        self.assertTrue(self.scheduler.is_suppressed("a", "t1"))
+        now = time.monotonic()
+        self.assertEqual(self.scheduler._expire(now + 5.0), [])
+        self.assertEqual(self.scheduler._expire(now + 11.0), ["a"])
+        self.assertTrue(self.scheduler.is_suppressed("a", "t1"))
+        self.scheduler._expire(now + 101.0)
+        self.assertFalse(self.scheduler.is_suppressed("a", "t1"))
+
+    def test_cancel_discards_pending_rearm(self):
+        self.scheduler.on_trigger("a", "t1", cooldown=1.0)
+        self.scheduler.cancel("a")
+        self.assertFalse(self.scheduler.is_suppressed("a", "t1"))
+        self.assertEqual(self.scheduler._expire(time.monotonic() + 2.0), [])
+
+    def test_retrigger_replaces_pending_rearm(self):
+        self.scheduler.on_trigger("a", None, cooldown=1.0)
+        self.scheduler.on_trigger("a", None, cooldown=10.0)
+        now = time.monotonic()
+        self.assertEqual(self.scheduler._expire(now + 2.0), [])
+        self.assertEqual(self.scheduler._expire(now + 11.0), ["a"])
+
+    def test_negative_cooldown_never_rearms(self):
+        self.scheduler.on_trigger("a", None, cooldown=-1)
+        self.assertEqual(self.scheduler._expire(time.monotonic() + 1000.0), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
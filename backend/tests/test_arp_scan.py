@@ -0,0 +1,106 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.camera import arp_scan
+from app.camera.arp_scan import (
+    AXIS_MANUFACTURER,
+    is_axis,
+    load_cached,
+    save_results,
+    scan_axis_cameras,
+    verify_cached,
+)
+from app.camera.registry import CameraRegistry
+
+
+class TestArpScan(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = os.path.join(self.tmpdir.name, "cameras.json")
+        self.registry = CameraRegistry(os.path.join(self.tmpdir.name, "camera_ids.json"))
+        self.scan_subnets = arp_scan._scan_subnets
+        self.get_registry = arp_scan.get_registry
+        arp_scan.get_registry = lambda: self.registry
+
+    def tearDown(self):
+        arp_scan._scan_subnets = self.scan_subnets
+        arp_scan.get_registry = self.get_registry
+        self.tmpdir.cleanup()
+
+    def test_axis_oui(self):
+        self.assertTrue(is_axis("AC:CC:8E:12:34:56"))
+        self.assertTrue(is_axis("00:40:8c:00:00:01"))
+        self.assertFalse(is_axis("3c:22:fb:12:34:56"))
+
+    def test_save_keeps_only_axis_devices_and_round_trips(self):
+        devices = [
+            ("192.168.0.20", "ac:cc:8e:00:00:02", AXIS_MANUFACTURER),
+            ("192.168.0.5", "3c:22:fb:00:00:01", "Unknown"),
+            ("192.168.0.3", "b8:a4:4f:00:00:01", AXIS_MANUFACTURER),
+        ]
+        saved = save_results(devices, self.cache, self.registry)
+        self.assertEqual([d[1] for d in saved], ["192.168.0.3", "192.168.0.20"])
+        self.assertEqual(load_cached(self.cache), saved)
+
+    def test_ids_are_stable_when_a_camera_goes_offline(self):
+        first = ("192.168.0.3", "b8:a4:4f:00:00:01", AXIS_MANUFACTURER)
+        second = ("192.168.0.20", "ac:cc:8e:00:00:02", AXIS_MANUFACTURER)
+        save_results([first, second], self.cache, self.registry)
+        self.assertEqual(save_results([second], self.cache, self.registry)[0][0], 2)
+        new = ("192.168.0.2", "ac:cc:8e:00:00:03", AXIS_MANUFACTURER)
+        saved = save_results([new, first, second], self.cache, self.registry)
+        self.assertEqual([(d[0], d[2]) for d in saved], [(1, first[1]), (2, second[1]), (3, new[1])])
+
+    def test_missing_cache(self):
+        self.assertEqual(load_cached(self.cache), [])
+
+    def test_verify_keeps_answering_cameras(self):
+        cached = [
+            (1, "192.168.0.3", "b8:a4:4f:00:00:01", AXIS_MANUFACTURER),
+            (2, "192.168.0.20", "ac:cc:8e:00:00:02", AXIS_MANUFACTURER),
+            (3, "192.168.1.7", "ac:cc:8e:00:00:03", AXIS_MANUFACTURER),
+            (4, "10.0.0.9", "ac:cc:8e:00:00:04", AXIS_MANUFACTURER),
+        ]
+        probed = {}
+
+        def fake_scan(targets, timeout):
+            probed.update(targets)
+            return [
+                ("192.168.0.3", "b8:a4:4f:00:00:01", AXIS_MANUFACTURER),
+                # Another device took camera 2's address
+                ("192.168.0.20", "ac:cc:8e:00:00:99", AXIS_MANUFACTURER),
+                ("192.168.1.7", "ac:cc:8e:00:00:03", AXIS_MANUFACTURER),
+            ], []
+
+        arp_scan._scan_subnets = fake_scan
+        verified = verify_cached(cached, ["192.168.0.0/24", "192.168.1.0/24"])
+        self.assertEqual([d[0] for d in verified], [1, 3])
+        self.assertEqual(
+            probed,
+            {"192.168.0.0/24": ["192.168.0.3", "192.168.0.20"], "192.168.1.0/24": ["192.168.1.7"]},
+        )
+
+    def test_empty_sweep_keeps_cache(self):
+        camera = ("192.168.0.3", "b8:a4:4f:00:00:01", AXIS_MANUFACTURER)
+        cached = save_results([camera], self.cache, self.registry)
+        arp_scan._scan_subnets = lambda targets, timeout: ([], [])
+        self.assertEqual(scan_axis_cameras(["192.168.0.0/24"], self.cache), [])
+        self.assertEqual(load_cached(self.cache), cached)
+
+    def test_failed_subnet_keeps_its_cached_cameras(self):
+        first = ("192.168.0.3", "b8:a4:4f:00:00:01", AXIS_MANUFACTURER)
+        second = ("192.168.1.7", "ac:cc:8e:00:00:02", AXIS_MANUFACTURER)
+        save_results([first, second], self.cache, self.registry)
+        # 192.168.0.0/24 answers without camera 1, 192.168.1.0/24 cannot be scanned
+        arp_scan._scan_subnets = lambda targets, timeout: ([], ["192.168.1.0/24"])
+        found = scan_axis_cameras(["192.168.0.0/24", "192.168.1.0/24"], self.cache)
+        self.assertEqual([d[0] for d in found], [2])
+        self.assertEqual([d[0] for d in load_cached(self.cache)], [2])
+
+
+if __name__ == "__main__":
+    unittest.main()
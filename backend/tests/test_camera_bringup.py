@@ -0,0 +1,59 @@
+import unittest
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.camera.bringup import run_parallel
+
+
+class TestCameraBringup(unittest.TestCase):
+    def test_runs_concurrently(self):
+        tasks = [(i, lambda i=i: time.sleep(0.2) or i * 10) for i in range(8)]
+        started = time.monotonic()
+        results = run_parallel(tasks, timeout=5, max_workers=8)
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(results, {i: i * 10 for i in range(8)})
+
+    def test_slow_camera_is_skipped(self):
+        release = threading.Event()
+        tasks = [(1, lambda: "fast"), (2, lambda: release.wait(5) and "slow")]
+        started = time.monotonic()
+        results = run_parallel(tasks, timeout=0.2)
+        release.set()
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(results, {1: "fast"})
+
+    def test_deadline_is_per_camera(self):
+        abandoned = []
+        undone = threading.Event()
+
+        def undo(key, result):
+            abandoned.append((key, result))
+            undone.set()
+
+        # Finishes after its own deadline but within the time two waves of tasks would take
+        tasks = [(1, lambda: time.sleep(0.45) or "slow")] + [
+            (i, lambda i=i: time.sleep(0.05) or i) for i in range(2, 5)
+        ]
+        results = run_parallel(tasks, timeout=0.3, max_workers=2, on_abandoned=undo)
+        self.assertEqual(results, {2: 2, 3: 3, 4: 4})
+        self.assertEqual(abandoned, [])
+        self.assertTrue(undone.wait(1))
+        self.assertEqual(abandoned, [(1, "slow")])
+
+    def test_failing_camera_is_skipped(self):
+        def fail():
+            raise ConnectionError("unreachable")
+
+        results = run_parallel([(1, fail), (2, lambda: "ok")], timeout=1)
+        self.assertEqual(results, {2: "ok"})
+
+    def test_no_tasks(self):
+        self.assertEqual(run_parallel([]), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.camera.discovery import CameraDiscovery
+
+
+class FakeCamera:
+    def __init__(self, ip, id, mac):
+        self.ip = ip
+        self.id = id
+        self.mac = mac
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def device(id, ip, mac):
+    return (id, ip, mac, "Axis Communications AB")
+
+
+class TestCameraDiscovery(unittest.TestCase):
+    def setUp(self):
+        self.results = []
+        self.added = []
+        self.removed = []
+
+    def make_discovery(self, cameras, missed_scans=2):
+        return CameraDiscovery(
+            cameras,
+            self.added.append,
+            self.removed.append,
+            missed_scans=missed_scans,
+            scan=lambda: self.results,
+            camera_factory=FakeCamera,
+            start=False,
+        )
+
+    def test_new_camera_is_added(self):
+        known = FakeCamera("192.168.0.3", 1, "aa:01")
+        discovery = self.make_discovery([known])
+        self.results = [device(1, "192.168.0.3", "aa:01"), device(2, "192.168.0.4", "aa:02")]
+        added, removed = discovery.poll()
+        self.assertEqual([camera.id for camera in added], [2])
+        self.assertEqual(self.added, added)
+        self.assertEqual(removed, [])
+        self.assertEqual([camera.id for camera in discovery.cameras], [1, 2])
+
+        # Known cameras are not set up again
+        self.assertEqual(discovery.poll(), ([], []))
+
+    def test_missing_camera_is_retired_after_missed_scans(self):
+        first = FakeCamera("192.168.0.3", 1, "aa:01")
+        second = FakeCamera("192.168.0.4", 2, "aa:02")
+        discovery = self.make_discovery([first, second])
+        self.results = [device(1, "192.168.0.3", "aa:01")]
+        self.assertEqual(discovery.poll(), ([], []))
+        added, removed = discovery.poll()
+        self.assertEqual(removed, [second])
+        self.assertTrue(second.closed)
+        self.assertEqual(self.removed, [second])
+        self.assertEqual(discovery.cameras, [first])
+
+    def test_camera_back_in_time_is_kept(self):
+        camera = FakeCamera("192.168.0.3", 1, "aa:01")
+        discovery = self.make_discovery([camera, FakeCamera("192.168.0.4", 2, "aa:02")])
+        self.results = [device(2, "192.168.0.4", "aa:02")]
+        discovery.poll()
+        self.results = [device(1, "192.168.0.3", "aa:01"), device(2, "192.168.0.4", "aa:02")]
+        discovery.poll()
+        self.results = [device(2, "192.168.0.4", "aa:02")]
+        discovery.poll()
+        self.assertFalse(camera.closed)
+
+    def test_empty_sweep_retires_nothing(self):
+        camera = FakeCamera("192.168.0.3", 1, "aa:01")
+        discovery = self.make_discovery([camera], missed_scans=1)
+        self.results = []
+        self.assertEqual(discovery.poll(), ([], []))
+        self.assertFalse(camera.closed)
+
+    def test_moved_camera_is_set_up_again(self):
+        camera = FakeCamera("192.168.0.3", 1, "aa:01")
+        discovery = self.make_discovery([camera], missed_scans=5)
+        self.results = [device(1, "192.168.0.9", "aa:01")]
+        added, removed = discovery.poll()
+        self.assertEqual(removed, [camera])
+        self.assertEqual([(c.id, c.ip) for c in added], [(1, "192.168.0.9")])
+
+
+if __name__ == "__main__":
+    unittest.main()
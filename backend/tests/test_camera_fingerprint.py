@@ -0,0 +1,98 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.camera.fingerprint import FingerprintStore, settings_fingerprint
+from app.map.manager import MapManager
+
+
+class FakeCamera:
+    def __init__(self, id, mac):
+        self.id = id
+        self.ip = f"192.168.0.{100 + id}"
+        self.mac = mac
+        self.configured = []
+
+    def configure_camera(self, lat, lon, height, heading):
+        self.configured.append((lat, lon, height, heading))
+
+
+class TestCameraFingerprint(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "fingerprints.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def make_manager(self, cameras, heading=90):
+        manager = MapManager.__new__(MapManager)
+        manager.cameras = cameras
+        manager.fingerprints = FingerprintStore(self.filename)
+        manager.map_config = {
+            "cameras": {
+                str(camera.id): {"geocoordinates": [59.3, 18.0], "height": 2.5, "heading": heading}
+                for camera in cameras
+            }
+        }
+        return manager
+
+    def test_fingerprint_ignores_keyword_order(self):
+        self.assertEqual(
+            settings_fingerprint(lat=1.0, lon=2.0), settings_fingerprint(lon=2.0, lat=1.0)
+        )
+        self.assertNotEqual(
+            settings_fingerprint(lat=1.0, lon=2.0), settings_fingerprint(lat=1.0, lon=2.5)
+        )
+
+    def test_store_persists(self):
+        FingerprintStore(self.filename).record("aa:bb", "abc")
+        store = FingerprintStore(self.filename)
+        self.assertTrue(store.matches("aa:bb", "abc"))
+        store.forget("aa:bb")
+        self.assertFalse(FingerprintStore(self.filename).matches("aa:bb", "abc"))
+
+    def test_unreadable_file_is_ignored(self):
+        with open(self.filename, "w") as f:
+            f.write("{not json")
+        self.assertFalse(FingerprintStore(self.filename).matches("aa:bb", "abc"))
+
+    def test_unchanged_cameras_are_skipped_on_restart(self):
+        cameras = [FakeCamera(1, "aa:bb"), FakeCamera(2, "cc:dd")]
+        self.make_manager(cameras).update_cameras_configs()
+        self.assertEqual([len(camera.configured) for camera in cameras], [1, 1])
+
+        restarted = [FakeCamera(1, "aa:bb"), FakeCamera(2, "cc:dd")]
+        self.make_manager(restarted).update_cameras_configs()
+        self.assertEqual([len(camera.configured) for camera in restarted], [0, 0])
+
+    def test_changed_settings_are_pushed(self):
+        self.make_manager([FakeCamera(1, "aa:bb")]).update_cameras_configs()
+        camera = FakeCamera(1, "aa:bb")
+        self.make_manager([camera], heading=180).update_cameras_configs()
+        self.assertEqual(camera.configured, [(59.3, 18.0, 2.5, 180)])
+
+    def test_force(self):
+        self.make_manager([FakeCamera(1, "aa:bb")]).update_cameras_configs()
+        camera = FakeCamera(1, "aa:bb")
+        self.make_manager([camera]).update_cameras_configs(force=True)
+        self.assertEqual(len(camera.configured), 1)
+
+    def test_failed_configuration_is_not_recorded(self):
+        camera = FakeCamera(1, "aa:bb")
+
+        def fail(*args):
+            raise ConnectionError("unreachable")
+
+        camera.configure_camera = fail
+        self.make_manager([camera]).update_cameras_configs()
+        retry = FakeCamera(1, "aa:bb")
+        self.make_manager([retry]).update_cameras_configs()
+        self.assertEqual(len(retry.configured), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
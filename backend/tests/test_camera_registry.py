@@ -0,0 +1,45 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.camera.registry import CameraRegistry
+
+
+class TestCameraRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "camera_ids.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_ids_persist_and_are_not_reused(self):
+        registry = CameraRegistry(self.filename)
+        self.assertEqual(registry.assign(["AA:00", "bb:00"]), {"aa:00": 1, "bb:00": 2})
+
+        reloaded = CameraRegistry(self.filename)
+        self.assertEqual(reloaded.get("aa:00"), 1)
+        self.assertEqual(reloaded.assign(["cc:00"]), {"cc:00": 3})
+        self.assertEqual(reloaded.assign(["bb:00"]), {"bb:00": 2})
+
+    def test_seeded_from_previous_scan_when_empty(self):
+        registry = CameraRegistry(self.filename, seed=[(4, "aa:00"), (7, "BB:00")])
+        self.assertEqual(registry.get("bb:00"), 7)
+        self.assertEqual(registry.assign(["cc:00"]), {"cc:00": 8})
+
+        # An existing registry wins over the seed
+        registry = CameraRegistry(self.filename, seed=[(1, "aa:00")])
+        self.assertEqual(registry.get("aa:00"), 4)
+
+    def test_unknown_camera(self):
+        registry = CameraRegistry(self.filename)
+        self.assertIsNone(registry.get("aa:00"))
+        self.assertNotIn("aa:00", registry)
+        self.assertFalse(os.path.exists(self.filename))
+
+
+if __name__ == "__main__":
+    unittest.main()
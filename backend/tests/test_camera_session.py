@@ -0,0 +1,112 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from requests.auth import HTTPDigestAuth
+
+from app.camera import camera as camera_module
+from app.camera.camera import MAX_RETRIES, Camera, create_session
+from app.camera.fingerprint import FingerprintStore
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+        self.text = str(data)
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+class FakeSession:
+    """Publisher REST API of one camera."""
+
+    def __init__(self, publishers):
+        self.publishers = publishers
+        self.calls = []
+
+    def get(self, url, timeout=None):
+        self.calls.append("GET")
+        return FakeResponse({"status": "success", "data": self.publishers})
+
+    def delete(self, url, timeout=None):
+        self.calls.append("DELETE")
+        return FakeResponse({"status": "success"})
+
+    def post(self, url, json=None, timeout=None):
+        self.calls.append("POST")
+        self.publishers.append(json["data"])
+        return FakeResponse({"status": "success"})
+
+
+class TestCameraSession(unittest.TestCase):
+    def setUp(self):
+        self.session = create_session("user", "pass")
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_digest_auth_is_shared_by_requests(self):
+        self.assertIsInstance(self.session.auth, HTTPDigestAuth)
+        self.assertEqual(self.session.auth.username, "user")
+
+    def test_retry_policy(self):
+        retry = self.session.get_adapter("http://192.168.0.90/").max_retries
+        self.assertEqual(retry.total, MAX_RETRIES)
+        self.assertIn("GET", retry.allowed_methods)
+        self.assertNotIn("POST", retry.allowed_methods)
+
+    def test_same_adapter_for_http_and_https(self):
+        self.assertIs(
+            self.session.get_adapter("http://camera/"),
+            self.session.get_adapter("https://camera/"),
+        )
+
+
+class TestMqttPublisher(unittest.TestCase):
+    TOPIC = "1/frame_metadata"
+    KEY = "com.axis.analytics_scene_description.v0.beta#1"
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.fingerprints = FingerprintStore(os.path.join(self.tmpdir.name, "fingerprints.json"))
+        self.get_fingerprint_store = camera_module.get_fingerprint_store
+        camera_module.get_fingerprint_store = lambda: self.fingerprints
+
+    def tearDown(self):
+        camera_module.get_fingerprint_store = self.get_fingerprint_store
+        self.tmpdir.cleanup()
+
+    def make_camera(self, publishers):
+        camera = Camera.__new__(Camera)  # Without contacting a device
+        camera.ip = "192.168.0.90"
+        camera.mac = "ac:cc:8e:00:00:01"
+        camera.session = FakeSession(publishers)
+        return camera
+
+    def test_existing_publisher_is_left_alone(self):
+        camera = self.make_camera([{"id": "1", "data_source_key": self.KEY, "mqtt_topic": self.TOPIC}])
+        camera._configure_mqtt_publisher(self.TOPIC, self.KEY)
+        self.assertEqual(camera.session.calls, ["GET"])
+
+    def test_reset_camera_is_provisioned_again(self):
+        self.fingerprints.record("ac:cc:8e:00:00:01", "map")  # Location pushed before the reset
+        camera = self.make_camera([])
+        camera._configure_mqtt_publisher(self.TOPIC, self.KEY)
+        self.assertEqual(camera.session.calls, ["GET", "POST"])
+        self.assertFalse(self.fingerprints.matches("ac:cc:8e:00:00:01", "map"))
+
+    def test_publisher_with_old_topic_is_replaced(self):
+        camera = self.make_camera([{"id": "7", "data_source_key": self.KEY, "mqtt_topic": "7/frame_metadata"}])
+        camera._configure_mqtt_publisher(self.TOPIC, self.KEY)
+        self.assertEqual(camera.session.calls, ["GET", "DELETE", "POST"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.heatmap.writer import HeatmapWriter
+from app.objects.observation import Observation
+
+
+def record(i):
+    return Observation("1", str(i), "2025-05-16T21:34:00Z", "Human", 0.9, 59.0, 18.0)
+
+
+class TestHeatmapWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "heatmap", "heatmap_data.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def read_lines(self):
+        with open(self.filename, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_full_batch_is_committed_without_waiting(self):
+        writer = HeatmapWriter(self.filename, batch_size=3, flush_interval=60)
+        try:
+            for i in range(3):
+                writer.write(record(i))
+            self.assertTrue(writer.flush())
+            self.assertEqual([line["track_id"] for line in self.read_lines()], ["0", "1", "2"])
+        finally:
+            writer.close()
+
+    def test_close_drains_pending_records(self):
+        writer = HeatmapWriter(self.filename, batch_size=100, flush_interval=60, fsync="batch")
+        writer.write(record(0))
+        writer.close()
+        self.assertEqual(len(self.read_lines()), 1)
+        self.assertFalse(writer.write(record(1)))
+
+    def test_drops_when_pending_limit_reached(self):
+        writer = HeatmapWriter(self.filename, batch_size=100, flush_interval=60, max_pending=2)
+        try:
+            results = [writer.write(record(i)) for i in range(3)]
+            self.assertEqual(results, [True, True, False])
+            self.assertEqual(writer.dropped, 1)
+        finally:
+            writer.close()
+
+    def test_unknown_fsync_policy(self):
+        with self.assertRaises(ValueError):
+            HeatmapWriter(self.filename, fsync="always")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import os
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.heatmap.store import HistoryStore, observation_time
+from app.heatmap.writer import HeatmapWriter
+from app.objects.observation import Observation
+
+
+def obs(object_id, track_id, second, lat=59.0):
+    timestamp = f"2025-05-16T21:34:{second:02d}Z"
+    return Observation("1", track_id, timestamp, "Human", 0.9, lat, 18.0, object_id=object_id)
+
+
+class TestHistoryStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = HistoryStore(os.path.join(self.tmpdir.name, "history.db"))
+        self.t0 = observation_time("2025-05-16T21:34:00Z")
+
+    def tearDown(self):
+        self.store.close()
+        self.tmpdir.cleanup()
+
+    def test_wal_mode(self):
+        mode = self.store._connection().execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_query_by_time_object_and_track(self):
+        self.store.insert_many(
+            [obs("a", "7", 0), obs("b", "8", 1), obs("a", "7", 2), obs("a", "9", 3)]
+        )
+        self.assertEqual(len(list(self.store.query(start=self.t0 + 1))), 3)
+        rows = list(self.store.query(object_id="a", end=self.t0 + 2))
+        self.assertEqual([row["time"] - self.t0 for row in rows], [0, 2])
+        self.assertEqual(rows[0]["geoposition"], {"latitude": 59.0, "longitude": 18.0})
+        self.assertEqual(len(list(self.store.query(track_id="7"))), 2)
+
+    def test_queries_use_indexes(self):
+        plan = " ".join(
+            str(row)
+            for row in self.store._connection().execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM observations WHERE object_id = ? AND time >= ?",
+                ("a", 0),
+            )
+        )
+        self.assertIn("observations_object", plan)
+
+    def test_observations_without_geoposition_are_skipped(self):
+        self.store.insert_many([Observation("1", "7", "2025-05-16T21:34:00Z")])
+        self.assertEqual(list(self.store.query()), [])
+
+    def test_retention(self):
+        self.store.insert_many([obs("a", "7", 0), obs("a", "7", 30)])
+        self.assertEqual(self.store.delete_before(self.t0 + 10), 1)
+        self.store.retention = 5
+        self.assertEqual(self.store.prune(now=self.t0 + 40), 1)
+        self.assertEqual(self.store.prune(now=self.t0 + 41), 0)  # Rate limited
+
+    def test_writer_inserts_into_store(self):
+        now = datetime.now(timezone.utc).isoformat()
+        writer = HeatmapWriter("unused.json", batch_size=2, store=self.store)
+        for track_id in ("7", "8"):
+            writer.write(Observation("1", track_id, now, "Human", 0.9, 59.0, 18.0, object_id="a"))
+        writer.close()
+        self.assertEqual(len(list(self.store.query(object_id="a"))), 2)
+        self.assertFalse(os.path.exists("unused.json"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.objects.kalman import KalmanBank
+from app.objects.manager import ObjectManager
+
+LAT, LON = 59.3245, 18.0705
+METER_LAT = 1 / 111_195  # degrees latitude per meter
+
+
+def observation(track_id, lat, lon, timestamp):
+    return {
+        "class": {"type": "Human", "score": 0.95},
+        "geoposition": {"latitude": lat, "longitude": lon},
+        "timestamp": timestamp,
+        "track_id": track_id,
+    }
+
+
+class TestKalmanBank(unittest.TestCase):
+    def test_local_round_trip(self):
+        bank = KalmanBank()
+        local = bank.to_local([LAT, LAT + 10 * METER_LAT], [LON, LON])
+        np.testing.assert_allclose(local[1] - local[0], [0.0, 10.0], atol=0.01)
+        np.testing.assert_allclose(bank.to_geo(local)[1], [LAT + 10 * METER_LAT, LON])
+
+    def test_learns_velocity_and_predicts(self):
+        bank = KalmanBank()
+        bank.add("a", LAT, LON, 0.0)
+        for t in range(1, 11):
+            bank.update(["a"], [[LAT + 2 * t * METER_LAT, LON]], float(t))
+        positions, _ = bank.predict(["a"], 12.0)
+        self.assertAlmostEqual(positions[0, 1], 24.0, delta=0.5)
+
+    def test_gate_picks_nearest_allowed_track(self):
+        bank = KalmanBank()
+        bank.add("a", LAT, LON, 0.0)
+        bank.add("b", LAT + 1 * METER_LAT, LON, 0.0)
+        positions, S_inv = bank.predict(["a", "b"], 0.1)
+        self.assertEqual(bank.gate(positions, S_inv, LAT + 0.8 * METER_LAT, LON), 1)
+        allowed = np.array([True, False])
+        self.assertEqual(bank.gate(positions, S_inv, LAT + 0.8 * METER_LAT, LON, allowed), 0)
+        self.assertIsNone(bank.gate(positions, S_inv, LAT + 20 * METER_LAT, LON))
+
+    def test_slots_are_reused_and_grow(self):
+        bank = KalmanBank(capacity=2)
+        for key in "abc":
+            bank.add(key, LAT, LON, 0.0)
+        self.assertEqual(len(bank), 3)
+        bank.remove("b")
+        bank.add("d", LAT, LON, 0.0)
+        self.assertEqual(len(set(bank.slots.values())), 3)
+
+
+class TestPredictiveMatching(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.om = ObjectManager(map_manager=None, alarm_manager=None)
+        self.om.heatmap_data_file = os.path.join(self.tmpdir.name, "heatmap_data.json")
+
+    def tearDown(self):
+        self.om.close()
+        self.tmpdir.cleanup()
+
+    def test_fast_walker_handed_off_after_dropped_frames(self):
+        # Walking 2 m/s north on camera 1, then picked up by camera 2 after a 1 s gap
+        for i in range(5):
+            timestamp = f"2025-01-01T00:00:00.{i * 2}+00:00"
+            lat = LAT + 2 * (i * 0.2) * METER_LAT
+            self.om.add_observations("1", [observation("7", lat, LON, timestamp)])
+        (obj_id,) = self.om.objects
+        lat = LAT + 2 * 1.8 * METER_LAT
+        self.om.add_observations(
+            "2", [observation("99", lat, LON, "2025-01-01T00:00:01.8+00:00")]
+        )
+        self.assertEqual(list(self.om.objects), [obj_id])
+        self.assertEqual(self.om.objects[obj_id].tracks, {"1": "7", "2": "99"})
+
+    def test_served_positions_are_smoothed(self):
+        self.om.add_observations(
+            "1", [observation("7", LAT, LON, "2025-01-01T00:00:00+00:00")]
+        )
+        self.om.add_observations(
+            "1", [observation("7", LAT + METER_LAT, LON, "2025-01-01T00:00:00.1+00:00")]
+        )
+        served = self.om.get_all_objects()[0]["geoposition"]["latitude"]
+        self.assertGreater(served, LAT)
+        self.assertLess(served, LAT + METER_LAT)
+
+
+if __name__ == "__main__":
+    unittest.main()
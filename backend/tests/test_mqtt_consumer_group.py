@@ -0,0 +1,112 @@
+"""
+Integration test for MQTT consumer groups against a local Mosquitto broker
+started through BrokerManager. Skipped when mosquitto is not installed.
+"""
+
+import unittest
+import os
+import sys
+import shutil
+import time
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import paho.mqtt.client as mqtt
+
+from app.mqtt.broker import BrokerManager
+from app.mqtt.client import MqttClient
+from app.mqtt.ingest import IngestQueue
+from app.mqtt.routing import partition_cameras
+
+
+class RecordingObjectManager:
+    """Stands in for ObjectManager and records which cameras delivered frames."""
+
+    def __init__(self):
+        self.cameras = []
+
+    def add_observations(self, camera_id, observations):
+        self.cameras.append(camera_id)
+
+
+@unittest.skipUnless(shutil.which("mosquitto"), "mosquitto not installed")
+class TestConsumerGroup(unittest.TestCase):
+    def setUp(self):
+        self.broker = BrokerManager()
+        for _ in range(20):
+            if self.broker.is_running():
+                break
+            time.sleep(0.1)
+        self.clients = []
+
+    def tearDown(self):
+        for client in self.clients:
+            client.stop()
+        self.broker.stop()
+
+    def test_each_camera_lands_on_one_member(self):
+        cameras = [1, 2, 3, 4, 5]
+        recorders = [RecordingObjectManager(), RecordingObjectManager()]
+        for member, recorder in enumerate(recorders):
+            self.clients.append(
+                MqttClient(
+                    recorder,
+                    group="eagleeye-test",
+                    member=member,
+                    members=2,
+                    camera_ids=cameras,
+                    ingest=IngestQueue(min_interval=0),
+                )
+            )
+        time.sleep(0.5)  # let subscriptions settle
+
+        publisher = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+        publisher.connect("localhost", 1883)
+        publisher.loop_start()
+        payload = json.dumps({"frame": {"observations": []}})
+        for _ in range(3):
+            for camera in cameras:
+                publisher.publish(f"{camera}/frame_metadata", payload, qos=1).wait_for_publish()
+        time.sleep(0.5)
+        publisher.loop_stop()
+        publisher.disconnect()
+
+        owned = partition_cameras(cameras, 2)
+        for member, recorder in enumerate(recorders):
+            self.assertEqual(sorted(set(recorder.cameras)), sorted(owned[member]))
+        self.assertEqual(sum(len(r.cameras) for r in recorders), 3 * len(cameras))
+
+    def test_camera_added_at_runtime_lands_on_its_owner(self):
+        recorders = [RecordingObjectManager(), RecordingObjectManager()]
+        for member, recorder in enumerate(recorders):
+            self.clients.append(
+                MqttClient(
+                    recorder,
+                    group="eagleeye-test",
+                    member=member,
+                    members=2,
+                    camera_ids=[1, 2],
+                    ingest=IngestQueue(min_interval=0),
+                )
+            )
+        added = [client.add_camera(7) for client in self.clients]
+        self.assertEqual(sorted(added), [False, True])
+        time.sleep(0.5)  # let subscriptions settle
+
+        publisher = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+        publisher.connect("localhost", 1883)
+        publisher.loop_start()
+        payload = json.dumps({"frame": {"observations": []}})
+        publisher.publish("7/frame_metadata", payload, qos=1).wait_for_publish()
+        time.sleep(0.5)
+        publisher.loop_stop()
+        publisher.disconnect()
+
+        owner = partition_cameras([7], 2)
+        for member, recorder in enumerate(recorders):
+            self.assertEqual(recorder.cameras, owner[member])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.mqtt.decoder import DECODERS, get_decoder
+
+
+class TestFrameDecoders(unittest.TestCase):
+    def setUp(self):
+        self.payload = json.dumps(
+            {
+                "frame": {
+                    "observations": [
+                        {
+                            "class": {"type": "Human", "score": 0.95, "upper_clothing_colors": []},
+                            "geoposition": {"latitude": 1.0, "longitude": 2.0},
+                            "timestamp": "2025-05-16T21:34:00Z",
+                            "track_id": "7",
+                            "bounding_box": {"top": 0.1},
+                        },
+                        {"class": {"type": "Human", "score": 0.5}},
+                        {"geoposition": {"latitude": 1.0, "longitude": 2.0}},
+                    ]
+                }
+            }
+        ).encode()
+
+    def test_all_decoders_filter_and_trim(self):
+        for name in DECODERS:
+            observations = get_decoder(name).decode(self.payload, "3")
+            self.assertEqual(len(observations), 1, name)
+            self.assertEqual(observations[0].object_class, {"type": "Human", "score": 0.95})
+            self.assertEqual(observations[0].track_id, "7")
+            self.assertEqual(observations[0].camera_id, "3")
+            self.assertEqual((observations[0].latitude, observations[0].longitude), (1.0, 2.0))
+            self.assertEqual(observations[0].bounding_box["top"], 0.1)
+
+    def test_empty_frame_skips_parsing(self):
+        self.assertEqual(get_decoder().decode(b'{"frame": {"observations": [], "x": '), [])
+
+    def test_invalid_payload_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            get_decoder().decode(b"not json")
+
+    def test_unknown_decoder(self):
+        with self.assertRaises(ValueError):
+            get_decoder("yaml")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.mqtt.ingest import MAX_FRAME_INTERVAL, IngestQueue, parse_camera_intervals
+from app.objects.lifecycle import TRACK_TTL, TrackLifecycle
+
+
+class TestIngestQueue(unittest.TestCase):
+    def test_decimation_per_camera(self):
+        q = IngestQueue(min_interval=0.5, camera_intervals={"2": 0}, latency_budget=10.0)
+        self.assertTrue(q.put("1", b"a", now=0.0))
+        self.assertFalse(q.put("1", b"b", now=0.2))
+        self.assertTrue(q.put("1", b"c", now=0.6))
+        self.assertTrue(q.put("2", b"d", now=0.6))
+        self.assertTrue(q.put("2", b"e", now=0.61))
+        self.assertEqual(q.decimated, 1)
+        self.assertEqual(len(q), 4)
+
+    def test_in_order_within_budget(self):
+        q = IngestQueue(min_interval=0, latency_budget=1.0)
+        for i in range(3):
+            q.put("1", i, now=i * 0.1)
+        self.assertEqual([q.get(now=0.3)[1] for _ in range(3)], [0, 1, 2])
+        self.assertFalse(q.shedding)
+
+    def test_latest_wins_when_over_budget(self):
+        q = IngestQueue(min_interval=0, latency_budget=0.5)
+        q.put("1", "old1", now=0.0)
+        q.put("2", "old2", now=0.1)
+        q.put("1", "new1", now=0.8)  # head is 0.8 s old -> shed
+        self.assertTrue(q.shedding)
+        q.put("1", "newest1", now=0.9)
+        self.assertEqual(len(q), 2)
+        self.assertEqual(q.get(now=0.95)[1], "old2")
+        self.assertEqual(q.get(now=0.95)[1], "newest1")
+        self.assertFalse(q.shedding)
+        self.assertEqual(q.dropped, 2)
+
+    def test_sheds_when_full(self):
+        q = IngestQueue(min_interval=0, latency_budget=10.0, max_size=3)
+        for i in range(4):
+            q.put(str(i % 2), i, now=0.0)
+        self.assertTrue(q.shedding)
+        self.assertEqual(len(q), 2)
+
+    def test_get_timeout_returns_none(self):
+        self.assertIsNone(IngestQueue().get(timeout=0.01))
+
+    def test_parse_camera_intervals(self):
+        self.assertEqual(parse_camera_intervals(" 3=0.5, 7=0,"), {"3": 0.5, "7": 0.0})
+        self.assertEqual(parse_camera_intervals("3=fast,4=1"), {"4": 1.0})
+        self.assertEqual(parse_camera_intervals(""), {})
+
+    def test_interval_is_capped_below_track_ttl(self):
+        # A "low-rate camera" setting must not let tracks expire between its frames
+        q = IngestQueue(min_interval=5.0, camera_intervals={"1": 2.0})
+        q.set_interval("2", TRACK_TTL)
+        self.assertLess(q.min_interval, TRACK_TTL)
+        self.assertEqual(q.camera_intervals, {"1": MAX_FRAME_INTERVAL, "2": MAX_FRAME_INTERVAL})
+        lifecycle = TrackLifecycle(lambda expired: None, start=False)
+        for step in range(50):
+            now = step * 0.1
+            for camera in ("1", "2", "3"):
+                if q.put(camera, step, now=now):
+                    lifecycle.touch("object", camera, now=now)
+            self.assertEqual(lifecycle.expire(now=now), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
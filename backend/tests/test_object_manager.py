@@ -51,7 +51,7 @@ class TestObjectManager(unittest.TestCase):
         # print("=== test_add_single_observation ===")
         # print(
         #     "Objects:",
-        #     [(o.id, len(o.observations), o.cameras) for o in self.om.objects],
+        #     [(o.id, len(o.observations), o.cameras) for o in self.om.objects.values()],
         # )
         objs = self.om.get_objects_by_camera(1)
         # print("get_objects_by_camera(1):", objs)
@@ -67,7 +67,7 @@ class TestObjectManager(unittest.TestCase):
         self.om.add_observations(1, [self.obs1_similar])
 
         self.assertEqual(len(self.om.objects), 1)
-        global_obj = self.om.objects[0]
+        global_obj = list(self.om.objects.values())[0]
         self.assertEqual(len(global_obj.observations), 2)
         self.assertTrue(
             check_if_same_observation(
@@ -82,7 +82,7 @@ class TestObjectManager(unittest.TestCase):
         # print("=== test_create_new_for_different_observation ===")
         # print(
         #     "Objects:",
-        #     [(o.id, len(o.observations), o.cameras) for o in self.om.objects],
+        #     [(o.id, len(o.observations), o.cameras) for o in self.om.objects.values()],
         # )
         # self.assertEqual(len(self.om.objects), 2)
 
@@ -92,7 +92,7 @@ class TestObjectManager(unittest.TestCase):
         # # debug print
 
         self.assertEqual(len(self.om.objects), 1)
-        go = self.om.objects[0]
+        go = list(self.om.objects.values())[0]
         self.assertEqual(go.cameras, {1, 2})
         self.assertEqual(len(self.om.get_objects_by_camera(1)), 1)
         self.assertEqual(len(self.om.get_objects_by_camera(2)), 1)
@@ -0,0 +1,92 @@
+import unittest
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.objects.manager import ObjectManager
+
+
+def observation(track_id, lat, lon, timestamp):
+    return {
+        "class": {"type": "Human", "score": 0.95},
+        "geoposition": {"latitude": lat, "longitude": lon},
+        "timestamp": timestamp,
+        "track_id": track_id,
+    }
+
+
+class TestTrackIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.om = ObjectManager(map_manager=None, alarm_manager=None)
+        self.om.heatmap_data_file = os.path.join(self.tmpdir.name, "heatmap_data.json")
+
+    def tearDown(self):
+        self.om.close()
+        self.tmpdir.cleanup()
+
+    def test_continuing_track_skips_distance_matching(self):
+        self.om.add_observations("1", [observation("7", 59.3245, 18.0705, "t1")])
+        (obj_id,) = self.om.objects
+        # 20 m away: distance matching would create a new object, the track index does not
+        self.om.add_observations("1", [observation("7", 59.32468, 18.0705, "t2")])
+        self.assertEqual(list(self.om.objects), [obj_id])
+        self.assertEqual(len(self.om.objects[obj_id].observations), 2)
+
+    def test_two_close_tracks_stay_separate(self):
+        self.om.add_observations(
+            "1",
+            [
+                observation("7", 59.3245, 18.0705, "t1"),
+                observation("8", 59.324503, 18.0705, "t1"),
+            ],
+        )
+        self.assertEqual(len(self.om.objects), 2)
+
+    def test_cross_camera_handoff_matches_by_distance(self):
+        self.om.add_observations("1", [observation("7", 59.3245, 18.0705, "t1")])
+        self.om.add_observations("2", [observation("99", 59.324503, 18.0705, "t2")])
+        (obj,) = self.om.objects.values()
+        self.assertEqual(obj.tracks, {"1": "7", "2": "99"})
+
+    def test_purge_camera(self):
+        self.om.add_observations("1", [observation("7", 59.3245, 18.0705, "t1")])
+        self.om.add_observations("2", [observation("99", 59.324503, 18.0705, "t2")])
+        self.om.add_observations("2", [observation("50", 59.3260, 18.0705, "t2")])
+        self.assertEqual(self.om.purge_camera("2"), 1)
+        (obj,) = self.om.objects.values()
+        self.assertEqual(obj.cameras, {"1"})
+        self.assertEqual(obj.tracks, {"1": "7"})
+        self.assertEqual(self.om.object_count("2"), 0)
+        self.assertEqual(self.om.purge_camera("2"), 0)
+
+    def test_missing_geoposition_uses_track(self):
+        self.om.add_observations("1", [observation("7", 59.3245, 18.0705, "t1")])
+        obs = observation("7", None, None, "t2")
+        obs["geoposition"] = {}
+        self.om.add_observations("1", [obs])
+        self.assertEqual(len(self.om.objects), 1)
+
+    def test_archive_unbinds_tracks(self):
+        self.om.add_observations("1", [observation("7", 59.3245, 18.0705, "t1")])
+        self.om._expire_tracks(self.om.lifecycle.expire(time.monotonic() + 10))
+        self.assertEqual(self.om.objects, {})
+        self.assertEqual(self.om._tracks, {})
+        self.assertEqual(self.om._by_camera, {})
+
+    def test_camera_index(self):
+        self.om.add_observations("1", [observation("7", 59.3245, 18.0705, "t1")])
+        self.om.add_observations("2", [observation("8", 59.3255, 18.0705, "t1")])
+        (obj_id,) = self.om._by_camera["1"]
+        self.assertIs(self.om.get_object(obj_id), self.om.objects[obj_id])
+        self.assertEqual(self.om.object_count(), 2)
+        self.assertEqual(self.om.object_count("1"), 1)
+        self.assertEqual(self.om.object_count("3"), 0)
+        self.assertEqual([o["id"] for o in self.om.get_objects_by_camera("1")], [obj_id])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.objects.observation import Observation
+
+
+class TestObservation(unittest.TestCase):
+    def test_from_dict_keeps_used_fields(self):
+        obs = Observation.from_dict(
+            {
+                "class": {"type": "Human", "score": 0.9, "upper_clothing_colors": []},
+                "geoposition": {"latitude": 1.0, "longitude": 2.0},
+                "timestamp": "2025-05-16T21:34:00Z",
+                "track_id": "7",
+                "bounding_box": {"bottom": 0.6, "left": 0.4, "right": 0.5, "top": 0.3},
+            },
+            camera_id="1",
+        )
+        self.assertEqual(obs.camera_id, "1")
+        self.assertEqual(obs.object_class, {"type": "Human", "score": 0.9})
+        self.assertEqual(obs.geoposition, {"latitude": 1.0, "longitude": 2.0})
+        self.assertEqual(
+            obs.bounding_box, {"bottom": 0.6, "left": 0.4, "right": 0.5, "top": 0.3}
+        )
+        self.assertFalse(hasattr(obs, "__dict__"))
+
+    def test_missing_geoposition(self):
+        obs = Observation.from_dict({"geoposition": {"latitude": None}, "track_id": "7"})
+        self.assertFalse(obs.has_geoposition)
+        self.assertEqual(obs.geoposition, {})
+        self.assertEqual(obs.bounding_box, {})
+
+    def test_to_dict_for_heatmap(self):
+        obs = Observation("1", "7", "2025-05-16T21:34:00Z", "Human", 0.9, 1.0, 2.0)
+        record = obs.to_dict()
+        self.assertEqual(record["timestamp"], "2025-05-16T21:34:00Z")
+        self.assertEqual(record["geoposition"], {"latitude": 1.0, "longitude": 2.0})
+        self.assertNotIn("bounding_box", record)
+
+
+if __name__ == "__main__":
+    unittest.main()
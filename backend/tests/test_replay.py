@@ -0,0 +1,78 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.heatmap.replay import group_frames, pace, read_history, to_ndjson
+from app.heatmap.store import HistoryStore, observation_time
+from app.objects.observation import Observation
+
+T0 = observation_time("2025-05-16T21:34:00Z")
+
+
+def record(object_id, second, lat=59.0):
+    return Observation(
+        "1", "7", f"2025-05-16T21:34:{second:05.2f}Z", "Human", 0.9, lat, 18.0, object_id=object_id
+    )
+
+
+class TestReplay(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "heatmap_data.json")
+        self.records = [record("a", 0), record("b", 0.05), record("a", 0.5), record("a", 2)]
+        with open(self.filename, "w", encoding="utf-8") as f:
+            for r in self.records:
+                f.write(json.dumps(r.to_dict()) + "\n")
+            f.write("not json\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_reads_window_from_file(self):
+        observations = list(read_history(None, self.filename, T0 + 0.1, T0 + 1))
+        self.assertEqual([o["time"] - T0 for o in observations], [0.5])
+
+    def test_reads_window_from_store(self):
+        store = HistoryStore(os.path.join(self.tmpdir.name, "history.db"))
+        try:
+            store.insert_many(self.records)
+            observations = list(read_history(store, self.filename, T0 + 0.1, T0 + 1))
+            self.assertEqual([o["object_id"] for o in observations], ["a"])
+        finally:
+            store.close()
+
+    def test_group_frames(self):
+        frames = list(group_frames(read_history(None, self.filename, T0), interval=0.1))
+        self.assertEqual([len(f["objects"]) for f in frames], [2, 1, 1])
+        self.assertEqual(frames[0]["time"], T0)
+
+    def test_pace_sleeps_by_recorded_time_over_speed(self):
+        now = [0.0]
+        slept = []
+
+        def sleep(seconds):
+            slept.append(round(seconds, 6))
+            now[0] += seconds
+
+        frames = [{"time": t, "objects": []} for t in (10.0, 11.0, 13.0)]
+        list(pace(frames, speed=2.0, sleep=sleep, clock=lambda: now[0]))
+        self.assertEqual(slept, [0.5, 1.0])
+        slept.clear()
+        list(pace(frames, speed=0, sleep=sleep, clock=lambda: now[0]))
+        self.assertEqual(slept, [])
+
+    def test_ndjson_lines(self):
+        frames = group_frames(read_history(None, self.filename, T0), interval=0.1)
+        lines = list(to_ndjson(frames, lambda latlon: (latlon[0], latlon[1])))
+        first = json.loads(lines[0])
+        self.assertTrue(all(line.endswith("\n") for line in lines))
+        self.assertEqual(sorted(o["id"] for o in first["objects"]), ["a", "b"])
+        self.assertEqual(first["objects"][0]["x"], 59.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
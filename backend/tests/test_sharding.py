@@ -0,0 +1,116 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.mqtt.routing import (
+    consumer_group_topic,
+    consumer_group_topics,
+    frame_topics,
+    partition_cameras,
+    worker_for_camera,
+)
+from app.objects.sharding import ShardedTracker, merge_snapshots
+
+
+def snapshot_entry(obj_id, camera, lat, lon, timestamp):
+    return {
+        "id": obj_id,
+        "camera_id": camera,
+        "cameras": [camera],
+        "geoposition": {"latitude": lat, "longitude": lon},
+        "timestamp": timestamp,
+    }
+
+
+class TestRouting(unittest.TestCase):
+    def test_partition_is_stable_and_complete(self):
+        cameras = list(range(1, 21))
+        partitions = partition_cameras(cameras, 4)
+        self.assertEqual(sorted(int(c) for p in partitions.values() for c in p), cameras)
+        self.assertEqual(partitions, partition_cameras(cameras, 4))
+
+    def test_growing_workers_only_moves_to_new_worker(self):
+        cameras = range(1, 51)
+        for camera in cameras:
+            before = worker_for_camera(camera, 3)
+            after = worker_for_camera(camera, 4)
+            self.assertIn(after, (before, 3))
+
+    def test_frame_topics(self):
+        self.assertEqual(frame_topics(["1", 2]), ["1/frame_metadata", "2/frame_metadata"])
+
+    def test_consumer_group_topics_split_cameras(self):
+        cameras = [1, 2, 3, 4, 5, 6]
+        topics = [consumer_group_topics("g", m, 2, cameras) for m in range(2)]
+        self.assertEqual(len(topics[0]) + len(topics[1]), len(cameras))
+        self.assertFalse(set(topics[0]) & set(topics[1]))
+        self.assertTrue(all(t.startswith("$share/g/") for t in topics[0] + topics[1]))
+
+    def test_runtime_camera_is_owned_by_one_member(self):
+        for camera in range(1, 21):
+            topics = [consumer_group_topic("g", m, 3, camera) for m in range(3)]
+            owned = [topic for topic in topics if topic is not None]
+            self.assertEqual(owned, [f"$share/g/{camera}/frame_metadata"])
+            # Same owner as the startup partition
+            self.assertEqual(owned, consumer_group_topics("g", topics.index(owned[0]), 3, [camera]))
+
+    def test_consumer_group_without_cameras(self):
+        self.assertEqual(consumer_group_topics("g", 0, 3), ["$share/g/+/frame_metadata"])
+        with self.assertRaises(ValueError):
+            consumer_group_topics("g", 3, 3)
+
+
+class TestMergeSnapshots(unittest.TestCase):
+    def test_merges_nearby_objects_across_shards(self):
+        merged = merge_snapshots(
+            {
+                0: [snapshot_entry("a", "1", 59.324500, 18.070500, "2025-01-01T00:00:01Z")],
+                1: [snapshot_entry("b", "2", 59.324503, 18.070502, "2025-01-01T00:00:02Z")],
+            }
+        )
+        self.assertEqual(len(merged), 1)
+        self.assertEqual(merged[0]["id"], "a")
+        self.assertEqual(merged[0]["cameras"], ["1", "2"])
+        self.assertEqual(merged[0]["camera_id"], "2")
+
+    def test_keeps_distant_objects_and_same_shard_objects(self):
+        merged = merge_snapshots(
+            {
+                0: [
+                    snapshot_entry("a", "1", 59.324500, 18.070500, "t"),
+                    snapshot_entry("b", "1", 59.324501, 18.070500, "t"),
+                ],
+                1: [snapshot_entry("c", "2", 59.325500, 18.070500, "t")],
+            }
+        )
+        self.assertEqual(sorted(obj["id"] for obj in merged), ["a", "b", "c"])
+
+
+class TestShardedTracker(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.tracker = ShardedTracker([], 2, map_manager=None, alarm_manager=None)
+        self.tracker.heatmap_writer.filename = os.path.join(self.tmpdir.name, "heatmap.json")
+
+    def tearDown(self):
+        self.tracker.close()
+        self.tmpdir.cleanup()
+
+    def test_merged_objects_are_recorded_once_per_observation(self):
+        objects = [snapshot_entry("a", "1", 59.3245, 18.0705, "2025-01-01T00:00:01Z")]
+        self.tracker._record_heatmap(objects)
+        self.tracker._record_heatmap(objects)  # Same snapshot merged again
+        self.tracker.heatmap_writer.flush()
+        with open(self.tracker.heatmap_writer.filename, encoding="utf-8") as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["object_id"], "a")
+        self.assertEqual(records[0]["camera_id"], "1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import requests
+
+from app.camera.webrtc import StreamConfigManager
+
+
+class FakeResponse:
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code}")
+
+
+class FakeSession:
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+        self.on_call = None  # Called with the URL before every request
+
+    def post(self, url, json=None, timeout=None):
+        return self._call("POST", url)
+
+    def delete(self, url, timeout=None):
+        return self._call("DELETE", url)
+
+    def _call(self, method, url):
+        if self.on_call is not None:
+            self.on_call(url)
+        if self.fail is True or self.fail == url:
+            raise requests.ConnectionError("refused")
+        self.calls.append((method, url))
+        return FakeResponse()
+
+
+class TestStreamConfig(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.config_file = os.path.join(self.tmpdir.name, "config.json")
+        with open(self.config_file, "w") as f:
+            json.dump({"server": {"http_port": ":8083"}, "streams": {"9": {"url": "rtsp://old"}}}, f)
+        self.session = FakeSession()
+        self.streams = StreamConfigManager(self.config_file, "http://server:8083", self.session)
+        self.writes = 0
+        write = self.streams._write
+
+        def counting_write():
+            changed = write()
+            if changed:
+                self.writes += 1
+            return changed
+
+        self.streams._write = counting_write
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def read(self):
+        with open(self.config_file) as f:
+            return json.load(f)
+
+    def test_batch_writes_once(self):
+        with self.streams.batch(push=False):
+            self.streams.clear()
+            self.streams.add(1, "192.168.0.3")
+            self.streams.add(2, "192.168.0.4")
+        self.assertEqual(self.writes, 1)
+        config = self.read()
+        self.assertEqual(sorted(config["streams"]), ["1", "2"])
+        self.assertEqual(config["server"], {"http_port": ":8083"})
+        self.assertEqual(self.session.calls, [])
+        self.assertFalse(os.path.exists(self.config_file + ".tmp"))
+
+    def test_changes_are_pushed_to_server(self):
+        self.streams.add(1, "192.168.0.3")
+        self.streams.remove(9)
+        self.assertEqual(
+            self.session.calls,
+            [("POST", "http://server:8083/api/stream/1"), ("DELETE", "http://server:8083/api/stream/9")],
+        )
+        self.assertEqual(list(self.read()["streams"]), ["1"])
+
+    def test_unchanged_entry_is_not_written(self):
+        self.streams.add(1, "192.168.0.3")
+        self.streams.add(1, "192.168.0.3")
+        self.streams.remove(5)
+        self.assertEqual(self.writes, 1)
+        self.assertEqual(len(self.session.calls), 1)
+
+    def test_moved_camera_is_updated(self):
+        self.streams.add(1, "192.168.0.3")
+        self.streams.add(1, "192.168.0.8")
+        self.assertIn("192.168.0.8", self.read()["streams"]["1"]["url"])
+
+    def test_unreachable_server_keeps_file_change(self):
+        self.session.fail = True
+        self.streams.add(1, "192.168.0.3")
+        self.assertIn("1", self.read()["streams"])
+
+    def test_failed_push_does_not_stop_the_others(self):
+        self.session.fail = "http://server:8083/api/stream/1"
+        with self.streams.batch():
+            self.streams.add(1, "192.168.0.3")
+            self.streams.add(2, "192.168.0.4")
+        self.assertEqual(self.session.calls, [("POST", "http://server:8083/api/stream/2")])
+
+    def test_config_is_not_locked_while_pushing(self):
+        readable = []
+
+        def read_streams(url):
+            reader = threading.Thread(target=lambda: readable.append(self.streams.streams))
+            reader.start()
+            reader.join(timeout=1)
+            self.assertFalse(reader.is_alive())
+
+        self.session.on_call = read_streams
+        self.streams.add(1, "192.168.0.3")
+        self.assertEqual(len(readable), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
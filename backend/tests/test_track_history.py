@@ -0,0 +1,118 @@
+import unittest
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.heatmap.store import HistoryStore
+from app.objects.history import (
+    TrackHistory,
+    douglas_peucker,
+    downsample,
+    object_history,
+    time_buckets,
+)
+from app.objects.manager import ObjectManager
+from app.objects.observation import Observation
+
+LAT, LON = 59.3245, 18.0705
+METER_LAT = 1 / 111_195  # degrees latitude per meter
+
+
+class TestTrackHistory(unittest.TestCase):
+    def test_window_and_ordering(self):
+        history = TrackHistory()
+        for t in (1.0, 2.0, 4.0, 3.0, 4.0):
+            history.append("a", t, LAT, LON)
+        self.assertEqual([p[0] for p in history.window("a")], [1.0, 2.0, 3.0, 4.0])
+        self.assertEqual([p[0] for p in history.window("a", 2.0, 3.0)], [2.0, 3.0])
+        self.assertEqual(history.window("missing"), [])
+
+    def test_trims_and_evicts(self):
+        history = TrackHistory(max_points=8, max_tracks=2)
+        for t in range(20):
+            history.append("a", float(t), LAT, LON)
+        self.assertLessEqual(len(history.window("a")), 8)
+        self.assertEqual(history.window("a")[-1][0], 19.0)
+        history.append("b", 0.0, LAT, LON)
+        history.append("c", 0.0, LAT, LON)
+        self.assertNotIn("a", history)
+
+
+class TestDownsampling(unittest.TestCase):
+    def test_douglas_peucker_keeps_corners(self):
+        # 10 m north, then 10 m east, 1 m spacing
+        points = [(float(i), LAT + i * METER_LAT, LON) for i in range(11)]
+        east = 1 / (111_195 * 0.5090)  # degrees longitude per meter at this latitude
+        points += [(10.0 + i, LAT + 10 * METER_LAT, LON + i * east) for i in range(1, 11)]
+        simplified = douglas_peucker(points, tolerance=0.2)
+        self.assertEqual([p[0] for p in simplified], [0.0, 10.0, 20.0])
+
+    def test_time_buckets_cap_points(self):
+        points = [(float(i), LAT, LON) for i in range(1000)]
+        self.assertEqual(len(time_buckets(points, 50)), 50)
+        self.assertEqual(len(downsample(points, max_points=50)), 2)  # Straight line
+
+
+class TestObjectHistory(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = HistoryStore(os.path.join(self.tmpdir.name, "history.db"))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmpdir.cleanup()
+
+    def test_older_windows_come_from_store(self):
+        history = TrackHistory()
+        history.append("a", 1747431250.0, LAT, LON)
+        self.store.insert_many(
+            [
+                Observation("1", "7", "2025-05-16T21:34:00Z", latitude=LAT, longitude=LON, object_id="a"),
+                Observation("1", "7", "2025-05-16T21:34:10Z", latitude=LAT, longitude=LON, object_id="a"),
+            ]
+        )
+        self.assertEqual(len(object_history(history, self.store, "a")), 1)
+        self.assertEqual(len(object_history(history, self.store, "a", start=1747431200.0)), 2)
+        self.assertEqual(len(object_history(history, None, "a", start=1747431200.0)), 1)
+
+    def test_object_manager_records_trajectory(self):
+        om = ObjectManager(map_manager=None, alarm_manager=None)
+        om.heatmap_data_file = os.path.join(self.tmpdir.name, "heatmap_data.json")
+        try:
+            for second in range(3):
+                om.add_observations(
+                    "1",
+                    [Observation("1", "7", f"2025-05-16T21:34:0{second}Z", "Human", 0.9, LAT, LON)],
+                )
+            (obj_id,) = om.objects
+            points = om.get_object_history(obj_id, start=1747431241.0)
+            self.assertEqual([p[0] for p in points], [1747431241.0, 1747431242.0])
+        finally:
+            om.close()
+
+    @unittest.skipUnless(hasattr(time, "tzset"), "needs time.tzset")
+    def test_naive_timestamps_are_utc_like_the_store(self):
+        tz = os.environ.get("TZ")
+        os.environ["TZ"] = "Asia/Tokyo"
+        time.tzset()
+        om = ObjectManager(map_manager=None, alarm_manager=None, record_heatmap=False)
+        try:
+            om.add_observations(
+                "1", [Observation("1", "7", "2025-05-16T21:34:01", "Human", 0.9, LAT, LON)]
+            )
+            (obj_id,) = om.objects
+            self.assertEqual([p[0] for p in om.get_object_history(obj_id)], [1747431241.0])
+        finally:
+            om.close()
+            if tz is None:
+                os.environ.pop("TZ", None)
+            else:
+                os.environ["TZ"] = tz
+            time.tzset()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.objects.lifecycle import TrackLifecycle
+from app.objects.manager import ObjectManager
+
+
+def observation(track_id, lat, lon, timestamp):
+    return {
+        "class": {"type": "Human", "score": 0.95},
+        "geoposition": {"latitude": lat, "longitude": lon},
+        "timestamp": timestamp,
+        "track_id": track_id,
+    }
+
+
+class TestTrackLifecycle(unittest.TestCase):
+    def setUp(self):
+        self.lifecycle = TrackLifecycle(lambda expired: None, ttl=1.0, start=False)
+
+    def test_expires_after_ttl(self):
+        self.lifecycle.touch("a", "1", now=0.0)
+        self.assertEqual(self.lifecycle.expire(now=0.9), [])
+        self.assertEqual(self.lifecycle.expire(now=1.0), [("a", "1")])
+        self.assertFalse(self.lifecycle.is_live("a", "1"))
+
+    def test_touch_postpones_expiry_without_growing_heap(self):
+        for i in range(10):
+            self.lifecycle.touch("a", "1", now=i * 0.5)
+        self.assertEqual(len(self.lifecycle._heap), 1)
+        self.assertEqual(self.lifecycle.expire(now=5.0), [])
+        self.assertEqual(self.lifecycle.expire(now=5.5), [("a", "1")])
+
+    def test_forgotten_tracks_do_not_expire(self):
+        self.lifecycle.touch("a", "1", now=0.0)
+        self.lifecycle.forget("a", "1")
+        self.assertEqual(self.lifecycle.expire(now=2.0), [])
+        self.assertEqual(self.lifecycle._heap, [])
+
+    def test_sweeper_thread_calls_on_expire(self):
+        done = threading.Event()
+        lifecycle = TrackLifecycle(lambda expired: done.set(), ttl=0.05)
+        try:
+            lifecycle.touch("a", "1")
+            self.assertTrue(done.wait(2))
+        finally:
+            lifecycle.stop()
+
+
+class TestObjectExpiry(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.om = ObjectManager(map_manager=None, alarm_manager=None, track_ttl=0.05)
+        self.om.heatmap_data_file = os.path.join(self.tmpdir.name, "heatmap_data.json")
+
+    def tearDown(self):
+        self.om.close()
+        self.tmpdir.cleanup()
+
+    def test_offline_camera_objects_expire(self):
+        self.om.add_observations("1", [observation("7", 59.3245, 18.0705, "t1")])
+        deadline = time.monotonic() + 2
+        while self.om.objects and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.om.objects, {})
+        self.assertEqual(len(self.om.filters), 0)
+
+    def test_object_survives_while_another_camera_sees_it(self):
+        self.om.lifecycle.ttl = 60.0
+        self.om.add_observations("1", [observation("7", 59.3245, 18.0705, "t1")])
+        self.om.add_observations("2", [observation("9", 59.324501, 18.0705, "t2")])
+        (obj,) = self.om.objects.values()
+        self.om.lifecycle.forget(obj, "1")  # As if the sweeper had collected camera 1
+        self.om._expire_tracks([(obj, "1")])
+        self.assertEqual(self.om.objects, {obj.id: obj})
+        self.assertEqual(obj.cameras, {"2"})
+        self.assertEqual(obj.tracks, {"2": "9"})
+
+
+if __name__ == "__main__":
+    unittest.main()
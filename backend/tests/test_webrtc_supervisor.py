@@ -0,0 +1,84 @@
+import unittest
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.camera.webrtc import WebRTCSupervisor, build_binary, source_hash
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class TestSourceHash(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.write("main.go", "package main\n")
+        self.write("go.mod", "module x\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, text):
+        with open(os.path.join(self.tmpdir.name, name), "w") as f:
+            f.write(text)
+
+    def test_hash_changes_with_sources_only(self):
+        before = source_hash(self.tmpdir.name)
+        self.write("README.md", "docs")
+        self.assertEqual(source_hash(self.tmpdir.name), before)
+        self.write("main.go", "package main\n\nfunc main() {}\n")
+        self.assertNotEqual(source_hash(self.tmpdir.name), before)
+
+    def test_cached_binary_is_not_rebuilt(self):
+        bin_dir = os.path.join(self.tmpdir.name, "bin")
+        os.makedirs(bin_dir)
+        cached = os.path.join(bin_dir, f"rtsp2webrtc-{source_hash(self.tmpdir.name)[:16]}")
+        if sys.platform == "win32":
+            cached += ".exe"
+        open(cached, "w").close()
+        # Would fail if it tried to build: the sources are not a valid Go program
+        self.assertEqual(build_binary(self.tmpdir.name, bin_dir), cached)
+
+
+class TestWebRTCSupervisor(unittest.TestCase):
+    def test_crashing_server_is_restarted(self):
+        supervisor = WebRTCSupervisor(
+            binary=sys.executable, args=["-c", "raise SystemExit(3)"], cwd=".", backoff=0.01
+        )
+        supervisor.start()
+        try:
+            self.assertTrue(wait_for(lambda: supervisor.restarts >= 2))
+            self.assertEqual(supervisor.status()["last_exit_code"], 3)
+        finally:
+            supervisor.stop()
+        self.assertEqual(supervisor.status()["state"], "stopped")
+
+    def test_stop_terminates_running_server(self):
+        supervisor = WebRTCSupervisor(
+            binary=sys.executable, args=["-c", "import time; time.sleep(60)"], cwd="."
+        )
+        supervisor.start()
+        self.assertTrue(wait_for(lambda: supervisor.status()["pid"] is not None))
+        process = supervisor.process
+        supervisor.stop()
+        self.assertIsNotNone(process.poll())
+        self.assertEqual(supervisor.restarts, 0)
+
+    def test_missing_binary_fails(self):
+        supervisor = WebRTCSupervisor(binary="/nonexistent/rtsp2webrtc", cwd=".")
+        supervisor.start()
+        self.assertTrue(wait_for(lambda: supervisor.state == "failed"))
+        self.assertIn("Could not start", supervisor.status()["last_error"])
+
+
+if __name__ == "__main__":
+    unittest.main()